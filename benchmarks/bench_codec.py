@@ -0,0 +1,128 @@
+"""存储编码性能基准
+
+构造 N 篇论文记录（结构与 LocalStorageWriter 写入的 {"value": asdict(paper), "stored_at"} 相同），
+对比各编码下 LocalStorage 整体写入、读取的耗时和文件大小，以及 StateManager 状态文件的大小：
+
+- json (indent=2, legacy): 旧实现，json.dump(..., indent=2)
+- json / msgpack / json+zstd / msgpack+zstd: LocalStorage(codec=...)
+
+没有安装 msgpack 或 zstandard 时跳过对应的编码。
+
+用法:
+    python -m benchmarks.bench_codec [--papers 100000] [--repeat 3]
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from daily_paper.core.common.codec import CODECS, get_codec
+from daily_paper.core.models import Paper
+from daily_paper.core.operators.state.pending import IDState, StateManager
+from daily_paper.core.operators.storage.local_storage import LocalStorage
+
+
+def _make_records(num_papers: int) -> dict:
+    random.seed(0)
+    words = ["language", "model", "graph", "retrieval", "agent", "vision", "learning"]
+    records = {}
+    for i in range(num_papers):
+        id = f"2401.{i:05d}v1"
+        paper = Paper(
+            id=id,
+            title=" ".join(random.choices(words, k=8)),
+            url=f"http://arxiv.org/abs/{id}",
+            abstract=" ".join(random.choices(words, k=150)),
+            authors=", ".join(f"Author {random.randint(0, 5000)}" for _ in range(5)),
+            category=random.choice(["cs.CL", "cs.CV", "cs.LG"]),
+            publish_date="2024-01-01",
+            update_date=f"2024-01-{random.randint(1, 28):02d}",
+        )
+        records[id] = {"value": asdict(paper), "stored_at": "2024-01-01T00:00:00"}
+    return records
+
+
+def _best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(num_papers: int, repeat: int):
+    records = _make_records(num_papers)
+    states = {id: IDState.FINISHED for id in records}
+    results = []
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        legacy_file = Path(base_dir) / "legacy.json"
+
+        def legacy_write():
+            with open(legacy_file, "w", encoding="utf-8") as f:
+                json.dump(records, f, ensure_ascii=False, indent=2)
+
+        def legacy_read():
+            with open(legacy_file, "r", encoding="utf-8") as f:
+                json.load(f)
+
+        write = _best_of(repeat, legacy_write)
+        read = _best_of(repeat, legacy_read)
+        results.append(
+            ("json (indent=2, legacy)", write, read, legacy_file.stat().st_size, None)
+        )
+
+        for name in CODECS:
+            try:
+                get_codec(name)
+            except ImportError as e:
+                print(f"skip {name}: {e}")
+                continue
+            storage = LocalStorage(base_dir, f"bench_{name}", codec=name)
+            write = _best_of(repeat, lambda: storage.write_storage(records))
+            read = _best_of(repeat, storage.read_storage)
+            assert storage.read_storage() == records
+
+            manager = StateManager(base_dir, f"bench_{name}", codec=name)
+            manager.update_states(states)
+            results.append(
+                (
+                    name,
+                    write,
+                    read,
+                    storage.storage_file.stat().st_size,
+                    manager.state_file.stat().st_size,
+                )
+            )
+
+    baseline = results[0]
+    print(f"papers={num_papers} repeat={repeat} (best of)")
+    print(
+        f"{'codec':<26}{'write ms':>10}{'write MB/s':>12}{'read ms':>10}{'read MB/s':>11}"
+        f"{'size MB':>10}{'vs legacy':>11}{'state KB':>10}"
+    )
+    for name, write, read, size, state_size in results:
+        # 吞吐量以旧实现的文件大小作为数据量，便于横向比较
+        mb = baseline[3] / 2**20
+        print(
+            f"{name:<26}{write * 1000:>10.1f}{mb / write:>12.1f}{read * 1000:>10.1f}"
+            f"{mb / read:>11.1f}{size / 2**20:>10.2f}{size / baseline[3]:>10.0%}"
+            f"{'' if state_size is None else f'{state_size / 1024:.0f}':>10}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.papers, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
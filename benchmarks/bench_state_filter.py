@@ -0,0 +1,104 @@
+"""FilterFinishedIDs 过滤性能基准
+
+构造 100k 条状态（一半已完成）和 10k 个候选ID，对比：
+
+- legacy: 旧实现，每个候选ID都重新解析一次状态文件（按抽样耗时外推）
+- per-item: 逐条调用 is_finished（依赖状态缓存）
+- batched: 一次 is_finished_many 后单趟过滤（JSON / SQLite 后端）
+
+用法:
+    python -m benchmarks.bench_state_filter [--states 100000] [--candidates 10000]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+
+from daily_paper.core.operators.state.pending import (
+    FilterFinishedIDs,
+    IDState,
+    create_state_manager,
+)
+
+
+def _legacy_is_finished(state_file, id: str) -> bool:
+    """旧实现：每次判断都重新读取并解析整个状态文件"""
+    with open(state_file, "r", encoding="utf-8") as f:
+        states = json.load(f)
+    return states.get(id) == IDState.FINISHED.value
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run(num_states: int, num_candidates: int, legacy_samples: int):
+    random.seed(0)
+    ids = [f"2401.{i:05d}v1" for i in range(num_states)]
+    states = {
+        id: IDState.FINISHED if i % 2 == 0 else IDState.PENDING
+        for i, id in enumerate(ids)
+    }
+    # 候选ID一半来自已有状态，一半是新ID
+    candidates = random.sample(ids, num_candidates // 2) + [
+        f"2402.{i:05d}v1" for i in range(num_candidates - num_candidates // 2)
+    ]
+    random.shuffle(candidates)
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        results = {}
+        for backend in ("json", "sqlite"):
+            operator = FilterFinishedIDs(base_dir, f"bench_{backend}", backend=backend)
+            operator.state_manager.update_states(states)
+
+            if backend == "json":
+                state_file = operator.state_manager.state_file
+                sample = candidates[:legacy_samples]
+                _, elapsed = _timed(
+                    lambda: [id for id in sample if not _legacy_is_finished(state_file, id)]
+                )
+                results["json legacy (extrapolated)"] = (
+                    elapsed / len(sample) * num_candidates
+                )
+
+            manager = operator.state_manager
+            expected, elapsed = _timed(
+                lambda: [id for id in candidates if not manager.is_finished(id)]
+            )
+            results[f"{backend} per-item"] = elapsed
+
+            filtered, elapsed = _timed(
+                lambda: asyncio.run(operator.process(candidates))
+            )
+            assert filtered == expected
+            results[f"{backend} batched"] = elapsed
+
+            if backend == "sqlite":
+                manager.close()
+
+    print(f"states={num_states} candidates={num_candidates}")
+    for name, elapsed in results.items():
+        print(f"{name:<30} {elapsed * 1000:>10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--states", type=int, default=100_000)
+    parser.add_argument("--candidates", type=int, default=10_000)
+    parser.add_argument(
+        "--legacy-samples",
+        type=int,
+        default=20,
+        help="旧实现逐条解析文件过慢，只测量这么多候选ID并外推",
+    )
+    args = parser.parse_args()
+    run(args.states, args.candidates, args.legacy_samples)
+
+
+if __name__ == "__main__":
+    main()
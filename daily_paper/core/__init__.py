@@ -1,5 +1,12 @@
 from daily_paper.core.operators.base import Operator, OperatorStatus, OperatorNode
 from daily_paper.core.pipeline import DAGPipeline
+from daily_paper.core.metrics import (
+    MetricsCollector,
+    OperatorMetrics,
+    PipelineRunReport,
+    JsonReportCollector,
+)
+from daily_paper.core.tracing import ChromeTraceCollector, trace_span, traced
 from daily_paper.core.models import Paper
 
 from daily_paper.core.operators.datasource import ArxivSource
@@ -23,6 +30,14 @@ __all__ = [
     "OperatorNode",
     "DAGPipeline",
     "Paper",
+    # 执行统计
+    "MetricsCollector",
+    "OperatorMetrics",
+    "PipelineRunReport",
+    "JsonReportCollector",
+    "ChromeTraceCollector",
+    "trace_span",
+    "traced",
     # 数据源算子
     "ArxivSource",
     # 处理算子
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import pickle
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from daily_paper.core.common.logger import logger
+from daily_paper.core.operators.base import Operator
+
+
+def _json_default(obj: Any) -> Any:
+    """将无法直接序列化为JSON的对象转换为可序列化的形式"""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {"__class__": obj.__class__.__qualname__, **asdict(obj)}
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=repr)
+    return repr(obj)
+
+
+def compute_fingerprint(name: str, operator: Operator, input_data: Any) -> str:
+    """计算算子一次执行的指纹
+
+    指纹由算子名称、算子配置和输入数据共同决定，任意一项变化都会使检查点失效。
+
+    Args:
+        name: 算子名称
+        operator: 算子实例
+        input_data: 输入数据
+
+    Returns:
+        str: 十六进制的 SHA-256 摘要
+    """
+    digest = hashlib.sha256()
+    digest.update(name.encode("utf-8"))
+    digest.update(operator.fingerprint().encode("utf-8"))
+    digest.update(
+        json.dumps(
+            input_data, default=_json_default, sort_keys=True, ensure_ascii=False
+        ).encode("utf-8")
+    )
+    return digest.hexdigest()
+
+
+class CheckpointStore:
+    """算子输出的本地检查点存储
+
+    每个算子只保留最近一次的检查点，文件路径为 {checkpoint_dir}/{name}/{fingerprint}.pkl。
+    """
+
+    def __init__(self, checkpoint_dir: str):
+        """初始化CheckpointStore
+
+        Args:
+            checkpoint_dir: 检查点存储目录
+        """
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+
+    def _node_dir(self, name: str) -> Path:
+        return self.checkpoint_dir / name
+
+    def load(self, name: str, fingerprint: str) -> Tuple[bool, Any]:
+        """读取检查点
+
+        Args:
+            name: 算子名称
+            fingerprint: 执行指纹
+
+        Returns:
+            Tuple[bool, Any]: 是否命中检查点，以及命中时保存的结果
+        """
+        path = self._node_dir(name) / f"{fingerprint}.pkl"
+        if not path.exists():
+            return False, None
+
+        try:
+            with open(path, "rb") as f:
+                return True, pickle.load(f)
+        except Exception as e:
+            logger.warning(f"读取检查点失败，忽略该检查点: {path}: {e}")
+            return False, None
+
+    def save(self, name: str, fingerprint: str, result: Any):
+        """保存检查点，同时删除该算子旧的检查点
+
+        Args:
+            name: 算子名称
+            fingerprint: 执行指纹
+            result: 算子的执行结果
+        """
+        node_dir = self._node_dir(name)
+        node_dir.mkdir(parents=True, exist_ok=True)
+        path = node_dir / f"{fingerprint}.pkl"
+        tmp_path = node_dir / f"{fingerprint}.pkl.tmp"
+
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"保存检查点失败: {path}: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        for old in node_dir.glob("*.pkl"):
+            if old != path:
+                old.unlink(missing_ok=True)
+
+    def clear(self, name: Optional[str] = None):
+        """删除检查点
+
+        Args:
+            name: 算子名称，为 None 时删除所有算子的检查点
+        """
+        node_dirs = [self._node_dir(name)] if name else self.checkpoint_dir.iterdir()
+        for node_dir in node_dirs:
+            if not node_dir.is_dir():
+                continue
+            for path in node_dir.glob("*.pkl*"):
+                path.unlink(missing_ok=True)
@@ -0,0 +1,113 @@
+import json
+from typing import Any
+
+try:
+    import msgpack
+except ImportError:  # msgpack 是可选依赖，只有 msgpack 编码需要
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard 是可选依赖，只有 zstd 压缩需要
+    zstandard = None
+
+
+class Codec:
+    """存储文件的编码方式，在 Python 对象（字典、列表、字符串、数字）和字节之间转换"""
+
+    # 编码名称，例如 "json"、"msgpack+zstd"
+    name: str = ""
+    # 文件扩展名，例如 ".json"、".msgpack.zst"
+    suffix: str = ""
+
+    def encode(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    """紧凑的 UTF-8 JSON，不缩进"""
+
+    name = "json"
+    suffix = ".json"
+
+    def encode(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """MessagePack 二进制编码，需要安装 msgpack"""
+
+    name = "msgpack"
+    suffix = ".msgpack"
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError(
+                "msgpack is required for the msgpack codec, "
+                "install it with `pip install msgpack`"
+            )
+
+    def encode(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+class ZstdCodec(Codec):
+    """在另一种编码的结果上做 zstd 压缩，需要安装 zstandard"""
+
+    def __init__(self, inner: Codec, level: int = 3):
+        """初始化
+
+        Args:
+            inner: 压缩前使用的编码
+            level: zstd 压缩级别
+        """
+        if zstandard is None:
+            raise ImportError(
+                "zstandard is required for zstd compression, "
+                "install it with `pip install zstandard`"
+            )
+        self.inner = inner
+        self.name = f"{inner.name}+zstd"
+        self.suffix = f"{inner.suffix}.zst"
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def encode(self, obj: Any) -> bytes:
+        return self._compressor.compress(self.inner.encode(obj))
+
+    def decode(self, data: bytes) -> Any:
+        return self.inner.decode(self._decompressor.decompress(data))
+
+
+CODECS = ("json", "msgpack", "json+zstd", "msgpack+zstd")
+
+
+def get_codec(name: str) -> Codec:
+    """根据名称创建编码
+
+    Args:
+        name: 编码名称，json、msgpack，加上 "+zstd" 表示再做 zstd 压缩
+
+    Returns:
+        Codec: 编码实例
+
+    Raises:
+        ValueError: 未知的编码名称
+        ImportError: 没有安装编码需要的可选依赖
+    """
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec: {name}, expected one of {CODECS}")
+    base, _, compression = name.partition("+")
+    codec = JsonCodec() if base == "json" else MsgpackCodec()
+    if compression:
+        codec = ZstdCodec(codec)
+    return codec
@@ -0,0 +1,182 @@
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Optional, Union
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+# 获取文件锁的默认超时时间（秒），可以通过 set_default_lock_timeout 修改
+_default_lock_timeout = 30.0
+# 等待文件锁时的轮询间隔（秒）
+_POLL_INTERVAL = 0.05
+
+
+def set_default_lock_timeout(timeout: float):
+    """设置获取文件锁的默认超时时间
+
+    Args:
+        timeout: 超时时间（秒），小于等于 0 表示一直等待
+    """
+    global _default_lock_timeout
+    _default_lock_timeout = timeout
+
+
+def get_default_lock_timeout() -> float:
+    """获取文件锁的默认超时时间"""
+    return _default_lock_timeout
+
+
+class FileLockTimeout(TimeoutError):
+    """在超时时间内没有获取到文件锁"""
+
+
+class FileLock:
+    """基于 flock（Windows 上为 msvcrt.locking）的跨进程建议锁
+
+    同一个实例可以重入，因此读-改-写的方法之间可以互相调用。
+    不同进程（以及同一进程内的不同实例）之间互斥。
+    """
+
+    def __init__(self, path: Union[str, Path], timeout: Optional[float] = None):
+        """初始化文件锁
+
+        Args:
+            path: 锁文件路径，不存在时自动创建
+            timeout: 获取锁的超时时间（秒），为空时使用默认超时时间
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self._thread_lock = threading.RLock()
+        self._fd: Optional[int] = None
+        self._depth = 0
+
+    def _try_lock(self, fd: int) -> bool:
+        try:
+            if os.name == "nt":
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _unlock(self, fd: int):
+        if os.name == "nt":
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """获取锁
+
+        Args:
+            blocking: 为 False 时不等待，锁被占用时直接返回 False
+
+        Returns:
+            bool: 是否获取到锁
+
+        Raises:
+            FileLockTimeout: 等待模式下超时时间内没有获取到锁
+        """
+        timeout = self.timeout if self.timeout is not None else _default_lock_timeout
+        deadline = time.monotonic() + timeout
+        if not blocking:
+            acquired = self._thread_lock.acquire(blocking=False)
+        else:
+            acquired = self._thread_lock.acquire(timeout=timeout if timeout > 0 else -1)
+        if not acquired:
+            if not blocking:
+                return False
+            raise FileLockTimeout(f"Timed out waiting for lock {self.path}")
+        if self._depth > 0:
+            self._depth += 1
+            return True
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            while not self._try_lock(fd):
+                if not blocking:
+                    os.close(fd)
+                    self._thread_lock.release()
+                    return False
+                if timeout > 0 and time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise FileLockTimeout(
+                        f"Timed out after {timeout}s waiting for lock {self.path}"
+                    )
+                time.sleep(_POLL_INTERVAL)
+        except BaseException:
+            self._thread_lock.release()
+            raise
+        self._fd = fd
+        self._depth = 1
+        return True
+
+    def release(self):
+        """释放锁"""
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self._unlock(self._fd)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+        self._thread_lock.release()
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+def fsync_dir(path: Union[str, Path]):
+    """持久化目录项，保证 rename 在崩溃后仍然生效"""
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(
+    path: Union[str, Path], mode: str = "w", encoding: Optional[str] = "utf-8"
+) -> Iterator[IO]:
+    """原子地写入文件
+
+    先写入同目录下的临时文件并 fsync，成功后再 rename 覆盖目标文件，
+    写入过程中崩溃不会留下不完整的目标文件。
+
+    Args:
+        path: 目标文件路径
+        mode: 打开模式，"w" 或 "wb"
+        encoding: 文本模式下的编码
+    """
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with open(fd, mode, encoding=None if "b" in mode else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    fsync_dir(path.parent)
@@ -0,0 +1,104 @@
+import asyncio
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from daily_paper.core.common.logger import logger
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_users = 0
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """获取全局共享的进程池，不存在时创建
+
+    进程数默认等于CPU核数，可以通过环境变量 DAILY_PAPER_PROCESS_POOL_SIZE 调整。
+    使用 spawn 方式启动子进程，避免在多线程的父进程中 fork。
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            max_workers = int(
+                os.environ.get("DAILY_PAPER_PROCESS_POOL_SIZE", os.cpu_count() or 1)
+            )
+            _pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"创建进程池: max_workers={max_workers}")
+        return _pool
+
+
+def acquire_process_pool() -> ProcessPoolExecutor:
+    """声明使用进程池，通常在算子的 setup 中调用
+
+    与 release_process_pool 成对使用，最后一个使用者释放后进程池才会被关闭，
+    因此多个算子、多次执行之间可以共享同一组子进程。
+    """
+    global _pool_users
+    pool = get_process_pool()
+    with _pool_lock:
+        _pool_users += 1
+    return pool
+
+
+def release_process_pool():
+    """释放对进程池的使用，通常在算子的 cleanup 中调用
+
+    最后一个使用者释放时关闭进程池，但不等待子进程退出，
+    在异步算子的 cleanup 中调用也不会阻塞事件循环。已提交的任务仍会执行完。
+    """
+    global _pool, _pool_users
+    with _pool_lock:
+        _pool_users = max(_pool_users - 1, 0)
+        if _pool_users > 0 or _pool is None:
+            return
+        pool, _pool = _pool, None
+    pool.shutdown(wait=False)
+
+
+async def run_cpu_bound(func: Callable, *args) -> Any:
+    """在进程池中执行CPU密集型函数
+
+    func 及其参数和返回值都必须可以被 pickle，因此 func 应该是模块级函数，
+    参数应尽量使用文件路径等轻量数据，而不是大块的内容。
+
+    Args:
+        func: 要执行的函数
+        *args: 函数参数
+
+    Returns:
+        Any: 函数的返回值
+    """
+    # 避免循环导入
+    from daily_paper.core.tracing import trace_span
+
+    loop = asyncio.get_running_loop()
+    with trace_span(getattr(func, "__qualname__", str(func)), process_pool=True):
+        return await loop.run_in_executor(get_process_pool(), func, *args)
+
+
+def cpu_bound(func: Callable) -> Callable:
+    """将模块级函数声明为CPU密集型
+
+    被装饰的函数仍然可以直接同步调用，同时增加一个 run_in_pool 属性，
+    await func.run_in_pool(*args) 会在共享进程池中执行该函数，绕开GIL的限制。
+    """
+
+    async def run_in_pool(*args) -> Any:
+        return await run_cpu_bound(func, *args)
+
+    func.run_in_pool = run_in_pool
+    return func
+
+
+@atexit.register
+def _shutdown_process_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -14,11 +14,42 @@ class Config(YamlConfig):
     arxiv_topic_list: list[str] = []
     arxiv_search_offset: int = 0
     arxiv_search_limit: int = 100
+    # 是否为每个主题单独查询 arXiv，开启后 offset 和 limit 作用于每个主题
+    arxiv_split_topics: bool = False
+    # 同时请求 arXiv API 的连接数，每个连接仍保持 3 秒一次请求
+    arxiv_max_connections: int = 1
+    # 是否增量获取 arXiv 论文：保存每个查询获取到的最新提交时间，之后只获取更新的论文
+    arxiv_incremental: bool = False
+    # 增量获取时重新获取高水位之前多少天内提交的论文，用于补上公布较晚的论文。
+    # 窗口越长越不容易漏掉论文，但每次运行重复获取的论文越多
+    arxiv_watermark_overlap_days: float = 2.0
 
     enable_llm_filter: bool = False
     llm_filter_topic: str = ""
 
     process_batch_size: int = 10
+    # 是否根据运行情况自动调整批次大小，开启后 process_batch_size 作为初始值
+    adaptive_batch_size: bool = False
+    min_process_batch_size: int = 1
+    max_process_batch_size: int = 100
+    # 自动调整批次大小时的进程内存上限（MB），0 表示不限制
+    batch_memory_limit_mb: int = 0
+    # 论文总结的租约时长（秒），大于 0 时各 worker 先认领论文再处理，
+    # 可以在同一个数据目录上并行运行多个 summarize 进程
+    summarize_lease_seconds: int = 0
+    # 认领论文时使用的 worker ID，为空时使用主机名和进程号
+    worker_id: str = ""
+
+    # 是否以流式模式执行流水线
+    enable_streaming: bool = False
+    # 流水线执行统计报告的保存目录，为空时不保存
+    metrics_report_dir: str = ""
+    # Chrome trace 文件的保存路径，为空时不记录
+    trace_output_path: str = ""
+    # 算子检查点的保存目录，为空时不启用检查点
+    checkpoint_dir: str = ""
+    # 批量模式下各算子的分片数，key 为算子名称，例如 {"paper_reader": 4}
+    operator_partitions: dict[str, int] = {}
 
     @classmethod
     def parse(cls, config_path: str):
@@ -5,3 +5,17 @@ from .base import YamlConfig
 class StorageConfig(YamlConfig):
     storage_type: str = "local"
     base_path: str = "./data"
+    # 论文等数据的存储格式：json（单个文件）、segments（追加式 JSONL 段）
+    # 或 parquet（按 update_date 分区的列式存储，需要安装 pyarrow）
+    storage_format: str = "json"
+    # 是否为论文存储维护 update_date、category 和作者的二级索引
+    secondary_index: bool = False
+    # json 存储格式和 json 状态后端的文件编码：json、msgpack、json+zstd 或 msgpack+zstd，
+    # msgpack 和 zstd 分别需要安装 msgpack 和 zstandard
+    codec: str = "json"
+    # 处理状态的存储后端：json、sqlite 或 log（追加日志）
+    state_backend: str = "json"
+    # 查询已处理ID时是否先经过布隆过滤器，适合历史状态很多的命名空间
+    state_bloom_filter: bool = False
+    # 多个进程同时读写状态和存储文件时获取文件锁的超时时间（秒），0 表示一直等待
+    lock_timeout: float = 30
@@ -0,0 +1,237 @@
+import json
+import os
+import sys
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from daily_paper.core.common.logger import logger
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块
+    resource = None
+
+
+def get_peak_rss_bytes() -> Optional[int]:
+    """获取当前进程的峰值常驻内存（字节），不支持的平台返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 上 ru_maxrss 的单位是 KB，macOS 上是字节
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def get_current_rss_bytes() -> Optional[int]:
+    """获取当前进程的常驻内存（字节），目前只支持 Linux，其他平台返回 None"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def count_items(data: Any) -> Optional[int]:
+    """统计数据中的元素个数，无法统计时返回 None"""
+    if data is None or isinstance(data, (str, bytes)):
+        return None
+    try:
+        return len(data)
+    except TypeError:
+        return None
+
+
+@dataclass
+class OperatorMetrics:
+    """单个算子一次执行的统计信息
+
+    Attributes:
+        name: 算子名称
+        operator: 算子类名
+        status: 执行状态
+        started_at: 开始执行的时间戳
+        wall_time_sec: 执行耗时（秒）
+        items_in: 输入的元素个数
+        items_out: 输出的元素个数
+        peak_rss_delta_bytes: 执行期间进程峰值内存的增长量，
+            由于是进程级别的统计，并行执行的算子会互相影响
+        exception_count: 执行过程中记录的异常次数
+        error: 导致算子失败的错误信息
+        cached: 结果是否直接来自检查点
+    """
+
+    name: str
+    operator: str
+    status: str = "PENDING"
+    started_at: Optional[float] = None
+    wall_time_sec: float = 0.0
+    items_in: Optional[int] = None
+    items_out: Optional[int] = None
+    peak_rss_delta_bytes: Optional[int] = None
+    exception_count: int = 0
+    error: Optional[str] = None
+    cached: bool = False
+
+    _start_perf: float = field(default=0.0, repr=False)
+    _start_rss: Optional[int] = field(default=None, repr=False)
+
+    @property
+    def items_per_sec(self) -> Optional[float]:
+        """每秒处理的元素个数，优先按输入统计，没有输入的算子按输出统计"""
+        items = self.items_in if self.items_in is not None else self.items_out
+        if items is None or self.wall_time_sec <= 0:
+            return None
+        return items / self.wall_time_sec
+
+    def start(self, items_in: Optional[int] = None):
+        """记录开始执行"""
+        self.status = "RUNNING"
+        self.started_at = time.time()
+        self.items_in = items_in
+        self._start_perf = time.perf_counter()
+        self._start_rss = get_peak_rss_bytes()
+
+    def finish(
+        self,
+        status: str,
+        items_out: Optional[int] = None,
+        error: Optional[BaseException] = None,
+    ):
+        """记录执行结束"""
+        self.status = status
+        self.items_out = items_out
+        if error is not None:
+            self.exception_count += 1
+            self.error = f"{error.__class__.__name__}: {error}"
+        self.wall_time_sec = time.perf_counter() - self._start_perf
+        end_rss = get_peak_rss_bytes()
+        if self._start_rss is not None and end_rss is not None:
+            self.peak_rss_delta_bytes = end_rss - self._start_rss
+
+    def record_exception(self, error: BaseException):
+        """记录一次被算子内部处理的异常"""
+        self.exception_count += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {k: v for k, v in asdict(self).items() if not k.startswith("_")}
+        data["items_per_sec"] = self.items_per_sec
+        return data
+
+
+@dataclass
+class PipelineRunReport:
+    """一次流水线执行的统计报告
+
+    Attributes:
+        mode: 执行模式，batch 或 stream
+        status: 执行状态
+        started_at: 开始执行的时间戳
+        wall_time_sec: 总耗时（秒）
+        operators: 每个算子的统计信息
+    """
+
+    mode: str
+    status: str = "RUNNING"
+    started_at: float = field(default_factory=time.time)
+    wall_time_sec: float = 0.0
+    operators: Dict[str, OperatorMetrics] = field(default_factory=dict)
+
+    _start_perf: float = field(default_factory=time.perf_counter, repr=False)
+
+    def finish(self, status: str):
+        """记录执行结束"""
+        self.status = status
+        self.wall_time_sec = time.perf_counter() - self._start_perf
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "status": self.status,
+            "started_at": self.started_at,
+            "wall_time_sec": self.wall_time_sec,
+            "operators": {
+                name: metrics.to_dict() for name, metrics in self.operators.items()
+            },
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+
+    def save(self, path: str):
+        """将报告保存为JSON文件"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+
+
+class MetricsCollector:
+    """流水线执行统计的回调接口
+
+    子类可以重写需要的方法来收集自定义的统计信息，
+    回调中抛出的异常只会被记录，不会影响流水线的执行。
+    """
+
+    def on_pipeline_start(self, report: PipelineRunReport):
+        """流水线开始执行时调用"""
+        pass
+
+    def on_operator_start(self, metrics: OperatorMetrics):
+        """算子开始执行时调用"""
+        pass
+
+    def on_operator_end(self, metrics: OperatorMetrics):
+        """算子执行结束（成功或失败）时调用"""
+        pass
+
+    def on_pipeline_end(self, report: PipelineRunReport):
+        """流水线执行结束（成功或失败）时调用"""
+        pass
+
+
+class JsonReportCollector(MetricsCollector):
+    """在每次流水线执行结束后将统计报告保存为JSON文件"""
+
+    def __init__(self, output_dir: str, prefix: str = "pipeline"):
+        """初始化JsonReportCollector
+
+        Args:
+            output_dir: 报告保存目录
+            prefix: 报告文件名前缀
+        """
+        self.output_dir = Path(output_dir)
+        self.prefix = prefix
+
+    def on_pipeline_end(self, report: PipelineRunReport):
+        timestamp = datetime.fromtimestamp(report.started_at).strftime(
+            "%Y%m%d_%H%M%S_%f"
+        )
+        report.save(str(self.output_dir / f"{self.prefix}_{timestamp}.json"))
+
+
+def notify_collectors(collectors: List[MetricsCollector], hook: str, *args):
+    """依次调用所有回调，回调中的异常只记录日志"""
+    for collector in collectors:
+        try:
+            getattr(collector, hook)(*args)
+        except Exception as e:
+            logger.warning(f"MetricsCollector {collector} 执行 {hook} 失败: {e}")
+
+
+# 当前正在执行的算子的统计信息，供算子内部记录被捕获的异常
+_current_metrics: ContextVar[Optional[OperatorMetrics]] = ContextVar(
+    "current_operator_metrics", default=None
+)
+
+
+def record_exception(error: BaseException):
+    """在当前执行的算子的统计信息中记录一次异常
+
+    用于算子内部捕获并处理的异常（例如单篇论文下载失败），
+    不在流水线中执行时调用不会有任何效果。
+    """
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.record_exception(error)
@@ -1,9 +1,15 @@
+import sys
+from collections.abc import Sequence
 from datetime import date
-from typing import Optional
-from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Union
+from dataclasses import dataclass, field, fields
 
 
-@dataclass
+# 取值重复度高的字段，构造时驻留字符串，相同取值的论文共享同一个字符串对象
+_INTERNED_FIELDS = ("category", "publish_date", "update_date")
+
+
+@dataclass(slots=True)
 class Paper:
     """论文数据模型"""
 
@@ -16,7 +22,105 @@ class Paper:
     publish_date: str  # 发布日期
     update_date: str  # 更新日期
 
+    def __post_init__(self):
+        for name in _INTERNED_FIELDS:
+            value = getattr(self, name)
+            if type(value) is str:
+                setattr(self, name, sys.intern(value))
 
-@dataclass
+
+@dataclass(slots=True)
 class PaperWithSummary(Paper):
     summary: str
+
+
+@dataclass
+class PaperBatch(Sequence):
+    """列式存储的一批论文
+
+    每个字段保存为一个列表（struct-of-arrays），不为每篇论文单独保存对象，
+    持有大量论文时内存占用和 GC 压力更小。实现了 Sequence 接口，
+    按下标或迭代访问时临时构造 paper_cls 对象，切片和 select 返回新的 PaperBatch，
+    可以直接传给按 List[Paper] 处理数据的算子。
+
+    Attributes:
+        paper_cls: 论文的数据类型，Paper 或 PaperWithSummary
+        columns: 字段名到该字段所有取值的映射，各列长度相同
+    """
+
+    paper_cls: type = Paper
+    columns: Dict[str, List[Any]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for name in self.field_names:
+            self.columns.setdefault(name, [])
+        if len({len(column) for column in self.columns.values()}) > 1:
+            raise ValueError("All columns of a PaperBatch must have the same length")
+
+    @classmethod
+    def from_papers(cls, papers: Iterable[Paper], paper_cls: type = Paper) -> "PaperBatch":
+        """从论文对象构造
+
+        Args:
+            papers: 论文对象，可以是只能遍历一次的迭代器
+            paper_cls: 论文的数据类型
+
+        Returns:
+            PaperBatch: 包含这些论文的批次
+        """
+        batch = cls(paper_cls)
+        batch.extend(papers)
+        return batch
+
+    @property
+    def field_names(self) -> List[str]:
+        return [f.name for f in fields(self.paper_cls)]
+
+    def append(self, paper: Paper):
+        """在末尾加入一篇论文"""
+        for name, column in self.columns.items():
+            column.append(getattr(paper, name))
+
+    def extend(self, papers: Iterable[Paper]):
+        """在末尾加入多篇论文"""
+        for paper in papers:
+            self.append(paper)
+
+    def column(self, name: str) -> List[Any]:
+        """获取一个字段的所有取值，返回内部列表，调用方不应修改"""
+        return self.columns[name]
+
+    def select(self, mask: Iterable[bool]) -> "PaperBatch":
+        """按掩码筛选论文
+
+        Args:
+            mask: 与批次等长的布尔序列，为 True 的论文会被保留
+
+        Returns:
+            PaperBatch: 筛选后的新批次
+        """
+        indices = [i for i, keep in enumerate(mask) if keep]
+        return PaperBatch(
+            self.paper_cls,
+            {name: [column[i] for i in indices] for name, column in self.columns.items()},
+        )
+
+    def to_papers(self) -> List[Paper]:
+        """转换为论文对象列表"""
+        return list(self)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), []))
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Paper, "PaperBatch"]:
+        if isinstance(index, slice):
+            return PaperBatch(
+                self.paper_cls,
+                {name: column[index] for name, column in self.columns.items()},
+            )
+        return self.paper_cls(**{name: column[index] for name, column in self.columns.items()})
+
+    def __iter__(self) -> Iterator[Paper]:
+        names = list(self.columns)
+        for values in zip(*self.columns.values()):
+            yield self.paper_cls(**dict(zip(names, values)))
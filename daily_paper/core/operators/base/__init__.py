@@ -3,5 +3,12 @@ from daily_paper.core.operators.base.operator import (
     OperatorStatus,
     OperatorNode,
 )
+from daily_paper.core.operators.base.stream import iterate_items, map_as_completed
 
-__all__ = ["Operator", "OperatorStatus", "OperatorNode"]
+__all__ = [
+    "Operator",
+    "OperatorStatus",
+    "OperatorNode",
+    "iterate_items",
+    "map_as_completed",
+]
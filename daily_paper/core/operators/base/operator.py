@@ -1,6 +1,7 @@
+import json
 from enum import Enum
-from typing import Any, Optional, Set
-from dataclasses import dataclass
+from typing import Any, AsyncGenerator, AsyncIterator, List, Optional, Set
+from dataclasses import dataclass, field
 
 
 class OperatorStatus(Enum):
@@ -17,8 +18,22 @@ class Operator:
 
     所有具体的算子都应该继承这个基类并实现process方法。
     算子应该是无状态的，所有状态应该通过输入参数传入和通过返回值传出。
+
+    Attributes:
+        checkpointable: 算子的输出是否可以保存为检查点并在输入不变时复用。
+            只有结果完全由输入和配置决定、且没有外部副作用的算子才应该开启
+        fusible: 算子是否是轻量的纯函数式处理，可以和相邻的 fusible 算子
+            合并在同一个任务中执行
+        partitionable: 算子是否可以对输入序列分片并发处理。要求序列中的元素
+            互相独立，输出为列表，且对各个分片的输出按顺序拼接后与整体处理的结果一致。
+            每个分片由 replicate() 创建的独立实例处理，只有受限于单个实例的连接数、
+            线程数等资源的算子才能从分片中获益；在同一个锁下读写文件的算子不应该开启
     """
 
+    checkpointable: bool = False
+    fusible: bool = False
+    partitionable: bool = False
+
     async def process(self, input_data: Any) -> Any:
         """处理输入数据并返回结果
 
@@ -36,6 +51,72 @@ class Operator:
         """
         raise NotImplementedError("Operator must implement process method")
 
+    async def stream_process(
+        self, input_stream: AsyncIterator[Any]
+    ) -> AsyncGenerator[Any, None]:
+        """流式处理输入数据
+
+        在流式执行模式下由 DAGPipeline 调用。默认实现会先收集完整的输入，
+        再调用 process 并逐个输出结果。能够逐条处理数据的算子应该重写这个方法，
+        边读取输入边输出结果，以降低首个结果的延迟和内存占用。
+
+        Args:
+            input_stream: 上游算子输出的异步迭代器
+
+        Yields:
+            Any: 处理后的单个结果
+        """
+        items = [item async for item in input_stream]
+        for result in await self.process(items):
+            yield result
+
+    def replicate(self) -> "Operator":
+        """创建一个配置相同、资源独立的算子实例
+
+        分片执行时，除第一个分片外，每个分片使用一个由这个方法创建的实例，
+        由流水线负责调用它的 setup 和 cleanup。partitionable 的算子必须重写这个方法，
+        让新实例拥有自己的连接池、线程池和并发限制，否则分片不会带来额外的吞吐量。
+
+        Returns:
+            Operator: 新的算子实例
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} must implement replicate to be partitioned"
+        )
+
+    def should_checkpoint(self, result: Any) -> bool:
+        """判断一次执行的输出是否可以保存为检查点
+
+        算子把部分失败吞掉、以占位结果输出时，应该重写这个方法并对这样的输出返回 False，
+        否则恢复执行时会复用失败的结果，这些数据不会再被重试。
+
+        Args:
+            result: process 的输出
+
+        Returns:
+            bool: 是否保存检查点，默认为 True
+        """
+        return True
+
+    def fingerprint(self) -> str:
+        """返回算子配置的指纹，用于判断检查点是否仍然有效
+
+        默认使用类名和实例属性中的简单配置（字符串、数字、布尔值）。
+        如果算子的行为还取决于其他配置，子类应该重写这个方法。
+
+        Returns:
+            str: 算子配置的指纹
+        """
+        config = {
+            k: v
+            for k, v in vars(self).items()
+            if isinstance(v, (str, int, float, bool, type(None)))
+        }
+        return (
+            f"{self.__class__.__module__}.{self.__class__.__qualname__}:"
+            f"{json.dumps(config, sort_keys=True, ensure_ascii=False)}"
+        )
+
     async def setup(self):
         """算子初始化方法
 
@@ -44,6 +125,15 @@ class Operator:
         """
         pass
 
+    async def commit(self):
+        """提交算子在本次执行中产生的状态
+
+        在流水线的所有算子都成功执行后调用，执行失败时不会调用。
+        只应在整个流水线成功后才生效的状态（例如数据源的读取进度）
+        应该在 process 中暂存，在这里持久化，这样失败后重新执行时不会丢失数据。
+        """
+        pass
+
     async def cleanup(self):
         """算子清理方法
 
@@ -74,14 +164,18 @@ class OperatorNode:
         status: 算子的执行状态
         result: 算子的执行结果
         error: 执行过程中的错误信息
+        partitions: 批量模式下将输入序列切分成的分片数
+        replicas: 分片执行时其余分片使用的算子实例，由流水线按需创建
     """
 
     operator: Operator
     name: str
     dependencies: Set[str]
+    partitions: int = 1
     status: OperatorStatus = OperatorStatus.PENDING
     result: Optional[Any] = None
     error: Optional[Exception] = None
+    replicas: List[Operator] = field(default_factory=list)
 
     def __str__(self) -> str:
         """返回节点的字符串表示"""
@@ -0,0 +1,71 @@
+import asyncio
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Iterable
+
+
+async def iterate_items(items: Iterable[Any]) -> AsyncGenerator[Any, None]:
+    """将普通的可迭代对象包装为异步迭代器
+
+    Args:
+        items: 可迭代对象，None 表示空流
+
+    Yields:
+        Any: 逐个输出的元素
+    """
+    if items is None:
+        return
+    for item in items:
+        yield item
+
+
+async def map_as_completed(
+    input_stream: AsyncIterator[Any],
+    func: Callable[[Any], Awaitable[Any]],
+    concurrency: int,
+) -> AsyncGenerator[Any, None]:
+    """对输入流中的每个元素并发执行异步函数，按完成顺序输出结果
+
+    同时执行的任务数不超过 concurrency，达到上限后不再从输入流中读取新元素，
+    从而把背压传递给上游。
+
+    Args:
+        input_stream: 输入的异步迭代器
+        func: 对单个元素执行的异步函数
+        concurrency: 最大并发任务数
+
+    Yields:
+        Any: func 的执行结果，顺序为完成顺序而不是输入顺序
+    """
+    iterator = input_stream.__aiter__()
+    pending = set()
+    next_item = None
+    exhausted = False
+
+    try:
+        while True:
+            if not exhausted and next_item is None and len(pending) < concurrency:
+                next_item = asyncio.ensure_future(iterator.__anext__())
+
+            waiting = set(pending)
+            if next_item is not None:
+                waiting.add(next_item)
+            if not waiting:
+                break
+
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is next_item:
+                    next_item = None
+                    try:
+                        item = task.result()
+                    except StopAsyncIteration:
+                        exhausted = True
+                        continue
+                    pending.add(asyncio.ensure_future(func(item)))
+                else:
+                    pending.discard(task)
+                    yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if next_item is not None:
+            next_item.cancel()
@@ -1,92 +1,129 @@
-from typing import Any, List, AsyncGenerator
-import arxiv
+from typing import Any, Dict, List, AsyncGenerator, Optional
 import asyncio
 from daily_paper.core.operators.base import Operator
+from daily_paper.core.operators.datasource.arxiv_api import (
+    ARXIV_API_URL,
+    ARXIV_URL,
+    ArxivAPIClient,
+    QueryWatermark,
+)
+from daily_paper.core.operators.datasource.watermark import WatermarkStore
 from daily_paper.core.models import Paper
 from daily_paper.core.common.logger import logger
 
-ARXIV_URL = "http://arxiv.org/"
-
-
-def get_authors(authors, first_author=False):
-    if first_author:
-        return str(authors[0])  # 显式转换为字符串
-    return ", ".join(str(author) for author in authors)  # 确保所有元素都是字符串
-
 
 class ArxivSource(Operator):
-    """从Arxiv获取论文数据的算子"""
-
-    def __init__(self, topic: str | List[str], search_offset: int = 0, search_limit: int = 100, should_retry_when_empty: bool = False):
+    """从Arxiv获取论文数据的算子
+
+    通过 ArxivAPIClient 异步请求 arXiv API 并增量解析返回的 Atom feed，
+    等待网络时不会阻塞事件循环。
+
+    默认把所有主题用 OR 连接成一个查询并逐页获取。开启 split_topics 或 max_connections
+    大于 1 时使用并发抓取模式：每个主题单独查询（split_topics），各页作为独立请求并发执行，
+    结果按论文ID去重，此时 search_offset 和 search_limit 作用于每个查询。
+
+    设置 watermark_dir 后增量获取：每个查询保存一个高水位（获取到的最新论文的提交时间），
+    之后只获取比它更新的论文，翻页越过高水位时立即停止。新的高水位暂存在算子中，
+    在流水线成功执行后由 commit() 持久化，执行失败时下次运行会重新获取这些论文。
+    新论文超过 search_limit、在越过高水位之前就停止时，高水位不前进。
+    arXiv 公布论文有延迟，提交时间早于高水位的论文仍可能新出现，因此每次还会重新获取
+    高水位之前 watermark_overlap_days 天内的论文，输出中会包含上次已经获取过的论文，
+    需要由下游（例如 FilterFinishedIDs）按论文ID去重。
+    """
+
+    def __init__(
+        self,
+        topic: str | List[str],
+        search_offset: int = 0,
+        search_limit: int = 100,
+        should_retry_when_empty: bool = False,
+        page_size: int = 100,
+        request_delay_seconds: float = 3.0,
+        api_url: str = ARXIV_API_URL,
+        split_topics: bool = False,
+        max_connections: int = 1,
+        watermark_dir: Optional[str] = None,
+        watermark_namespace: str = "arxiv",
+        watermark_overlap_days: float = 2.0,
+    ):
         """初始化ArxivSource
 
         Args:
             topic: 要搜索的主题，可以是单个字符串或字符串列表。如果是列表，将使用 OR 连接进行搜索
+            search_offset: 跳过的结果数
+            search_limit: 最多获取的论文数
+            should_retry_when_empty: 没有获取到论文时是否重试
+            page_size: 每次请求 arXiv API 获取的论文数
+            request_delay_seconds: 相邻两次请求 arXiv API 的最小间隔（秒）
+            api_url: arXiv API 查询接口地址
+            split_topics: 是否为每个主题单独查询
+            max_connections: 同时进行的请求数，每个连接仍遵守 request_delay_seconds 的间隔
+            watermark_dir: 高水位的保存目录，为空时不增量获取
+            watermark_namespace: 高水位的命名空间，使用同一命名空间的数据源共享高水位
+            watermark_overlap_days: 增量获取时重新获取高水位之前多少天内提交的论文，
+                用于补上公布较晚的论文，重复的论文需要由下游去重
         """
+        topics = topic if isinstance(topic, list) else [topic]
         if isinstance(topic, list):
             self.topic = " OR ".join(f'"{t}"' for t in topic)
         else:
             self.topic = f'"{topic}"' if " OR " not in topic else topic
+        if split_topics:
+            self.queries = [t if " OR " in t else f'"{t}"' for t in topics]
+        else:
+            self.queries = [self.topic]
+        self.harvesting = split_topics or max_connections > 1
         self.arxiv_max_results = search_offset + search_limit
         self.search_offset = search_offset
         self.search_limit = search_limit
         self.should_retry_when_empty = should_retry_when_empty
         self.max_retries = 10
         self.retry_interval_sec = 3
+        self.client = ArxivAPIClient(
+            base_url=api_url,
+            page_size=page_size,
+            delay_seconds=request_delay_seconds,
+            max_connections=max_connections,
+        )
+        self.watermark_store = (
+            WatermarkStore(watermark_dir, watermark_namespace) if watermark_dir else None
+        )
+        self.watermark_overlap_seconds = watermark_overlap_days * 86400
+        # 本次运行各查询的高水位，commit 时持久化
+        self._watermarks: Dict[str, QueryWatermark] = {}
 
         logger.info(
             f"初始化 ArxivSource: topic={self.topic}, max_results={self.arxiv_max_results}, search_offset={self.search_offset}, search_limit={self.search_limit}"
         )
-    
-    def process_paper(self, result: arxiv.Result) -> Paper:
-        paper_id = result.get_short_id()
-        paper_title = result.title
-        paper_url = result.entry_id
-        paper_abstract = result.summary.replace("\n", " ")
-        paper_authors = get_authors(result.authors)
-        primary_category = result.primary_category
-        publish_time = result.published.date()
-        update_time = result.updated.date()
-        comments = result.comment
-
-        # eg: 2108.09112v1 -> 2108.09112
-        ver_pos = paper_id.find("v")
-        if ver_pos == -1:
-            paper_key = paper_id
-        else:
-            paper_key = paper_id[0:ver_pos]
-        paper_url = ARXIV_URL + "abs/" + paper_key
-
-        arxiv_paper = Paper(
-            id=paper_key,
-            title=paper_title,
-            url=paper_url,
-            abstract=paper_abstract,
-            authors=paper_authors,
-            category=primary_category,
-            publish_date=publish_time.strftime("%Y-%m-%d"),
-            update_date=update_time.strftime("%Y-%m-%d"),
-        )
-        return arxiv_paper
-    
-    async def process_once(self) -> List[Paper]:
-        paper_list = []
 
-        client = arxiv.Client(num_retries=100)
-        search = arxiv.Search(
-            query=self.topic,
-            max_results=self.arxiv_max_results,
-            sort_by=arxiv.SortCriterion.SubmittedDate,
+    def _results(self) -> AsyncGenerator[Paper, None]:
+        self._watermarks = {}
+        if self.watermark_store is not None:
+            saved = self.watermark_store.load()
+            self._watermarks = {
+                query: QueryWatermark(saved.get(query), self.watermark_overlap_seconds)
+                for query in self.queries
+            }
+            logger.info(f"增量获取 arXiv 论文，高水位: {saved}")
+
+        if self.harvesting:
+            return self.client.harvest(
+                self.queries,
+                offset=self.search_offset,
+                max_results=self.search_limit,
+                sort_by="submittedDate",
+                watermarks=self._watermarks,
+            )
+        return self.client.results(
+            self.topic,
+            offset=self.search_offset,
+            max_results=self.search_limit,
+            sort_by="submittedDate",
+            watermark=self._watermarks.get(self.topic),
         )
 
-        for result in client.results(search, offset=self.search_offset):
-            arxiv_paper = self.process_paper(result)
-            paper_list.append(arxiv_paper)
-
-            if len(paper_list) >= self.search_limit:
-                break
-
-        return paper_list
+    async def process_once(self) -> List[Paper]:
+        return [paper async for paper in self._results()]
 
     async def process(self, _: Any) -> List[Paper]:
         """从Arxiv获取论文数据
@@ -101,7 +138,8 @@ class ArxivSource(Operator):
             paper_list = await self.process_once()
             if len(paper_list) > 0:
                 break
-            if not self.should_retry_when_empty:
+            # 增量获取时没有新论文是正常情况，不需要重试
+            if not self.should_retry_when_empty or self.watermark_store is not None:
                 break
             logger.info(f"从 Arxiv 获取论文数据失败，重试第 {_ + 1} 次")
             await asyncio.sleep(self.retry_interval_sec)
@@ -110,19 +148,29 @@ class ArxivSource(Operator):
         return paper_list
     
     async def stream_process(self, _: Any) -> AsyncGenerator[Paper, None]:
-        client = arxiv.Client(num_retries=100)
-        search = arxiv.Search(
-            query=self.topic,
-            max_results=self.arxiv_max_results,
-            sort_by=arxiv.SortCriterion.SubmittedDate,
-        )
-
-        total_count = 0
-
-        for result in client.results(search, offset=self.search_offset):
-            arxiv_paper = self.process_paper(result)
-            yield arxiv_paper
+        """流式获取论文数据，每解析出一篇论文就立即输出
 
-            total_count += 1
-            if total_count >= self.search_limit:
-                break
+        Yields:
+            Paper: 论文
+        """
+        async for paper in self._results():
+            yield paper
+
+    async def commit(self):
+        """持久化本次运行各查询的高水位"""
+        if self.watermark_store is None:
+            return
+        for query, watermark in self._watermarks.items():
+            if watermark.truncated and watermark.since is not None:
+                logger.warning(
+                    f"arXiv 查询 {query} 的新论文超过了 search_limit={self.search_limit}，"
+                    f"高水位保持为 {watermark.since}，可以调大 search_limit"
+                )
+        watermarks = {
+            query: watermark.next_since
+            for query, watermark in self._watermarks.items()
+            if watermark.next_since
+        }
+        if watermarks:
+            self.watermark_store.update(watermarks)
+            logger.info(f"更新 arXiv 高水位: {watermarks}")
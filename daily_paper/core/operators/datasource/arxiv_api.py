@@ -0,0 +1,515 @@
+import asyncio
+import re
+import time
+from contextlib import aclosing
+from datetime import datetime, timedelta
+from typing import AsyncGenerator, Dict, List, Optional, Tuple
+from xml.etree.ElementTree import Element, ParseError, XMLPullParser
+
+import aiohttp
+
+from daily_paper.core.common.logger import logger
+from daily_paper.core.models import Paper
+
+ARXIV_URL = "http://arxiv.org/"
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_ARXIV = "{http://arxiv.org/schemas/atom}"
+_OPENSEARCH = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+_VERSION_PATTERN = re.compile(r"v\d+$")
+
+# 按日期排序时，排序字段对应的 entry 时间字段
+_SORT_TIMESTAMP_FIELDS = {"submittedDate": "published", "lastUpdatedDate": "updated"}
+
+
+class ArxivAPIError(RuntimeError):
+    """arXiv API 请求在重试后仍然失败"""
+
+
+def paper_key(entry_id: str) -> str:
+    """从条目ID中提取不带版本号的论文ID
+
+    例如 http://arxiv.org/abs/2108.09112v1 -> 2108.09112
+    """
+    short_id = entry_id.split("/abs/")[-1]
+    return _VERSION_PATTERN.sub("", short_id)
+
+
+def _text(entry: Element, tag: str) -> str:
+    return entry.findtext(tag) or ""
+
+
+def entry_to_paper(entry: Element) -> Paper:
+    """把 Atom feed 中的一个 entry 元素转换为 Paper"""
+    key = paper_key(_text(entry, f"{_ATOM}id").strip())
+    primary_category = entry.find(f"{_ARXIV}primary_category")
+    return Paper(
+        id=key,
+        title=" ".join(_text(entry, f"{_ATOM}title").split()),
+        url=ARXIV_URL + "abs/" + key,
+        abstract=_text(entry, f"{_ATOM}summary").strip().replace("\n", " "),
+        authors=", ".join(
+            (author.findtext(f"{_ATOM}name") or "").strip()
+            for author in entry.findall(f"{_ATOM}author")
+        ),
+        category=primary_category.get("term", "") if primary_category is not None else "",
+        # 时间格式为 2024-01-01T12:00:00Z，取 UTC 日期
+        publish_date=_text(entry, f"{_ATOM}published").strip()[:10],
+        update_date=_text(entry, f"{_ATOM}updated").strip()[:10],
+    )
+
+
+class AtomFeedParser:
+    """增量解析 arXiv API 返回的 Atom feed
+
+    每收到一段响应内容就调用 feed，返回其中已经完整的 entry 转换得到的论文，
+    不需要等待整个响应下载完成；已解析的 entry 会从文档树中移除，内存占用与页大小无关。
+    """
+
+    def __init__(self, timestamp_field: str = "published"):
+        """初始化解析器
+
+        Args:
+            timestamp_field: 记录到 timestamps 中的 entry 时间字段，published 或 updated
+        """
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._root: Optional[Element] = None
+        self._timestamp_tag = f"{_ATOM}{timestamp_field}"
+        # feed 中的 opensearch:totalResults，解析到之前为 None
+        self.total_results: Optional[int] = None
+        # 论文ID到完整时间戳的映射，Paper 中的日期只精确到天
+        self.timestamps: Dict[str, str] = {}
+
+    def feed(self, data: bytes) -> List[Paper]:
+        """输入一段响应内容
+
+        Args:
+            data: 响应内容的一部分
+
+        Returns:
+            List[Paper]: 这段内容中解析完成的论文
+        """
+        self._parser.feed(data)
+        papers = []
+        for event, element in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = element
+                continue
+            if element.tag == f"{_ATOM}entry":
+                paper = entry_to_paper(element)
+                self.timestamps[paper.id] = _text(element, self._timestamp_tag).strip()
+                papers.append(paper)
+                self._root.remove(element)
+            elif element.tag == f"{_OPENSEARCH}totalResults":
+                self.total_results = int(element.text or 0)
+        return papers
+
+    def close(self):
+        self._parser.close()
+
+
+class TokenBucket:
+    """异步令牌桶限流器
+
+    桶中最多 capacity 个令牌，每 refill_seconds 补充一个，每次请求前取走一个令牌。
+    多个连接共享同一个令牌桶时，capacity 取连接数、refill_seconds 取单连接请求间隔除以连接数，
+    即可让平均每个连接每个间隔只发出一次请求。
+    """
+
+    def __init__(self, capacity: int = 1, refill_seconds: float = 3.0):
+        """初始化令牌桶
+
+        Args:
+            capacity: 桶的容量，也是允许的最大突发请求数
+            refill_seconds: 补充一个令牌需要的时间（秒），不大于 0 时不限流
+        """
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """取走一个令牌，桶为空时等待补充"""
+        if self.refill_seconds <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) / self.refill_seconds
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.refill_seconds)
+
+
+def _shift_timestamp(timestamp: str, seconds: float) -> str:
+    """把 Atom feed 中的 ISO 8601 时间戳移动若干秒，保持原来的格式以便按字符串比较"""
+    utc = timestamp.endswith("Z")
+    shifted = datetime.fromisoformat(timestamp[:-1] + "+00:00" if utc else timestamp)
+    shifted += timedelta(seconds=seconds)
+    if utc:
+        return shifted.strftime("%Y-%m-%dT%H:%M:%SZ")
+    return shifted.isoformat()
+
+
+class QueryWatermark:
+    """一个查询的高水位
+
+    按日期降序获取时，时间戳不晚于 cutoff 的论文在之前的运行中已经获取过，
+    遇到第一篇这样的论文就可以停止翻页。latest 记录本次运行输出的最新时间戳，
+    由调用方在处理成功后持久化，作为下一次运行的 since。
+
+    arXiv 的论文在提交之后才公布，审核延迟或补发的论文的提交时间可能早于已经看到的论文，
+    严格以 since 为界会永久漏掉它们。overlap_seconds 让 cutoff 比 since 提前一段时间，
+    重新获取这段时间内的论文，由下游按论文ID去重（例如 FilterFinishedIDs）。
+    窗口越长，能补上的延迟越久，但每次运行重复获取的论文和请求也越多。
+
+    获取的结果数达到上限时还没有越过 cutoff（truncated），更早的新论文没有获取，
+    此时高水位不前进（next_since 仍为 since），否则这些论文会落在新的高水位之后，
+    重叠窗口也补不回来。没有 since 的首次运行本来就只获取最新的结果，高水位照常前进。
+
+    Attributes:
+        since: 上次运行保存的高水位，为空时获取全部结果
+        cutoff: 停止翻页的时间戳，即 since 减去重叠窗口
+        latest: 目前为止看到的最新时间戳，不会早于 since
+        truncated: 是否因为结果数上限在越过 cutoff 之前停止
+    """
+
+    def __init__(self, since: Optional[str] = None, overlap_seconds: float = 0):
+        """初始化
+
+        Args:
+            since: 上次运行保存的高水位
+            overlap_seconds: 重叠窗口（秒），提交时间在 since 之前这段时间内的论文会重新获取
+        """
+        self.since = since
+        self.latest = since
+        self.cutoff = since
+        self.truncated = False
+        if since is not None and overlap_seconds > 0:
+            try:
+                self.cutoff = _shift_timestamp(since, -overlap_seconds)
+            except ValueError:
+                logger.warning(f"无法解析高水位 {since}，不使用重叠窗口")
+
+    def crossed(self, timestamp: str) -> bool:
+        """时间戳是否已经不晚于停止翻页的时间戳"""
+        return self.cutoff is not None and timestamp <= self.cutoff
+
+    @property
+    def next_since(self) -> Optional[str]:
+        """下一次运行的高水位，已有高水位而结果被截断时不前进"""
+        if self.truncated and self.since is not None:
+            return self.since
+        return self.latest
+
+    def observe(self, timestamp: str):
+        """记录一篇输出的论文的时间戳"""
+        if self.latest is None or timestamp > self.latest:
+            self.latest = timestamp
+
+
+class _PageState:
+    """一页请求的进度，重试时用于跳过已经输出的论文"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_results: Optional[int] = None
+
+
+class ArxivAPIClient:
+    """基于 aiohttp 的 arXiv API 异步客户端
+
+    分页请求 export.arxiv.org 的查询接口，边下载边解析，解析出的论文立即输出。
+    等待网络和请求间隔时不会阻塞事件循环，流水线中的其他算子可以继续执行。
+    所有请求经过令牌桶限流，平均每个连接每 delay_seconds 只发出一次请求，
+    遵守 arXiv 每 3 秒一次请求的约定。
+    """
+
+    def __init__(
+        self,
+        base_url: str = ARXIV_API_URL,
+        page_size: int = 100,
+        delay_seconds: float = 3.0,
+        num_retries: int = 3,
+        timeout: float = 60.0,
+        max_connections: int = 1,
+    ):
+        """初始化客户端
+
+        Args:
+            base_url: 查询接口地址
+            page_size: 每页请求的论文数
+            delay_seconds: 每个连接相邻两次请求的最小间隔（秒）
+            num_retries: 请求失败或返回意外的空页时的重试次数
+            timeout: 单次请求的超时时间（秒）
+            max_connections: harvest 时同时进行的请求数
+        """
+        self.base_url = base_url
+        self.page_size = page_size
+        self.delay_seconds = delay_seconds
+        self.num_retries = num_retries
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.rate_limiter = TokenBucket(
+            capacity=max_connections, refill_seconds=delay_seconds / max_connections
+        )
+
+    def _session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+        )
+
+    async def _fetch_page(
+        self,
+        session: aiohttp.ClientSession,
+        params: dict,
+        parser: AtomFeedParser,
+    ) -> AsyncGenerator[Tuple[Paper, str], None]:
+        await self.rate_limiter.acquire()
+        async with session.get(self.base_url, params=params) as response:
+            response.raise_for_status()
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                for paper in parser.feed(chunk):
+                    yield paper, parser.timestamps[paper.id]
+        parser.close()
+
+    async def _page(
+        self,
+        session: aiohttp.ClientSession,
+        params: dict,
+        state: _PageState,
+    ) -> AsyncGenerator[Tuple[Paper, str], None]:
+        """请求一页结果，失败或返回意外的空页时重试
+
+        Args:
+            session: HTTP 会话
+            params: 查询参数
+            state: 本页的进度，请求结束后 state.total_results 为结果总数
+
+        Yields:
+            Tuple[Paper, str]: 解析出的论文及其排序字段对应的时间戳，重试时不会重复输出
+
+        Raises:
+            ArxivAPIError: 请求在重试后仍然失败
+        """
+        start = params["start"]
+        timestamp_field = _SORT_TIMESTAMP_FIELDS.get(params["sortBy"], "published")
+        for attempt in range(self.num_retries + 1):
+            parser = AtomFeedParser(timestamp_field)
+            seen = 0
+            try:
+                async for item in self._fetch_page(session, params, parser):
+                    seen += 1
+                    if seen > state.count:
+                        state.count += 1
+                        yield item
+                state.total_results = parser.total_results
+            except (aiohttp.ClientError, asyncio.TimeoutError, ParseError) as e:
+                if attempt == self.num_retries:
+                    raise ArxivAPIError(f"arXiv API request failed: {e}") from e
+                logger.warning(f"请求 arXiv API 失败，第 {attempt + 1} 次重试: {e}")
+                continue
+            # arXiv 偶尔会在还有结果时返回空页，重试即可
+            if (
+                state.count == 0
+                and (state.total_results or 0) > start
+                and attempt < self.num_retries
+            ):
+                logger.warning(f"arXiv API 在 start={start} 返回空页，第 {attempt + 1} 次重试")
+                continue
+            return
+
+    @staticmethod
+    def _check_watermark_order(sort_by: str, sort_order: str):
+        if sort_by not in _SORT_TIMESTAMP_FIELDS or sort_order != "descending":
+            raise ValueError(
+                "Watermarks require sorting by submittedDate or lastUpdatedDate "
+                f"in descending order, got sort_by={sort_by}, sort_order={sort_order}"
+            )
+
+    @staticmethod
+    def _params(query: str, start: int, count: int, sort_by: str, sort_order: str) -> dict:
+        return {
+            "search_query": query,
+            "start": start,
+            "max_results": count,
+            "sortBy": sort_by,
+            "sortOrder": sort_order,
+        }
+
+    async def results(
+        self,
+        query: str,
+        offset: int = 0,
+        max_results: Optional[int] = None,
+        sort_by: str = "submittedDate",
+        sort_order: str = "descending",
+        watermark: Optional[QueryWatermark] = None,
+    ) -> AsyncGenerator[Paper, None]:
+        """按排序逐页获取查询结果
+
+        Args:
+            query: arXiv 查询语句，例如 '"LLM" OR "RAG"'
+            offset: 跳过的结果数
+            max_results: 最多返回的结果数，为空时返回全部结果
+            sort_by: 排序字段，submittedDate、lastUpdatedDate 或 relevance
+            sort_order: 排序方向，descending 或 ascending
+            watermark: 查询的高水位，遇到不晚于 watermark.cutoff 的论文时停止，
+                输出的论文的时间戳记录到 watermark.latest。要求按日期降序排序
+
+        Yields:
+            Paper: 解析出的论文
+
+        Raises:
+            ArxivAPIError: 请求在重试后仍然失败
+        """
+        if watermark is not None:
+            self._check_watermark_order(sort_by, sort_order)
+        fetched = 0
+        start = offset
+        async with self._session() as session:
+            while max_results is None or fetched < max_results:
+                page_size = self.page_size
+                if max_results is not None:
+                    page_size = min(page_size, max_results - fetched)
+                state = _PageState()
+                params = self._params(query, start, page_size, sort_by, sort_order)
+                async with aclosing(self._page(session, params, state)) as page:
+                    async for paper, timestamp in page:
+                        if watermark is not None:
+                            if watermark.crossed(timestamp):
+                                return
+                            watermark.observe(timestamp)
+                        yield paper
+
+                fetched += state.count
+                start += state.count
+                if state.count == 0:
+                    break
+                if state.total_results is None:
+                    if state.count < page_size:
+                        break
+                elif start >= state.total_results:
+                    break
+            else:
+                # 达到 max_results 时还没有越过高水位，可能还有更早的新论文没有获取
+                if watermark is not None and fetched > 0:
+                    watermark.truncated = (
+                        state.total_results is None or start < state.total_results
+                    )
+
+    async def harvest(
+        self,
+        queries: List[str],
+        offset: int = 0,
+        max_results: Optional[int] = None,
+        sort_by: str = "submittedDate",
+        sort_order: str = "descending",
+        watermarks: Optional[Dict[str, QueryWatermark]] = None,
+    ) -> AsyncGenerator[Paper, None]:
+        """并发获取多个查询的结果，合并后按论文ID去重
+
+        每个查询先请求第一页得到结果总数，再把 [offset, offset + max_results) 中剩余的页
+        作为独立的请求并发执行，最多同时进行 max_connections 个请求，共享同一个令牌桶限流。
+        某页请求完成后立即输出其中的论文，因此输出顺序与排序不完全一致。
+
+        有高水位的查询通常只需要获取一两页，为了在越过水位后不再发出多余的请求，
+        这些查询的各页依次请求，不同查询之间仍然并发。
+
+        Args:
+            queries: arXiv 查询语句列表
+            offset: 每个查询跳过的结果数
+            max_results: 每个查询最多返回的结果数，为空时返回全部结果
+            sort_by: 排序字段
+            sort_order: 排序方向
+            watermarks: 查询语句到高水位的映射，含义与 results 的 watermark 参数相同
+
+        Yields:
+            Paper: 解析出的论文，同一篇论文只输出一次
+
+        Raises:
+            ArxivAPIError: 请求在重试后仍然失败
+        """
+        watermarks = watermarks or {}
+        if watermarks:
+            self._check_watermark_order(sort_by, sort_order)
+        seen_ids = set()
+        end = None if max_results is None else offset + max_results
+
+        async def fetch(query: str, start: int) -> Tuple[List[Tuple[Paper, str]], _PageState]:
+            count = self.page_size if end is None else min(self.page_size, end - start)
+            state = _PageState()
+            params = self._params(query, start, count, sort_by, sort_order)
+            return [item async for item in self._page(session, params, state)], state
+
+        async with self._session() as session:
+            # 任务 -> (查询, 页的起始位置)
+            tasks: Dict[asyncio.Future, Tuple[str, int]] = {}
+
+            def schedule(query: str, start: int):
+                tasks[asyncio.ensure_future(fetch(query, start))] = (query, start)
+
+            if end is None or end > offset:
+                for query in queries:
+                    schedule(query, offset)
+            # 每个查询需要获取的结束位置，第一页返回后确定
+            stops: Dict[str, int] = {}
+            try:
+                while tasks:
+                    done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        query, start = tasks.pop(task)
+                        items, state = task.result()
+                        watermark = watermarks.get(query)
+                        sequential = watermark is not None and watermark.cutoff is not None
+
+                        crossed = False
+                        for paper, timestamp in items:
+                            if watermark is not None:
+                                if watermark.crossed(timestamp):
+                                    crossed = True
+                                    watermark.truncated = False
+                                    break
+                                watermark.observe(timestamp)
+                            if paper.id not in seen_ids:
+                                seen_ids.add(paper.id)
+                                yield paper
+
+                        if start == offset:
+                            stop = state.total_results
+                            if stop is None:
+                                # 不知道结果总数时无法划分页范围，只使用第一页
+                                stop = offset + state.count
+                                if state.count == self.page_size:
+                                    logger.warning(f"arXiv API 未返回结果总数，只获取第一页: {query}")
+                            if end is not None:
+                                stop = min(stop, end)
+                            stops[query] = stop
+                            if watermark is not None and not crossed:
+                                # 结果总数超过 stop 时先记为截断，之后的页越过高水位时再清除
+                                watermark.truncated = (
+                                    state.count == self.page_size
+                                    if state.total_results is None
+                                    else stop < state.total_results
+                                )
+                            if not sequential:
+                                for next_start in range(
+                                    offset + self.page_size, stop, self.page_size
+                                ):
+                                    schedule(query, next_start)
+                        if sequential and not crossed:
+                            next_start = start + self.page_size
+                            if state.count > 0 and next_start < stops[query]:
+                                schedule(query, next_start)
+            finally:
+                for task in tasks:
+                    task.cancel()
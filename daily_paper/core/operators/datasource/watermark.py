@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+from daily_paper.core.common.file_lock import FileLock, atomic_write
+
+
+class WatermarkStore:
+    """按查询持久化的高水位
+
+    保存每个查询上次获取到的最新论文的时间戳（Atom feed 中的 ISO 8601 时间，
+    可以直接按字符串比较），保存在 {namespace}_watermarks.json 中。
+    更新时只会把水位往后推，多个进程同时提交时不会互相覆盖成更早的时间。
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        namespace: str,
+        lock_timeout: Optional[float] = None,
+    ):
+        """初始化高水位存储
+
+        Args:
+            base_dir: 存储目录
+            namespace: 命名空间
+            lock_timeout: 获取文件锁的超时时间（秒），为空时使用默认超时时间
+        """
+        self.storage_dir = Path(base_dir)
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.watermark_file = self.storage_dir / f"{namespace}_watermarks.json"
+        self.lock = FileLock(self.storage_dir / f"{namespace}_watermarks.lock", lock_timeout)
+
+    def load(self) -> Dict[str, str]:
+        """读取所有查询的高水位
+
+        Returns:
+            Dict[str, str]: 查询语句到时间戳的映射
+        """
+        try:
+            with open(self.watermark_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def get(self, query: str) -> Optional[str]:
+        """获取一个查询的高水位，没有记录时返回 None"""
+        return self.load().get(query)
+
+    def update(self, watermarks: Dict[str, str]):
+        """提交新的高水位，早于已保存水位的取值会被忽略
+
+        Args:
+            watermarks: 查询语句到时间戳的映射
+        """
+        with self.lock:
+            current = self.load()
+            changed = False
+            for query, timestamp in watermarks.items():
+                if timestamp and timestamp > current.get(query, ""):
+                    current[query] = timestamp
+                    changed = True
+            if changed:
+                with atomic_write(self.watermark_file) as f:
+                    json.dump(current, f, ensure_ascii=False, indent=2)
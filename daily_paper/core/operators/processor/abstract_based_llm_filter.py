@@ -5,6 +5,7 @@ import openai
 from daily_paper.core.operators.base import Operator
 from daily_paper.core.models import Paper, PaperWithSummary
 from daily_paper.core.common import logger
+from daily_paper.core.tracing import trace_span
 from daily_paper.core.config import LLMConfig
 from tqdm.asyncio import tqdm_asyncio
 
@@ -12,6 +13,9 @@ from tqdm.asyncio import tqdm_asyncio
 class AbstractBasedLLMFilter(Operator):
     """使用LLM过滤论文的算子"""
 
+    checkpointable = True
+    partitionable = True
+
     def __init__(self, llm_config: LLMConfig, target_topic: str):
         """初始化LLMFilter
 
@@ -19,6 +23,7 @@ class AbstractBasedLLMFilter(Operator):
             api_key: OpenAI API密钥
             model: 使用的模型名称
         """
+        self.llm_config = llm_config
         self.client = openai.AsyncOpenAI(
             api_key=llm_config.api_key, base_url=llm_config.base_url
         )
@@ -26,6 +31,10 @@ class AbstractBasedLLMFilter(Operator):
         self.target_topic = target_topic
         self.semaphore = asyncio.Semaphore(llm_config.max_concurrent_requests)
 
+    def replicate(self) -> "AbstractBasedLLMFilter":
+        """分片使用的实例，拥有独立的客户端和并发限制，同时进行的请求数随分片数增加"""
+        return AbstractBasedLLMFilter(self.llm_config, self.target_topic)
+
     async def filter_paper(self, paper: Paper) -> bool:
         # 修正冒号为英文格式，使用标准签名语法
         prompt = "请判断以下论文是否属于用户关注的领域\n"
@@ -34,14 +43,15 @@ class AbstractBasedLLMFilter(Operator):
         prompt += f"论文的摘要：{paper.abstract}\n"
         logger.debug(f"prompt: {prompt}")
         async with self.semaphore:
-            result = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一位论文过滤专家，专精于通过论文的摘要判断论文是否属于用户关注的领域。"},
-                    {"role": "user", "content": prompt},
-                ],
-            )
-            llm_response = result.choices[0].message.content
+            with trace_span("AbstractBasedLLMFilter.filter_paper", paper_id=paper.id):
+                result = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": "你是一位论文过滤专家，专精于通过论文的摘要判断论文是否属于用户关注的领域。"},
+                        {"role": "user", "content": prompt},
+                    ],
+                )
+                llm_response = result.choices[0].message.content
         
         is_filtered = "NO" in llm_response
         if is_filtered:
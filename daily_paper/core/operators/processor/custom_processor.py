@@ -1,3 +1,4 @@
+from collections.abc import Sequence
 from typing import Any, Callable, List
 from dataclasses import dataclass, field
 from daily_paper.core.operators.base import Operator
@@ -8,6 +9,7 @@ class CustomProcessor(Operator):
     """自定义处理器，接受一个 lambda 函数来处理列表数据。
 
     继承自基础 Operator 类，实现异步处理方法。
+    输入可以是 list，也可以是 PaperBatch 等其他序列类型，原样传给处理函数。
 
     Attributes:
         processor_func: 用户定义的处理函数，接受 List[Any] 作为输入，返回 List[Any]
@@ -15,21 +17,23 @@ class CustomProcessor(Operator):
 
     processor_func: Callable[[List[Any]], List[Any]] = field()
 
+    fusible = True
+
     async def process(self, input_data: Any) -> Any:
         """异步处理输入的列表数据。
 
         Args:
-            input_data: 需要处理的输入列表
+            input_data: 需要处理的输入序列
 
         Returns:
             处理后的列表
 
         Raises:
-            ValueError: 当输入不是列表类型时抛出
+            ValueError: 当输入不是序列类型（或者是字符串）时抛出
             RuntimeError: 当处理过程发生错误时抛出
         """
-        if not isinstance(input_data, list):
-            raise ValueError("输入数据必须是列表类型")
+        if not isinstance(input_data, Sequence) or isinstance(input_data, (str, bytes)):
+            raise ValueError("输入数据必须是序列类型")
 
         try:
             return self.processor_func(input_data)
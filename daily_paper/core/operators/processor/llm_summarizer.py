@@ -1,10 +1,11 @@
 import asyncio
 from dataclasses import asdict
-from typing import Any, List
+from typing import Any, List, AsyncGenerator, AsyncIterator
 import openai
-from daily_paper.core.operators.base import Operator
+from daily_paper.core.operators.base import Operator, map_as_completed
 from daily_paper.core.models import Paper, PaperWithSummary
 from daily_paper.core.common import logger
+from daily_paper.core.tracing import trace_span
 from daily_paper.core.config import LLMConfig
 from tqdm.asyncio import tqdm_asyncio
 
@@ -12,6 +13,8 @@ from tqdm.asyncio import tqdm_asyncio
 class LLMSummarizer(Operator):
     """使用LLM生成论文摘要的算子"""
 
+    checkpointable = True
+
     def __init__(self, llm_config: LLMConfig):
         """初始化LLMSummarizer
 
@@ -23,19 +26,35 @@ class LLMSummarizer(Operator):
             api_key=llm_config.api_key, base_url=llm_config.base_url
         )
         self.model = llm_config.model_name
+        self.max_concurrent_requests = llm_config.max_concurrent_requests
         self.semaphore = asyncio.Semaphore(llm_config.max_concurrent_requests)
+        # 正在进行中的请求数，以及自上次重置以来的最大值，用于评估并发利用率
+        self.in_flight_requests = 0
+        self.peak_in_flight_requests = 0
+
+    def reset_concurrency_stats(self):
+        """重置并发请求数的统计"""
+        self.peak_in_flight_requests = self.in_flight_requests
 
     async def summarize_paper(self, paper_text) -> str:
         async with self.semaphore:
-            prompt = f"用中文帮我介绍一下这篇文章: {paper_text}"
-            summary = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的学术论文分析助手。"},
-                    {"role": "user", "content": prompt},
-                ],
+            self.in_flight_requests += 1
+            self.peak_in_flight_requests = max(
+                self.peak_in_flight_requests, self.in_flight_requests
             )
-            return summary.choices[0].message.content
+            try:
+                with trace_span("LLMSummarizer.summarize_paper"):
+                    prompt = f"用中文帮我介绍一下这篇文章: {paper_text}"
+                    summary = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {"role": "system", "content": "你是一个专业的学术论文分析助手。"},
+                            {"role": "user", "content": prompt},
+                        ],
+                    )
+                    return summary.choices[0].message.content
+            finally:
+                self.in_flight_requests -= 1
 
     async def process(
         self, papers: list[tuple[Paper, str]]
@@ -59,3 +78,26 @@ class LLMSummarizer(Operator):
         ]
 
         return results
+
+    async def _summarize_single_paper(
+        self, paper_and_text: tuple[Paper, str]
+    ) -> PaperWithSummary:
+        paper, paper_text = paper_and_text
+        summary = await self.summarize_paper(paper_text)
+        return PaperWithSummary(**asdict(paper), summary=summary)
+
+    async def stream_process(
+        self, papers: AsyncIterator[tuple[Paper, str]]
+    ) -> AsyncGenerator[PaperWithSummary, None]:
+        """流式生成论文总结，每篇论文总结完成后立即输出
+
+        Args:
+            papers: (论文, 论文文本) 的异步迭代器
+
+        Yields:
+            PaperWithSummary: 添加了摘要的论文，按完成顺序输出
+        """
+        async for result in map_as_completed(
+            papers, self._summarize_single_paper, self.max_concurrent_requests
+        ):
+            yield result
@@ -1,48 +1,128 @@
 import os
 import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncGenerator, AsyncIterator
 from concurrent.futures import ThreadPoolExecutor
 import asyncio
 from tqdm.asyncio import tqdm_asyncio
 from tenacity import retry, wait_exponential, stop_after_attempt
 
 from daily_paper.core.operators.base.operator import Operator
+from daily_paper.core.operators.base.stream import map_as_completed
 from daily_paper.core.common import logger
+from daily_paper.core.common.process_pool import (
+    acquire_process_pool,
+    cpu_bound,
+    release_process_pool,
+)
+from daily_paper.core.metrics import record_exception
+from daily_paper.core.tracing import run_in_executor, traced
 from daily_paper.core.models import Paper
 
 
+@cpu_bound
+def extract_text_from_pdf(pdf_path: str) -> str:
+    """
+    从PDF中提取文本，使用多个解析引擎保证可靠性
+
+    PDF解析是CPU密集型任务，定义为模块级函数以便在进程池中执行。
+
+    Args:
+        pdf_path: PDF文件路径
+
+    Returns:
+        str: 提取的文本内容
+    """
+    try:
+        # 尝试使用PyPDF2解析
+        from PyPDF2 import PdfReader
+
+        with open(pdf_path, "rb") as f:
+            reader = PdfReader(f)
+            text = "\n".join([page.extract_text() for page in reader.pages])
+            return text.encode("utf-8", "ignore").decode("utf-8")
+    except Exception as pdf_error:
+        logger.warning(f"PyPDF2解析失败，尝试备用解析引擎: {pdf_path}")
+        try:
+            # 备选方案1：使用pdfplumber
+            import pdfplumber
+
+            with pdfplumber.open(pdf_path) as pdf:
+                text = "\n".join([page.extract_text() for page in pdf.pages])
+                return text.encode("utf-8", "ignore").decode("utf-8")
+        except Exception as plumber_error:
+            try:
+                # 备选方案2：使用PyMuPDF
+                import fitz
+
+                doc = fitz.open(pdf_path)
+                text = "\n".join([page.get_text() for page in doc])
+                return text.encode("utf-8", "ignore").decode("utf-8")
+            except Exception as fitz_error:
+                error_msg = (
+                    f"PDF解析全部失败: {pdf_path}\n"
+                    f"PyPDF2错误: {str(pdf_error)}\n"
+                    f"pdfplumber错误: {str(plumber_error)}\n"
+                    f"PyMuPDF错误: {str(fitz_error)}"
+                )
+                logger.error(error_msg)
+                return ""
+
+
 class PaperReader(Operator):
     """论文下载和PDF解析算子
 
     将输入的论文列表下载为PDF并解析为文本内容。
     """
 
-    def __init__(self, cache_dir: str = "papers", max_workers: int = 20):
+    checkpointable = True
+    partitionable = True
+
+    def __init__(
+        self,
+        cache_dir: str = "papers",
+        max_workers: int = 20,
+        use_process_pool: bool = True,
+    ):
         """
         初始化PaperReader
 
         Args:
             save_dir: PDF文件保存目录
             max_workers: 并发下载的最大worker数
+            use_process_pool: 是否在进程池中解析PDF。PDF解析是CPU密集型任务，
+                在线程池中执行会受GIL限制
         """
         super().__init__()
         self.cache_dir = cache_dir
         self.max_workers = max_workers
+        self.use_process_pool = use_process_pool
         self.executor = None
 
+    def replicate(self) -> "PaperReader":
+        """分片使用的实例，拥有独立的下载线程池，下载并发数随分片数增加"""
+        return PaperReader(self.cache_dir, self.max_workers, self.use_process_pool)
+
     async def setup(self):
         """初始化资源"""
         os.makedirs(self.cache_dir, exist_ok=True)
-        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            if self.use_process_pool:
+                acquire_process_pool()
 
     async def cleanup(self):
         """清理资源"""
         if self.executor:
-            self.executor.shutdown()
+            # 不等待线程退出，避免阻塞事件循环
+            self.executor.shutdown(wait=False)
+            self.executor = None
+            if self.use_process_pool:
+                release_process_pool()
 
     @retry(
         stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=10)
     )
+    @traced(capture=("paper_id",))
     def _download_paper(self, url: str, paper_id: str) -> str:
         """
         下载单篇论文
@@ -81,6 +161,7 @@ class PaperReader(Operator):
         logger.info(f"成功下载: {paper_id}")
         return file_path
 
+    @traced(capture=("pdf_path",))
     def _extract_text_from_pdf(self, pdf_path: str) -> str:
         """
         从PDF中提取文本，使用多个解析引擎保证可靠性
@@ -91,40 +172,7 @@ class PaperReader(Operator):
         Returns:
             str: 提取的文本内容
         """
-        try:
-            # 尝试使用PyPDF2解析
-            from PyPDF2 import PdfReader
-
-            with open(pdf_path, "rb") as f:
-                reader = PdfReader(f)
-                text = "\n".join([page.extract_text() for page in reader.pages])
-                return text.encode("utf-8", "ignore").decode("utf-8")
-        except Exception as pdf_error:
-            logger.warning(f"PyPDF2解析失败，尝试备用解析引擎: {pdf_path}")
-            try:
-                # 备选方案1：使用pdfplumber
-                import pdfplumber
-
-                with pdfplumber.open(pdf_path) as pdf:
-                    text = "\n".join([page.extract_text() for page in pdf.pages])
-                    return text.encode("utf-8", "ignore").decode("utf-8")
-            except Exception as plumber_error:
-                try:
-                    # 备选方案2：使用PyMuPDF
-                    import fitz
-
-                    doc = fitz.open(pdf_path)
-                    text = "\n".join([page.get_text() for page in doc])
-                    return text.encode("utf-8", "ignore").decode("utf-8")
-                except Exception as fitz_error:
-                    error_msg = (
-                        f"PDF解析全部失败: {pdf_path}\n"
-                        f"PyPDF2错误: {str(pdf_error)}\n"
-                        f"pdfplumber错误: {str(plumber_error)}\n"
-                        f"PyMuPDF错误: {str(fitz_error)}"
-                    )
-                    logger.error(error_msg)
-                    return ""
+        return extract_text_from_pdf(pdf_path)
 
     async def _process_single_paper(self, paper: Paper) -> tuple:
         """
@@ -141,21 +189,29 @@ class PaperReader(Operator):
 
         try:
             # 下载论文
-            pdf_path = await asyncio.get_event_loop().run_in_executor(
+            pdf_path = await run_in_executor(
                 self.executor, self._download_paper, pdf_url, paper.id
             )
 
             # 提取文本
-            paper_text = await asyncio.get_event_loop().run_in_executor(
-                self.executor, self._extract_text_from_pdf, pdf_path
-            )
+            if self.use_process_pool:
+                paper_text = await extract_text_from_pdf.run_in_pool(pdf_path)
+            else:
+                paper_text = await run_in_executor(
+                    self.executor, self._extract_text_from_pdf, pdf_path
+                )
 
             return paper, paper_text
 
         except Exception as e:
             logger.error(f"处理论文失败 {paper.id}: {str(e)}")
+            record_exception(e)
             return paper, ""
 
+    def should_checkpoint(self, result: list[tuple[Paper, str]]) -> bool:
+        """下载或解析失败的论文文本为空，包含这样的论文时不保存检查点，恢复执行时重新处理"""
+        return all(text for _, text in result)
+
     async def process(self, papers: list[Paper]) -> list[tuple[Paper, str]]:
         """
         处理论文列表
@@ -178,3 +234,20 @@ class PaperReader(Operator):
         )
 
         return results
+
+    async def stream_process(
+        self, papers: AsyncIterator[Paper]
+    ) -> AsyncGenerator[tuple[Paper, str], None]:
+        """
+        流式处理论文，每篇论文解析完成后立即输出
+
+        Args:
+            papers: 论文的异步迭代器
+
+        Yields:
+            tuple[Paper, str]: 论文和提取的文本内容，按处理完成的顺序输出
+        """
+        async for result in map_as_completed(
+            papers, self._process_single_paper, self.max_workers
+        ):
+            yield result
@@ -1,4 +1,4 @@
-from typing import Any, Union, List
+from typing import Any, Union, List, AsyncGenerator, AsyncIterator
 import json
 import aiohttp
 from tenacity import retry, stop_after_attempt, wait_exponential
@@ -6,6 +6,8 @@ from daily_paper.core.operators.base import Operator
 from daily_paper.core.models import Paper
 import requests
 from daily_paper.core.common import logger
+from daily_paper.core.metrics import record_exception
+from daily_paper.core.tracing import trace_span
 from typing import Callable, Tuple
 
 
@@ -45,11 +47,13 @@ class FeishuPusher(Operator):
             },
         }
         try:
-            send_to_feishu_with_retry(self.webhook_url, message)
+            with trace_span("FeishuPusher.push", title=title):
+                send_to_feishu_with_retry(self.webhook_url, message)
             logger.info(f"飞书推送成功: {title}")
             return True
         except Exception as e:
             logger.error(f"飞书推送失败: {str(e)}")
+            record_exception(e)
             return False
 
     async def process(self, content: List[Any]) -> List[Tuple[Any, bool]]:
@@ -67,3 +71,17 @@ class FeishuPusher(Operator):
             result.append((c, await self.single_content_push_feishu(c)))
 
         return result
+
+    async def stream_process(
+        self, content: AsyncIterator[Any]
+    ) -> AsyncGenerator[Tuple[Any, bool], None]:
+        """逐条推送内容到飞书，每条推送完成后立即输出推送结果
+
+        Args:
+            content: 要推送的内容的异步迭代器
+
+        Yields:
+            Tuple[Any, bool]: 输入的内容和推送结果
+        """
+        async for c in content:
+            yield c, await self.single_content_push_feishu(c)
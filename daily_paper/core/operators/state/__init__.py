@@ -1,3 +1,28 @@
-from .pending import InsertPendingIDs, GetAllPendingIDs, MarkIDsAsFinished
+from .pending import (
+    InsertPendingIDs,
+    GetAllPendingIDs,
+    MarkIDsAsFinished,
+    FilterFinishedIDs,
+    ClaimIDs,
+    IDState,
+    StateManager,
+    create_state_manager,
+)
+from .sqlite_state import SqliteStateManager
+from .log_state import LogStateManager
+from .bloom import BloomFilter, BloomFilteredStateManager
 
-__all__ = ["InsertPendingIDs", "GetAllPendingIDs", "MarkIDsAsFinished"]
+__all__ = [
+    "InsertPendingIDs",
+    "GetAllPendingIDs",
+    "MarkIDsAsFinished",
+    "FilterFinishedIDs",
+    "ClaimIDs",
+    "IDState",
+    "StateManager",
+    "SqliteStateManager",
+    "LogStateManager",
+    "BloomFilter",
+    "BloomFilteredStateManager",
+    "create_state_manager",
+]
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import math
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from daily_paper.core.common.file_lock import atomic_write
+from daily_paper.core.common.logger import logger
+from daily_paper.core.operators.state.pending import IDState
+
+
+class BloomFilter:
+    """布隆过滤器
+
+    不在过滤器中的元素一定没有被加入过；在过滤器中的元素可能是误判，
+    误判率在元素数量不超过 capacity 时约为 error_rate。
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """初始化布隆过滤器
+
+        Args:
+            capacity: 预计加入的元素数量
+            error_rate: 期望的误判率
+        """
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.num_bits = max(
+            8, int(math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        )
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # 双重哈希：用一次 blake2b 得到两个 64 位哈希值，组合出 num_hashes 个位置
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        """加入一个元素"""
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    @property
+    def saturated(self) -> bool:
+        """加入的元素数量是否已经超过容量，此时误判率会明显升高"""
+        return self.count > self.capacity
+
+    def save(self, path: Path, metadata: Optional[dict] = None):
+        """原子地保存到文件，文件第一行是JSON格式的参数和元数据，之后是位数组"""
+        header = {
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "count": self.count,
+            "metadata": metadata or {},
+        }
+        with atomic_write(path, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(self.bits)
+
+    @classmethod
+    def load(cls, path: Path) -> "tuple[BloomFilter, dict]":
+        """从文件加载布隆过滤器
+
+        Returns:
+            过滤器和保存时的元数据
+
+        Raises:
+            ValueError: 文件内容与参数不一致
+        """
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            bits = f.read()
+        bloom = cls(header["capacity"], header["error_rate"])
+        if len(bits) != len(bloom.bits):
+            raise ValueError(f"Corrupted bloom filter file: {path}")
+        bloom.bits = bytearray(bits)
+        bloom.count = header["count"]
+        return bloom, header["metadata"]
+
+
+class BloomFilteredStateManager:
+    """在状态管理器前加一层已完成ID的布隆过滤器
+
+    is_finished/is_finished_many 先查询内存中的布隆过滤器，不在其中的ID一定没有完成，
+    不需要访问底层存储；只有可能命中的ID才交给底层状态管理器做权威判断。
+
+    过滤器保存在状态文件旁的 {namespace}_finished.bloom 中，并记录对应的底层状态版本。
+    每次经过本类写入后都会更新并保存过滤器；查询前如果发现底层状态的版本变化
+    （其他实例写入或者日志被压缩），先尝试加载其他实例保存的过滤器，
+    版本仍然对不上时从底层状态重新构建。加入的元素超过容量时按两倍容量重新构建。
+    """
+
+    def __init__(self, state_manager, error_rate: float = 0.01, min_capacity: int = 10000):
+        """初始化
+
+        Args:
+            state_manager: 底层状态管理器
+            error_rate: 布隆过滤器的误判率
+            min_capacity: 布隆过滤器的最小容量
+        """
+        self.state_manager = state_manager
+        self.error_rate = error_rate
+        self.min_capacity = min_capacity
+        self.bloom_file = (
+            Path(state_manager.storage_dir) / f"{state_manager.namespace}_finished.bloom"
+        )
+        self._bloom: Optional[BloomFilter] = None
+        self._version: Optional[str] = None
+
+    def __getattr__(self, name):
+        return getattr(self.state_manager, name)
+
+    def _load(self):
+        """加载保存的布隆过滤器"""
+        try:
+            self._bloom, metadata = BloomFilter.load(self.bloom_file)
+            self._version = metadata.get("state_version")
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError) as e:
+            logger.warning(f"布隆过滤器文件 {self.bloom_file} 无效，将重新构建: {e}")
+
+    def rebuild(self):
+        """从底层状态重新构建布隆过滤器并保存
+
+        读取已完成ID和状态版本时持有底层状态的锁，保证两者对应同一份状态。
+        """
+        with self.state_manager.locked():
+            finished = self.state_manager.get_finished_ids()
+            version = self.state_manager.state_version()
+        bloom = BloomFilter(max(self.min_capacity, len(finished) * 2), self.error_rate)
+        for id in finished:
+            bloom.add(id)
+        self._bloom = bloom
+        self._version = version
+        self._save()
+        logger.debug(f"已重新构建布隆过滤器 {self.bloom_file}，共 {len(finished)} 个ID")
+
+    def _sync(self):
+        """确保布隆过滤器与底层状态的版本一致"""
+        version = self.state_manager.state_version()
+        if self._bloom is not None and self._version == version:
+            return
+        self._load()
+        if self._bloom is None or self._version != version:
+            self.rebuild()
+
+    def _save(self):
+        self._bloom.save(self.bloom_file, {"state_version": self._version})
+
+    def _write(self, func, *args, finished: Iterable[str] = (), **kwargs):
+        """执行一次底层写入，把新完成的ID加入布隆过滤器并保存
+
+        同步、写入和读取写入后的版本都在底层状态的锁中进行，其他实例的写入
+        不会夹在中间，否则过滤器会记录一个包含了未加入过滤器的ID的版本。
+        """
+        with self.state_manager.locked():
+            self._sync()
+            result = func(*args, **kwargs)
+            for id in finished:
+                self._bloom.add(id)
+            self._version = self.state_manager.state_version()
+            if self._bloom.saturated:
+                self.rebuild()
+            else:
+                self._save()
+        return result
+
+    def is_finished(self, id: str) -> bool:
+        """判断ID是否已处理完成"""
+        return id in self.is_finished_many([id])
+
+    def is_finished_many(self, ids: Iterable[str]) -> Set[str]:
+        """批量判断ID是否已处理完成，只有布隆过滤器可能命中的ID会查询底层存储
+
+        Args:
+            ids: 需要判断的ID
+
+        Returns:
+            Set[str]: 其中已处理完成的ID
+        """
+        self._sync()
+        candidates = [id for id in ids if id in self._bloom]
+        if not candidates:
+            return set()
+        return self.state_manager.is_finished_many(candidates)
+
+    def update_states(self, states: Dict[str, IDState]):
+        """更新底层状态，并把新完成的ID加入布隆过滤器
+
+        Args:
+            states: ID到新状态的映射
+        """
+        finished = [id for id, state in states.items() if state == IDState.FINISHED]
+        self._write(self.state_manager.update_states, states, finished=finished)
+
+    def mark_as_finished(self, ids: List[str]):
+        """将ID标记为已完成"""
+        self._write(self.state_manager.mark_as_finished, ids, finished=ids)
+
+    def store_pending_ids(self, ids: List[str]):
+        """存储待处理的ID"""
+        self._write(self.state_manager.store_pending_ids, ids)
+
+    def claim_ids(self, *args, **kwargs) -> List[str]:
+        return self._write(self.state_manager.claim_ids, *args, **kwargs)
+
+    def claim_pending_ids(self, *args, **kwargs) -> List[str]:
+        return self._write(self.state_manager.claim_pending_ids, *args, **kwargs)
+
+    def renew_leases(self, *args, **kwargs) -> List[str]:
+        return self._write(self.state_manager.renew_leases, *args, **kwargs)
+
+    def release_ids(self, *args, **kwargs) -> List[str]:
+        return self._write(self.state_manager.release_ids, *args, **kwargs)
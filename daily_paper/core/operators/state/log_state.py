@@ -0,0 +1,383 @@
+import json
+import os
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from daily_paper.core.common.file_lock import FileLock, atomic_write
+from daily_paper.core.common.logger import logger
+from daily_paper.core.operators.state.pending import (
+    IDState,
+    StateManager,
+    _FileLeaseMixin,
+)
+
+
+def _encode_record(changes: Dict[str, IDState]) -> bytes:
+    """把一批状态变更编码为一行带 CRC32 校验的日志记录"""
+    payload = json.dumps(
+        {id: IDState(state).value for id, state in changes.items()},
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return b"%08x " % zlib.crc32(payload) + payload + b"\n"
+
+
+def _decode_record(line: bytes) -> Optional[Dict[str, IDState]]:
+    """解码一行日志记录，记录不完整或校验失败时返回 None"""
+    if not line.endswith(b"\n") or len(line) < 10 or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        return {id: IDState(state) for id, state in json.loads(payload).items()}
+    except ValueError:
+        return None
+
+
+class LogStateManager(_FileLeaseMixin):
+    """基于追加日志的状态管理器
+
+    与 StateManager 接口兼容。每个命名空间的状态由两部分组成：
+
+    - {namespace}_states.snapshot.json: 某一时刻全部状态的快照
+    - {namespace}_states.log: 快照之后的状态变更，每次更新追加一行带 CRC32 校验的记录
+
+    启动时先加载快照，再按顺序重放日志得到内存中的状态。每次写入只追加发生变化的ID，
+    写入开销与历史长度无关；崩溃时最多留下一条不完整的尾部记录，重放时会被校验发现并截断。
+    日志按组 fsync：累计 group_size 条记录或距上次同步超过 sync_interval 秒时才同步到磁盘。
+
+    日志中的记录数超过当前状态数（且不少于 compact_min_records）时，在后台线程中
+    把状态压缩为新的快照：先把当前日志轮转为 .log.compacting，再写入快照并删除旧日志，
+    期间的新写入追加到新日志中，不会被阻塞。
+
+    追加、轮转和重新加载都在跨进程的文件锁中进行，多个进程可以同时读写同一个命名空间；
+    另一把压缩锁保证同一时间只有一个进程在压缩。
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        namespace: str,
+        group_size: int = 64,
+        sync_interval: float = 1.0,
+        compact_min_records: int = 10000,
+        lock_timeout: Optional[float] = None,
+    ):
+        """初始化状态管理器
+
+        Args:
+            base_dir: 状态存储根目录
+            namespace: 命名空间，用于区分不同类型的ID
+            group_size: 累计多少条记录后 fsync 一次
+            sync_interval: 距上次 fsync 的最长时间（秒）
+            compact_min_records: 触发后台压缩的最小日志记录数
+            lock_timeout: 获取文件锁的超时时间（秒），为空时使用默认超时时间
+        """
+        self.storage_dir = Path(base_dir) / "pending_states"
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.namespace = namespace
+        self.snapshot_file = self.storage_dir / f"{namespace}_states.snapshot.json"
+        self.log_file = self.storage_dir / f"{namespace}_states.log"
+        self.compacting_file = self.storage_dir / f"{namespace}_states.log.compacting"
+        self.lease_file = self.storage_dir / f"{namespace}_leases.json"
+        self.group_size = group_size
+        self.sync_interval = sync_interval
+        self.compact_min_records = compact_min_records
+
+        self.lock = FileLock(self.storage_dir / f"{namespace}_states.lock", lock_timeout)
+        self.compact_lock = FileLock(
+            self.storage_dir / f"{namespace}_states.compact.lock", lock_timeout
+        )
+        self._states: Dict[str, IDState] = {}
+        # 当前日志中的记录数（按ID计），用于判断是否需要压缩
+        self._log_records = 0
+        self._unsynced_records = 0
+        self._last_sync = time.monotonic()
+        self._compaction: Optional[threading.Thread] = None
+        # 已重放的快照和日志版本，用于发现其他进程的写入
+        self._snapshot_stamp: Optional[Tuple[int, int]] = None
+        self._log_inode: Optional[int] = None
+        self._log_offset = 0
+
+        self._log = None
+        with self.lock:
+            self._migrate_from_json()
+            self._reload()
+        if self.compact_lock.acquire(blocking=False):
+            try:
+                self._recover_compaction()
+            finally:
+                self.compact_lock.release()
+
+    def _migrate_from_json(self):
+        """把旧的JSON状态文件转换为快照"""
+        json_manager = StateManager(str(self.storage_dir.parent), self.namespace)
+        if not json_manager.state_file.exists() or self.snapshot_file.exists():
+            return
+
+        states = json_manager._load_states()
+        self._write_snapshot(states)
+        json_manager.state_file.rename(
+            json_manager.state_file.with_name(json_manager.state_file.name + ".migrated")
+        )
+        logger.info(
+            f"已将 {len(states)} 个状态从 {json_manager.state_file} 迁移到 {self.snapshot_file}"
+        )
+
+    @staticmethod
+    def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _replay(self, path: Path, offset: int = 0, truncate: bool = False) -> int:
+        """从 offset 开始重放日志文件，返回有效记录的结束位置
+
+        Args:
+            path: 日志文件
+            offset: 开始重放的位置
+            truncate: 是否截断校验失败的尾部记录
+        """
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            return 0
+        with f:
+            f.seek(offset)
+            for line in f:
+                changes = _decode_record(line)
+                if changes is None:
+                    break
+                self._states.update(changes)
+                self._log_records += len(changes)
+                offset += len(line)
+            torn = f.tell() != offset or f.read(1) != b""
+        if torn and truncate:
+            logger.warning(f"状态日志 {path} 在 {offset} 字节处损坏，截断之后的内容")
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+        return offset
+
+    def _reload(self):
+        """从快照和日志重新构建内存中的状态"""
+        self._states = {}
+        self._log_records = 0
+        self._snapshot_stamp = self._stamp(self.snapshot_file)
+        if self._snapshot_stamp is not None:
+            with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                self._states = {k: IDState(v) for k, v in json.load(f).items()}
+        # 压缩进行中或中途退出时，轮转出的旧日志还没有合并进快照，重放是幂等的
+        self._replay(self.compacting_file)
+        self._log_offset = self._replay(self.log_file, truncate=True)
+        self._reopen_log()
+
+    def _reopen_log(self):
+        """日志文件被其他进程轮转后，重新打开新的日志文件"""
+        log_stamp = self._stamp(self.log_file)
+        if (
+            self._log is None
+            or self._log.closed
+            or log_stamp is None
+            or os.fstat(self._log.fileno()).st_ino != log_stamp[0]
+        ):
+            if self._log is not None and not self._log.closed:
+                self._sync()
+                self._log.close()
+            self._log = open(self.log_file, "ab")
+        self._log_inode = os.fstat(self._log.fileno()).st_ino
+
+    def _refresh(self):
+        """读取其他进程追加的记录，快照或日志被替换时完整重新加载"""
+        if self._stamp(self.snapshot_file) != self._snapshot_stamp:
+            self._reload()
+            return
+        log_stamp = self._stamp(self.log_file)
+        if log_stamp is None or log_stamp[0] != self._log_inode:
+            self._reload()
+            return
+        self._log_offset = self._replay(self.log_file, self._log_offset)
+
+    def _write_snapshot(self, states: Dict[str, IDState]):
+        """原子地写入快照文件"""
+        with atomic_write(self.snapshot_file) as f:
+            json.dump({k: v.value for k, v in states.items()}, f)
+
+    def _append(self, changes: Dict[str, IDState]):
+        """追加一条记录，按组 fsync，必要时触发后台压缩"""
+        with self.lock:
+            self._refresh()
+            changes = {
+                id: IDState(state)
+                for id, state in changes.items()
+                if self._states.get(id) != state
+            }
+            if not changes:
+                return
+
+            record = _encode_record(changes)
+            self._log.write(record)
+            self._log.flush()
+            self._states.update(changes)
+            self._log_offset += len(record)
+            self._log_records += len(changes)
+            self._unsynced_records += 1
+
+            now = time.monotonic()
+            if (
+                self._unsynced_records >= self.group_size
+                or now - self._last_sync >= self.sync_interval
+            ):
+                self._sync()
+
+            if self._log_records >= max(self.compact_min_records, len(self._states)):
+                self.compact(wait=False)
+
+            self._drop_leases(changes)
+
+    def _sync(self):
+        if self._unsynced_records:
+            os.fsync(self._log.fileno())
+            self._unsynced_records = 0
+        self._last_sync = time.monotonic()
+
+    def flush(self):
+        """把尚未同步的日志记录 fsync 到磁盘"""
+        with self.lock:
+            self._sync()
+
+    def compact(self, wait: bool = True):
+        """把当前状态压缩为快照并清空日志
+
+        其他进程正在压缩时本次压缩会被跳过。
+
+        Args:
+            wait: 是否等待压缩完成，为 False 时在后台线程中进行
+        """
+        with self.lock:
+            if self._compaction is None or not self._compaction.is_alive():
+                self._compaction = threading.Thread(target=self._compact, daemon=True)
+                self._compaction.start()
+            compaction = self._compaction
+        if wait:
+            compaction.join()
+
+    def _recover_compaction(self):
+        """上次压缩没有完成时，先把已重放的状态写成快照，避免轮转时覆盖旧日志
+
+        调用方需要持有压缩锁。
+        """
+        with self.lock:
+            if not self.compacting_file.exists():
+                return
+            self._refresh()
+            self._write_snapshot(self._states)
+            self._snapshot_stamp = self._stamp(self.snapshot_file)
+            self.compacting_file.unlink()
+
+    def _compact(self):
+        if not self.compact_lock.acquire(blocking=False):
+            return
+        try:
+            self._recover_compaction()
+            with self.lock:
+                # 轮转日志：之后的写入进入新日志，旧日志在快照写好后删除
+                self._refresh()
+                self._sync()
+                self._log.close()
+                os.replace(self.log_file, self.compacting_file)
+                self._reopen_log()
+                self._log_offset = 0
+                self._log_records = 0
+                states = dict(self._states)
+
+            self._write_snapshot(states)
+            with self.lock:
+                self._snapshot_stamp = self._stamp(self.snapshot_file)
+                self.compacting_file.unlink()
+            logger.debug(f"状态日志 {self.log_file} 已压缩，共 {len(states)} 个状态")
+        except Exception as e:
+            # 旧日志仍然保留，下次启动时会重放，不会丢失状态
+            logger.error(f"压缩状态日志 {self.log_file} 失败: {e}")
+        finally:
+            self.compact_lock.release()
+
+    def close(self):
+        """等待后台压缩结束，同步并关闭日志文件"""
+        with self.lock:
+            compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+        with self.lock:
+            if not self._log.closed:
+                self._sync()
+                self._log.close()
+
+    def _current_states(self) -> Dict[str, IDState]:
+        with self.lock:
+            self._refresh()
+            return self._states
+
+    def state_version(self) -> str:
+        """状态的版本标识，快照或日志发生变化后会改变"""
+        with self.lock:
+            return str((self._stamp(self.snapshot_file), self._stamp(self.log_file)))
+
+    def get_finished_ids(self) -> Set[str]:
+        """获取已完成的ID集合"""
+        with self.lock:
+            self._refresh()
+            return {id for id, state in self._states.items() if state == IDState.FINISHED}
+
+    def get_pending_ids(self) -> Set[str]:
+        """获取待处理的ID集合，租约已过期的 IN_PROGRESS ID 也视为待处理"""
+        with self.lock:
+            return self._pending_with_expired_leases()
+
+    def is_finished(self, id: str) -> bool:
+        """判断ID是否已处理完成"""
+        with self.lock:
+            self._refresh()
+            return self._states.get(id) == IDState.FINISHED
+
+    def is_finished_many(self, ids: Iterable[str]) -> Set[str]:
+        """批量判断ID是否已处理完成
+
+        Args:
+            ids: 需要判断的ID
+
+        Returns:
+            Set[str]: 其中已处理完成的ID
+        """
+        with self.lock:
+            self._refresh()
+            return {id for id in ids if self._states.get(id) == IDState.FINISHED}
+
+    def store_pending_ids(self, ids: List[str]):
+        """存储待处理的ID
+
+        只记录尚未出现过的ID，已有的ID保持原状态：FINISHED 不会被重新标记为 pending，
+        其他 worker 正在处理的 IN_PROGRESS 也不会被重置，租约保持有效。
+        """
+        with self.lock:
+            self._refresh()
+            self._append(
+                {id: IDState.PENDING for id in ids if id not in self._states}
+            )
+
+    def mark_as_finished(self, ids: List[str]):
+        """将ID标记为已完成"""
+        self._append({id: IDState.FINISHED for id in ids})
+
+    def update_states(self, states: Dict[str, IDState]):
+        """批量更新ID的状态，只追加发生变化的条目
+
+        Args:
+            states: ID到新状态的映射
+        """
+        self._append(states)
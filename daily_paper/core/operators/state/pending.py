@@ -1,50 +1,318 @@
-from typing import Any, List, Set, Dict, Literal
+from typing import (
+    Any,
+    Iterable,
+    List,
+    Set,
+    Dict,
+    Literal,
+    Optional,
+    Tuple,
+    Union,
+    Callable,
+    NamedTuple,
+    AsyncGenerator,
+    AsyncIterator,
+)
+import asyncio
 import json
+import os
+import socket
+import time
 from pathlib import Path
 from enum import Enum
 
+from daily_paper.core.models import PaperBatch
 from daily_paper.core.operators.base import Operator
 from daily_paper.core.common.logger import logger
+from daily_paper.core.common.codec import get_codec
+from daily_paper.core.common.file_lock import FileLock, atomic_write
 
 class IDState(str, Enum):
     """ID的状态枚举"""
 
     PENDING = "pending"
+    IN_PROGRESS = "in_progress"
     FINISHED = "finished"
 
 
-class StateManager:
-    """状态管理器，用于管理ID处理状态"""
+class Lease(NamedTuple):
+    """IN_PROGRESS 状态的租约"""
 
-    def __init__(self, base_dir: str, namespace: str):
+    worker_id: str
+    expires_at: float
+
+
+def default_worker_id() -> str:
+    """默认的 worker ID：主机名和进程号"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def is_claimable(state: Optional[IDState], lease: Optional[Lease], now: float) -> bool:
+    """判断ID是否可以被认领
+
+    未记录和 PENDING 的ID可以认领；IN_PROGRESS 的ID只有在租约缺失或过期后才能重新认领。
+    """
+    if state is None or state == IDState.PENDING:
+        return True
+    if state == IDState.IN_PROGRESS:
+        return lease is None or lease.expires_at <= now
+    return False
+
+
+class _FileLeaseMixin:
+    """把租约保存在 {namespace}_leases.json 中的认领实现
+
+    供基于文件的状态管理器使用，子类需要提供 lease_file、lock、_current_states() 和 update_states()。
+    状态和租约分两个文件保存：认领时先写租约再写状态，释放时先写状态再删租约，
+    任何一步中断都只会留下可以被重新认领的ID。读-改-写都在跨进程的文件锁中进行。
+    """
+
+    lease_file: Path
+    lock: FileLock
+
+    def _current_states(self) -> Dict[str, IDState]:
+        raise NotImplementedError
+
+    def locked(self) -> FileLock:
+        """在文件锁中执行一组读写操作，期间其他进程不能写入
+
+        文件锁可以重入，其中可以调用其他读写方法。用于需要在写入后读到
+        与之对应的 state_version 的场景。
+        """
+        return self.lock
+
+    def _load_leases(self) -> Dict[str, Lease]:
+        try:
+            with open(self.lease_file, "r", encoding="utf-8") as f:
+                return {id: Lease(*lease) for id, lease in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+
+    def _save_leases(self, leases: Dict[str, Lease]):
+        with atomic_write(self.lease_file) as f:
+            json.dump({id: list(lease) for id, lease in leases.items()}, f)
+
+    def _pending_with_expired_leases(self) -> Set[str]:
+        """PENDING 的ID以及租约已过期的 IN_PROGRESS ID"""
+        states = self._current_states()
+        leases = None
+        now = time.time()
+        pending = set()
+        for id, state in states.items():
+            if state == IDState.PENDING:
+                pending.add(id)
+            elif state == IDState.IN_PROGRESS:
+                if leases is None:
+                    leases = self._load_leases()
+                if is_claimable(state, leases.get(id), now):
+                    pending.add(id)
+        return pending
+
+    def claim_ids(
+        self, ids: Iterable[str], worker_id: str, limit: int, lease_seconds: float
+    ) -> List[str]:
+        """从候选ID中认领最多 limit 个可处理的ID，标记为 IN_PROGRESS
+
+        Args:
+            ids: 候选ID，按顺序认领
+            worker_id: 认领者ID
+            limit: 最多认领的数量
+            lease_seconds: 租约时长（秒）
+
+        Returns:
+            List[str]: 认领成功的ID
+        """
+        with self.lock:
+            states = self._current_states()
+            leases = self._load_leases()
+            now = time.time()
+            claimed = []
+            for id in dict.fromkeys(ids):
+                if len(claimed) >= limit:
+                    break
+                if is_claimable(states.get(id), leases.get(id), now):
+                    claimed.append(id)
+            if not claimed:
+                return []
+
+            for id in claimed:
+                leases[id] = Lease(worker_id, now + lease_seconds)
+            self._save_leases(leases)
+            self.update_states({id: IDState.IN_PROGRESS for id in claimed})
+            return claimed
+
+    def claim_pending_ids(
+        self, worker_id: str, limit: int, lease_seconds: float
+    ) -> List[str]:
+        """认领最多 limit 个待处理的ID（包括租约过期的ID）"""
+        with self.lock:
+            return self.claim_ids(
+                sorted(self._pending_with_expired_leases()), worker_id, limit, lease_seconds
+            )
+
+    def renew_leases(
+        self, worker_id: str, ids: Iterable[str], lease_seconds: float
+    ) -> List[str]:
+        """延长 worker 持有的租约
+
+        Returns:
+            List[str]: 续约成功的ID，租约已被其他 worker 接管的ID不会出现在其中
+        """
+        with self.lock:
+            leases = self._load_leases()
+            states = self._current_states()
+            expires_at = time.time() + lease_seconds
+            renewed = [
+                id
+                for id in ids
+                if states.get(id) == IDState.IN_PROGRESS
+                and id in leases
+                and leases[id].worker_id == worker_id
+            ]
+            if renewed:
+                leases.update({id: Lease(worker_id, expires_at) for id in renewed})
+                self._save_leases(leases)
+            return renewed
+
+    def release_ids(
+        self, worker_id: str, ids: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """把 worker 持有的 IN_PROGRESS ID 放回 PENDING
+
+        Args:
+            worker_id: 认领者ID
+            ids: 需要释放的ID，为空时释放该 worker 持有的全部租约
+
+        Returns:
+            List[str]: 被释放的ID
+        """
+        with self.lock:
+            leases = self._load_leases()
+            states = self._current_states()
+            candidates = leases.keys() if ids is None else ids
+            released = [
+                id
+                for id in candidates
+                if id in leases
+                and leases[id].worker_id == worker_id
+                and states.get(id) == IDState.IN_PROGRESS
+            ]
+            if released:
+                self.update_states({id: IDState.PENDING for id in released})
+            return released
+
+    def _drop_leases(self, states: Dict[str, IDState]):
+        """删除状态不再是 IN_PROGRESS 的ID的租约"""
+        if not self.lease_file.exists():
+            return
+        leases = self._load_leases()
+        stale = [
+            id for id, state in states.items()
+            if state != IDState.IN_PROGRESS and id in leases
+        ]
+        if stale:
+            for id in stale:
+                del leases[id]
+            self._save_leases(leases)
+
+
+class StateManager(_FileLeaseMixin):
+    """状态管理器，用于管理ID处理状态
+
+    状态保存在 {namespace}_states{suffix} 文件中，文件的编码由 codec 决定，
+    默认是 JSON。首次以其他编码打开时，如果存在旧的 {namespace}_states.json 文件，
+    会把其中的状态转换为新的编码，并把文件重命名为 {namespace}_states.json.migrated。
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        namespace: str,
+        lock_timeout: Optional[float] = None,
+        codec: str = "json",
+    ):
         """初始化状态管理器
 
         Args:
             base_dir: 状态存储根目录
             namespace: 命名空间，用于区分不同类型的ID
+            lock_timeout: 获取文件锁的超时时间（秒），为空时使用默认超时时间
+            codec: 状态文件的编码，见 CODECS
         """
         self.storage_dir = Path(base_dir) / "pending_states"
         self.storage_dir.mkdir(parents=True, exist_ok=True)
-        self.state_file = self.storage_dir / f"{namespace}_states.json"
+        self.namespace = namespace
+        self.codec = get_codec(codec)
+        self.state_file = self.storage_dir / f"{namespace}_states{self.codec.suffix}"
+        self.lease_file = self.storage_dir / f"{namespace}_leases.json"
+        # 多个进程同时读-改-写状态文件时通过文件锁互斥
+        self.lock = FileLock(self.storage_dir / f"{namespace}_states.lock", lock_timeout)
+        # 已加载的状态及对应的文件版本，文件没有变化时不重新解析
+        self._cached_states: Optional[Dict[str, IDState]] = None
+        self._cached_stamp: Optional[Tuple[int, int]] = None
+
+        if self.codec.name != "json":
+            self._migrate_from_json()
+
+    def _migrate_from_json(self):
+        """把旧的JSON状态文件转换为当前编码"""
+        json_file = self.storage_dir / f"{self.namespace}_states.json"
+        with self.lock:
+            if not json_file.exists() or self.state_file.exists():
+                return
+            with open(json_file, "r", encoding="utf-8") as f:
+                states = {k: IDState(v) for k, v in json.load(f).items()}
+            self._save_states(states)
+            json_file.rename(json_file.with_name(json_file.name + ".migrated"))
+        logger.info(f"已将 {len(states)} 个状态从 {json_file} 转换到 {self.state_file}")
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        """状态文件的版本标识（修改时间和大小），文件不存在时返回 None"""
+        try:
+            stat = self.state_file.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
 
     def _load_states(self) -> Dict[str, IDState]:
-        """加载所有ID的状态"""
-        if not self.state_file.exists():
+        """加载所有ID的状态
+
+        返回的字典会被缓存，调用方修改前需要先复制。
+        """
+        stamp = self._file_stamp()
+        if stamp is None:
             return {}
+        if self._cached_states is not None and stamp == self._cached_stamp:
+            return self._cached_states
 
-        with open(self.state_file, "r", encoding="utf-8") as f:
-            states = json.load(f)
-            return {k: IDState(v) for k, v in states.items()}
+        with open(self.state_file, "rb") as f:
+            states = self.codec.decode(f.read())
+            self._cached_states = {k: IDState(v) for k, v in states.items()}
+            self._cached_stamp = stamp
+            return self._cached_states
 
     def _save_states(self, states: Dict[str, IDState]):
-        """保存所有ID的状态"""
-        with open(self.state_file, "w", encoding="utf-8") as f:
-            json.dump({k: v.value for k, v in states.items()}, f)
+        """原子地保存所有ID的状态"""
+        with atomic_write(self.state_file, "wb") as f:
+            f.write(self.codec.encode({k: v.value for k, v in states.items()}))
+        self._cached_states = states
+        self._cached_stamp = self._file_stamp()
 
-    def get_pending_ids(self) -> Set[str]:
-        """获取待处理的ID集合"""
+    def _current_states(self) -> Dict[str, IDState]:
+        return self._load_states()
+
+    def state_version(self) -> str:
+        """状态的版本标识，状态文件发生变化后会改变"""
+        return str(self._file_stamp())
+
+    def get_finished_ids(self) -> Set[str]:
+        """获取已完成的ID集合"""
         states = self._load_states()
-        return {id for id, state in states.items() if state == IDState.PENDING}
+        return {id for id, state in states.items() if state == IDState.FINISHED}
+
+    def get_pending_ids(self) -> Set[str]:
+        """获取待处理的ID集合，租约已过期的 IN_PROGRESS ID 也视为待处理"""
+        return self._pending_with_expired_leases()
 
     def is_finished(self, id: str) -> bool:
         """判断ID是否已处理完成"""
@@ -53,39 +321,128 @@ class StateManager:
             return False
         return states[id] == IDState.FINISHED
 
-    def store_pending_ids(self, ids: List[str]):
-        """存储待处理的ID，已完成的ID不会被重新标记为pending"""
+    def is_finished_many(self, ids: Iterable[str]) -> Set[str]:
+        """批量判断ID是否已处理完成，只加载一次状态
+
+        Args:
+            ids: 需要判断的ID
+
+        Returns:
+            Set[str]: 其中已处理完成的ID
+        """
         states = self._load_states()
+        return {id for id in ids if states.get(id) == IDState.FINISHED}
 
-        # 只更新那些不是FINISHED状态的ID
-        for id in ids:
-            if states.get(id) != IDState.FINISHED:
-                states[id] = IDState.PENDING
+    def store_pending_ids(self, ids: List[str]):
+        """存储待处理的ID
+
+        只记录尚未出现过的ID，已有的ID保持原状态：FINISHED 不会被重新标记为 pending，
+        其他 worker 正在处理的 IN_PROGRESS 也不会被重置，租约保持有效。
+        """
+        with self.lock:
+            states = self._load_states()
 
-        self._save_states(states)
+            # 只更新那些尚未记录的ID，已有的pending和FINISHED状态都保持不变
+            self.update_states({id: IDState.PENDING for id in ids if id not in states})
 
     def mark_as_finished(self, ids: List[str]):
         """将ID标记为已完成"""
-        states = self._load_states()
+        self.update_states({id: IDState.FINISHED for id in ids})
 
-        # 将指定的ID标记为完成状态
-        for id in ids:
-            states[id] = IDState.FINISHED
+    def update_states(self, states: Dict[str, IDState]):
+        """批量更新ID的状态，只合并发生变化的条目
 
-        self._save_states(states)
+        所有变更都已生效时不会重写状态文件。读取和写入在文件锁中完成，
+        不会覆盖其他进程同时写入的状态。
+
+        Args:
+            states: ID到新状态的映射
+        """
+        with self.lock:
+            current = self._load_states()
+            changes = {
+                id: IDState(state)
+                for id, state in states.items()
+                if current.get(id) != state
+            }
+            if not changes:
+                return
+
+            merged = dict(current)
+            merged.update(changes)
+            self._save_states(merged)
+            self._drop_leases(changes)
+
+
+STATE_BACKENDS = ("json", "sqlite", "log")
+
+
+def create_state_manager(
+    base_dir: str,
+    namespace: str,
+    backend: str = "json",
+    bloom_filter: bool = False,
+    codec: str = "json",
+):
+    """根据后端类型创建状态管理器
+
+    Args:
+        base_dir: 状态存储根目录
+        namespace: 命名空间，用于区分不同类型的ID
+        backend: 存储后端，json、sqlite 或 log
+        bloom_filter: 是否在查询已完成ID时先经过布隆过滤器
+        codec: json 后端状态文件的编码，sqlite 和 log 后端有各自的格式，不使用该参数
+
+    Returns:
+        状态管理器实例
+    """
+    if backend == "json":
+        manager = StateManager(base_dir, namespace, codec=codec)
+    elif backend == "sqlite":
+        # 避免循环导入
+        from daily_paper.core.operators.state.sqlite_state import SqliteStateManager
+
+        manager = SqliteStateManager(base_dir, namespace)
+    elif backend == "log":
+        from daily_paper.core.operators.state.log_state import LogStateManager
+
+        manager = LogStateManager(base_dir, namespace)
+    else:
+        raise ValueError(
+            f"Unknown state backend: {backend}, expected one of {STATE_BACKENDS}"
+        )
+
+    if bloom_filter:
+        from daily_paper.core.operators.state.bloom import BloomFilteredStateManager
+
+        manager = BloomFilteredStateManager(manager)
+    return manager
+
+
+def _item_ids(items: Iterable[Any], id_getter: Callable[[Any], str]) -> List[str]:
+    """获取一批对象的ID，PaperBatch 直接读取 id 列，不为每篇论文构造对象"""
+    if isinstance(items, PaperBatch):
+        return items.column("id")
+    return [id_getter(item) for item in items]
 
 
 class InsertPendingIDs(Operator):
     """将ID标记为待处理状态的算子"""
 
-    def __init__(self, base_dir: str, namespace: str):
+    def __init__(
+        self, base_dir: str, namespace: str, backend: str = "json", codec: str = "json"
+    ):
         """初始化InsertPendingIDs
 
         Args:
             base_dir: 状态存储根目录
             namespace: 命名空间，用于区分不同类型的ID
+            backend: 状态存储后端，json、sqlite 或 log
+            codec: json 后端状态文件的编码
         """
-        self.state_manager = StateManager(base_dir, namespace)
+        self.state_manager = create_state_manager(
+            base_dir, namespace, backend, codec=codec
+        )
 
     async def process(self, ids: List[str]) -> List[str]:
         """将ID添加到待处理状态
@@ -103,14 +460,20 @@ class InsertPendingIDs(Operator):
 class GetAllPendingIDs(Operator):
     """获取所有待处理ID的算子"""
 
-    def __init__(self, base_dir: str, namespace: str):
+    def __init__(
+        self, base_dir: str, namespace: str, backend: str = "json", codec: str = "json"
+    ):
         """初始化GetAllPendingIDs
 
         Args:
             base_dir: 状态存储根目录
             namespace: 命名空间，用于区分不同类型的ID
+            backend: 状态存储后端，json、sqlite 或 log
+            codec: json 后端状态文件的编码
         """
-        self.state_manager = StateManager(base_dir, namespace)
+        self.state_manager = create_state_manager(
+            base_dir, namespace, backend, codec=codec
+        )
 
     async def process(self, _: Any) -> List[str]:
         """获取所有待处理的ID
@@ -125,16 +488,28 @@ class MarkIDsAsFinished(Operator):
     """将对象标记为处理完成的算子"""
 
     def __init__(
-        self, base_dir: str, namespace: str, id_getter: callable = lambda x: x
+        self,
+        base_dir: str,
+        namespace: str,
+        id_getter: callable = lambda x: x,
+        backend: str = "json",
+        bloom_filter: bool = False,
+        codec: str = "json",
     ):
         """初始化MarkIDsAsFinished
 
         Args:
             base_dir: 状态存储根目录
             namespace: 命名空间，用于区分不同类型的ID
-            id_getter: 从对象中获取ID的函数，默认直接返回对象本身
+            id_getter: 从对象中获取ID的函数，默认直接返回对象本身。输入为 PaperBatch 时
+                直接读取 id 列，不调用这个函数
+            backend: 状态存储后端，json、sqlite 或 log
+            bloom_filter: 是否用布隆过滤器预先排除一定没有完成的ID
+            codec: json 后端状态文件的编码
         """
-        self.state_manager = StateManager(base_dir, namespace)
+        self.state_manager = create_state_manager(
+            base_dir, namespace, backend, bloom_filter, codec
+        )
         self.id_getter = id_getter
 
     async def process(self, items: List[Any]) -> List[Any]:
@@ -146,7 +521,7 @@ class MarkIDsAsFinished(Operator):
         Returns:
             List[Any]: 输入的对象列表
         """
-        ids = [self.id_getter(item) for item in items]
+        ids = _item_ids(items, self.id_getter)
         self.state_manager.mark_as_finished(ids)
         return items
 
@@ -155,16 +530,28 @@ class FilterFinishedIDs(Operator):
     """过滤对象列表，只保留ID为未处理完成状态的对象的算子"""
 
     def __init__(
-        self, base_dir: str, namespace: str, id_getter: callable = lambda x: x
+        self,
+        base_dir: str,
+        namespace: str,
+        id_getter: callable = lambda x: x,
+        backend: str = "json",
+        bloom_filter: bool = False,
+        codec: str = "json",
     ):
         """初始化FilterFinishedIDs
 
         Args:
             base_dir: 状态存储根目录
             namespace: 命名空间，用于区分不同类型的ID
-            id_getter: 从对象中获取ID的函数，默认直接返回对象本身
+            id_getter: 从对象中获取ID的函数，默认直接返回对象本身。输入为 PaperBatch 时
+                直接读取 id 列，不调用这个函数
+            backend: 状态存储后端，json、sqlite 或 log
+            bloom_filter: 是否用布隆过滤器预先排除一定没有完成的ID
+            codec: json 后端状态文件的编码
         """
-        self.state_manager = StateManager(base_dir, namespace)
+        self.state_manager = create_state_manager(
+            base_dir, namespace, backend, bloom_filter, codec
+        )
         self.id_getter = id_getter
 
     async def process(self, items: List[Any]) -> List[Any]:
@@ -176,8 +563,141 @@ class FilterFinishedIDs(Operator):
         Returns:
             List[Any]: ID为未处理完成状态的对象列表
         """
-        return [
-            item
-            for item in items
-            if not self.state_manager.is_finished(self.id_getter(item))
-        ]
+        ids = _item_ids(items, self.id_getter)
+        # 一次批量查询已完成的ID，再单趟过滤
+        finished = self.state_manager.is_finished_many(ids)
+        if isinstance(items, PaperBatch):
+            return items.select(id not in finished for id in ids)
+        return [item for item, id in zip(items, ids) if id not in finished]
+
+    async def stream_process(
+        self, items: AsyncIterator[Any]
+    ) -> AsyncGenerator[Any, None]:
+        """逐条过滤对象，只输出ID为未处理完成状态的对象
+
+        Args:
+            items: 需要过滤的对象的异步迭代器
+
+        Yields:
+            Any: ID为未处理完成状态的对象
+        """
+        async for item in items:
+            if not self.state_manager.is_finished(self.id_getter(item)):
+                yield item
+
+
+class ClaimIDs(Operator):
+    """认领一批对象的算子
+
+    从输入的对象中按顺序认领最多 batch_size 个ID未完成且未被其他 worker 持有的对象，
+    并将其标记为 IN_PROGRESS。多个 worker 同时处理同一个数据目录时不会重复处理相同的对象；
+    worker 崩溃后，租约过期的对象可以被其他 worker 重新认领。
+
+    setup 后会启动一个心跳任务，每 heartbeat_seconds 为仍在处理的对象续约，
+    处理时间超过 lease_seconds 的批次（例如 PDF 下载和 LLM 总结都很慢）不会被其他 worker 抢走。
+    已完成或已被接管的对象续约失败后不再续约。cleanup 时停止心跳并释放本 worker 仍然持有的租约。
+    """
+
+    def __init__(
+        self,
+        base_dir: str,
+        namespace: str,
+        batch_size: Union[int, Callable[[], int]],
+        lease_seconds: float,
+        worker_id: Optional[str] = None,
+        id_getter: callable = lambda x: x,
+        backend: str = "json",
+        bloom_filter: bool = False,
+        codec: str = "json",
+        heartbeat_seconds: Optional[float] = None,
+    ):
+        """初始化ClaimIDs
+
+        Args:
+            base_dir: 状态存储根目录
+            namespace: 命名空间，用于区分不同类型的ID
+            batch_size: 每次最多认领的数量，也可以是每次调用时返回数量的函数
+            lease_seconds: 租约时长（秒），超过这个时间没有完成的对象会被重新认领
+            worker_id: 认领者ID，默认为主机名和进程号
+            id_getter: 从对象中获取ID的函数，默认直接返回对象本身。输入为 PaperBatch 时
+                直接读取 id 列，不调用这个函数
+            backend: 状态存储后端，json、sqlite 或 log
+            bloom_filter: 是否同步维护该命名空间的布隆过滤器
+            codec: json 后端状态文件的编码
+            heartbeat_seconds: 续约的间隔（秒），默认为 lease_seconds 的三分之一
+        """
+        self.state_manager = create_state_manager(
+            base_dir, namespace, backend, bloom_filter, codec
+        )
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds or lease_seconds / 3
+        self.worker_id = worker_id or default_worker_id()
+        self.id_getter = id_getter
+        # 本 worker 认领后尚未确认完成的ID，由心跳任务续约
+        self.held_ids: Set[str] = set()
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    async def setup(self):
+        """启动续约的心跳任务"""
+        if self._heartbeat is None:
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                self.renew_leases()
+            except Exception as e:
+                logger.warning(f"{self.worker_id} 续约失败: {e}")
+
+    def renew_leases(self) -> List[str]:
+        """为仍然持有的ID续约，续约失败的ID（已完成或已被接管）不再续约
+
+        Returns:
+            List[str]: 续约成功的ID
+        """
+        if not self.held_ids:
+            return []
+        renewed = self.state_manager.renew_leases(
+            self.worker_id, sorted(self.held_ids), self.lease_seconds
+        )
+        self.held_ids.intersection_update(renewed)
+        return renewed
+
+    async def process(self, items: List[Any]) -> List[Any]:
+        """认领对象
+
+        Args:
+            items: 候选对象列表
+
+        Returns:
+            List[Any]: 认领成功的对象列表
+        """
+        batch_size = self.batch_size() if callable(self.batch_size) else self.batch_size
+        ids = _item_ids(items, self.id_getter)
+        claimed = set(
+            self.state_manager.claim_ids(ids, self.worker_id, batch_size, self.lease_seconds)
+        )
+        self.held_ids.update(claimed)
+        mask = []
+        for id in ids:
+            mask.append(id in claimed)
+            claimed.discard(id)
+        if isinstance(items, PaperBatch):
+            return items.select(mask)
+        return [item for item, keep in zip(items, mask) if keep]
+
+    async def cleanup(self):
+        """停止心跳，释放本 worker 尚未完成的租约，让其他 worker 可以立即认领"""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+        self.held_ids.clear()
+        released = self.state_manager.release_ids(self.worker_id)
+        if released:
+            logger.info(f"{self.worker_id} 释放了 {len(released)} 个未完成的租约")
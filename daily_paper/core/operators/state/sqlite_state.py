@@ -0,0 +1,376 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from daily_paper.core.common.logger import logger
+from daily_paper.core.operators.state.pending import (
+    IDState,
+    Lease,
+    StateManager,
+    is_claimable,
+)
+
+# 单条 SQL 中 IN 子句的参数个数上限，避免超过 SQLite 的变量数限制
+_QUERY_CHUNK_SIZE = 500
+
+
+class SqliteStateManager:
+    """基于 SQLite 的状态管理器
+
+    与 StateManager 接口兼容。所有命名空间的状态保存在
+    {base_dir}/pending_states/states.db 中，以 (namespace, id) 作为主键，
+    单个ID的查询和更新不需要加载全部状态。数据库使用 WAL 模式，
+    多个进程可以同时读取，写入在事务中完成。
+
+    首次打开某个命名空间时，如果存在旧的 {namespace}_states.json 文件，
+    会把其中的状态迁移到数据库中，并把文件重命名为 {namespace}_states.json.migrated。
+
+    IN_PROGRESS 状态的租约（worker_id, lease_expires_at）与状态保存在同一行，
+    认领在 BEGIN IMMEDIATE 事务中完成，多个进程同时认领时不会拿到相同的ID。
+    """
+
+    def __init__(self, base_dir: str, namespace: str):
+        """初始化状态管理器
+
+        Args:
+            base_dir: 状态存储根目录
+            namespace: 命名空间，用于区分不同类型的ID
+        """
+        self.storage_dir = Path(base_dir) / "pending_states"
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.db_file = self.storage_dir / "states.db"
+        self.namespace = namespace
+        # 可重入，locked() 中可以调用其他读写方法
+        self._lock = threading.RLock()
+
+        self._conn = sqlite3.connect(
+            self.db_file, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS id_states (
+                namespace TEXT NOT NULL,
+                id TEXT NOT NULL,
+                state TEXT NOT NULL,
+                PRIMARY KEY (namespace, id)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_id_states_state "
+            "ON id_states (namespace, state)"
+        )
+        # 每个命名空间的写入计数，用于判断状态是否被修改过
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS state_versions (
+                namespace TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(id_states)")}
+        for column, column_type in (("worker_id", "TEXT"), ("lease_expires_at", "REAL")):
+            if column not in columns:
+                self._conn.execute(
+                    f"ALTER TABLE id_states ADD COLUMN {column} {column_type}"
+                )
+
+        self._migrate_from_json()
+
+    def _migrate_from_json(self):
+        """把旧的JSON状态文件迁移到数据库中"""
+        json_manager = StateManager(str(self.storage_dir.parent), self.namespace)
+        if not json_manager.state_file.exists():
+            return
+
+        states = json_manager._load_states()
+        self.update_states(states)
+        json_manager.state_file.rename(
+            json_manager.state_file.with_name(json_manager.state_file.name + ".migrated")
+        )
+        logger.info(
+            f"已将 {len(states)} 个状态从 {json_manager.state_file} 迁移到 {self.db_file}"
+        )
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        """在写事务中执行一组读写操作，期间其他进程和线程不能写入
+
+        BEGIN IMMEDIATE 会立即获取数据库的写锁，其中的写操作并入这个事务，
+        一起提交或回滚。用于需要在写入后读到与之对应的 state_version 的场景。
+        """
+        with self._lock:
+            if self._conn.in_transaction:
+                yield
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @contextmanager
+    def _transaction(self):
+        """在写事务中执行并增加状态版本，已经在 locked() 中时并入外层事务"""
+        with self.locked():
+            yield self._conn
+            self._conn.execute(
+                """
+                INSERT INTO state_versions (namespace, version) VALUES (?, 1)
+                ON CONFLICT (namespace) DO UPDATE SET version = version + 1
+                """,
+                (self.namespace,),
+            )
+
+    def _execute_in_transaction(self, sql: str, rows: Iterable[tuple]):
+        with self._transaction() as conn:
+            conn.executemany(sql, rows)
+
+    def get_pending_ids(self) -> Set[str]:
+        """获取待处理的ID集合，租约已过期的 IN_PROGRESS ID 也视为待处理"""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT id FROM id_states WHERE namespace = ? AND (
+                    state = ? OR (
+                        state = ? AND (lease_expires_at IS NULL OR lease_expires_at <= ?)
+                    )
+                )
+                """,
+                (
+                    self.namespace,
+                    IDState.PENDING.value,
+                    IDState.IN_PROGRESS.value,
+                    time.time(),
+                ),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def state_version(self) -> str:
+        """状态的版本标识，每次写入事务提交后都会改变"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version FROM state_versions WHERE namespace = ?",
+                (self.namespace,),
+            ).fetchone()
+        return str(row[0] if row else 0)
+
+    def get_finished_ids(self) -> Set[str]:
+        """获取已完成的ID集合"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM id_states WHERE namespace = ? AND state = ?",
+                (self.namespace, IDState.FINISHED.value),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def is_finished(self, id: str) -> bool:
+        """判断ID是否已处理完成"""
+        return id in self.is_finished_many([id])
+
+    def is_finished_many(self, ids: Iterable[str]) -> Set[str]:
+        """批量判断ID是否已处理完成
+
+        Args:
+            ids: 需要判断的ID
+
+        Returns:
+            Set[str]: 其中已处理完成的ID
+        """
+        ids = list(dict.fromkeys(ids))
+        finished = set()
+        with self._lock:
+            for start in range(0, len(ids), _QUERY_CHUNK_SIZE):
+                chunk = ids[start : start + _QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT id FROM id_states WHERE namespace = ? AND state = ? "
+                    f"AND id IN ({placeholders})",
+                    (self.namespace, IDState.FINISHED.value, *chunk),
+                ).fetchall()
+                finished.update(row[0] for row in rows)
+        return finished
+
+    def store_pending_ids(self, ids: List[str]):
+        """存储待处理的ID
+
+        只记录尚未出现过的ID，已有的ID保持原状态：FINISHED 不会被重新标记为 pending，
+        其他 worker 正在处理的 IN_PROGRESS 也不会被重置，租约保持有效。
+        """
+        self._execute_in_transaction(
+            """
+            INSERT INTO id_states (namespace, id, state) VALUES (?, ?, ?)
+            ON CONFLICT (namespace, id) DO NOTHING
+            """,
+            ((self.namespace, id, IDState.PENDING.value) for id in ids),
+        )
+
+    def mark_as_finished(self, ids: List[str]):
+        """将ID标记为已完成"""
+        self.update_states({id: IDState.FINISHED for id in ids})
+
+    def update_states(self, states: Dict[str, IDState]):
+        """在一个事务中批量更新ID的状态
+
+        Args:
+            states: ID到新状态的映射
+        """
+        self._execute_in_transaction(
+            """
+            INSERT INTO id_states (namespace, id, state) VALUES (?, ?, ?)
+            ON CONFLICT (namespace, id) DO UPDATE SET
+                state = excluded.state, worker_id = NULL, lease_expires_at = NULL
+            """,
+            ((self.namespace, id, IDState(state).value) for id, state in states.items()),
+        )
+
+    def _select_leases(self, conn, ids: List[str]) -> Dict[str, tuple]:
+        """查询ID的状态和租约"""
+        found = {}
+        for start in range(0, len(ids), _QUERY_CHUNK_SIZE):
+            chunk = ids[start : start + _QUERY_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT id, state, worker_id, lease_expires_at FROM id_states "
+                f"WHERE namespace = ? AND id IN ({placeholders})",
+                (self.namespace, *chunk),
+            ).fetchall()
+            for id, state, worker_id, expires_at in rows:
+                lease = Lease(worker_id, expires_at) if worker_id is not None else None
+                found[id] = (IDState(state), lease)
+        return found
+
+    def _claim(self, conn, ids: List[str], worker_id: str, limit: int, lease_seconds: float):
+        now = time.time()
+        found = self._select_leases(conn, ids)
+        claimed = []
+        for id in ids:
+            if len(claimed) >= limit:
+                break
+            state, lease = found.get(id, (None, None))
+            if is_claimable(state, lease, now):
+                claimed.append(id)
+        conn.executemany(
+            """
+            INSERT INTO id_states (namespace, id, state, worker_id, lease_expires_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (namespace, id) DO UPDATE SET state = excluded.state,
+                worker_id = excluded.worker_id, lease_expires_at = excluded.lease_expires_at
+            """,
+            (
+                (self.namespace, id, IDState.IN_PROGRESS.value, worker_id, now + lease_seconds)
+                for id in claimed
+            ),
+        )
+        return claimed
+
+    def claim_ids(
+        self, ids: Iterable[str], worker_id: str, limit: int, lease_seconds: float
+    ) -> List[str]:
+        """在一个事务中从候选ID里认领最多 limit 个可处理的ID，标记为 IN_PROGRESS
+
+        Args:
+            ids: 候选ID，按顺序认领
+            worker_id: 认领者ID
+            limit: 最多认领的数量
+            lease_seconds: 租约时长（秒）
+
+        Returns:
+            List[str]: 认领成功的ID
+        """
+        ids = list(dict.fromkeys(ids))
+        with self._transaction() as conn:
+            return self._claim(conn, ids, worker_id, limit, lease_seconds)
+
+    def claim_pending_ids(
+        self, worker_id: str, limit: int, lease_seconds: float
+    ) -> List[str]:
+        """在一个事务中认领最多 limit 个待处理的ID（包括租约过期的ID）"""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                """
+                SELECT id FROM id_states WHERE namespace = ? AND (
+                    state = ? OR (
+                        state = ? AND (lease_expires_at IS NULL OR lease_expires_at <= ?)
+                    )
+                )
+                ORDER BY id LIMIT ?
+                """,
+                (
+                    self.namespace,
+                    IDState.PENDING.value,
+                    IDState.IN_PROGRESS.value,
+                    time.time(),
+                    limit,
+                ),
+            ).fetchall()
+            return self._claim(conn, [row[0] for row in rows], worker_id, limit, lease_seconds)
+
+    def renew_leases(
+        self, worker_id: str, ids: Iterable[str], lease_seconds: float
+    ) -> List[str]:
+        """延长 worker 持有的租约
+
+        Returns:
+            List[str]: 续约成功的ID，租约已被其他 worker 接管的ID不会出现在其中
+        """
+        ids = list(dict.fromkeys(ids))
+        with self._transaction() as conn:
+            found = self._select_leases(conn, ids)
+            renewed = [
+                id
+                for id in ids
+                if id in found
+                and found[id][0] == IDState.IN_PROGRESS
+                and found[id][1] is not None
+                and found[id][1].worker_id == worker_id
+            ]
+            conn.executemany(
+                "UPDATE id_states SET lease_expires_at = ? WHERE namespace = ? AND id = ?",
+                ((time.time() + lease_seconds, self.namespace, id) for id in renewed),
+            )
+        return renewed
+
+    def release_ids(
+        self, worker_id: str, ids: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """把 worker 持有的 IN_PROGRESS ID 放回 PENDING
+
+        Args:
+            worker_id: 认领者ID
+            ids: 需要释放的ID，为空时释放该 worker 持有的全部租约
+
+        Returns:
+            List[str]: 被释放的ID
+        """
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT id FROM id_states WHERE namespace = ? AND state = ? AND worker_id = ?",
+                (self.namespace, IDState.IN_PROGRESS.value, worker_id),
+            ).fetchall()
+            held = [row[0] for row in rows]
+            if ids is not None:
+                held_ids = set(held)
+                held = [id for id in dict.fromkeys(ids) if id in held_ids]
+            released = held
+            conn.executemany(
+                """
+                UPDATE id_states SET state = ?, worker_id = NULL, lease_expires_at = NULL
+                WHERE namespace = ? AND id = ?
+                """,
+                ((IDState.PENDING.value, self.namespace, id) for id in released),
+            )
+        return released
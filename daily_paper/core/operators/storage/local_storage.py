@@ -1,29 +1,177 @@
-from typing import Any, List, Callable, Dict, Tuple, Optional
+from typing import (
+    Any,
+    AsyncGenerator,
+    List,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    Sequence,
+    Tuple,
+    Optional,
+)
 from pathlib import Path
+from dataclasses import dataclass
+import asyncio
 import json
 from datetime import datetime
 
 from daily_paper.core.operators.base import Operator
+from daily_paper.core.common.codec import get_codec
+from daily_paper.core.common.file_lock import FileLock, atomic_write
+from daily_paper.core.common.logger import logger
+from daily_paper.core.operators.storage.parquet_store import ParquetStore
+from daily_paper.core.operators.storage.secondary_index import (
+    SecondaryIndex,
+    tokenize_authors,
+)
+from daily_paper.core.operators.storage.segment_store import SegmentStore
+
+
+STORAGE_FORMATS = ("json", "segments", "parquet")
 
 
 class LocalStorage:
-    """本地存储基类，处理文件路径和存储相关的通用逻辑"""
+    """本地存储基类，处理文件路径和存储相关的通用逻辑
+
+    支持三种存储格式：
+
+    - json: 整个命名空间保存在一个文件中，每次写入都重写整个文件。文件的编码由 codec
+      决定（见 daily_paper.core.common.codec），默认是 {namespace}.json，
+      也可以是 msgpack 等二进制编码以及 zstd 压缩，例如 {namespace}.msgpack.zst
+    - segments: 追加式的 JSONL 段存储（见 SegmentStore），写入开销只与本批数据量有关
+    - parquet: 按 update_date 分区的 Parquet 列式存储（见 ParquetStore），
+      读取时可以只读取需要的列、只扫描需要的分区，需要安装 pyarrow
+
+    首次以 segments、parquet 格式或者非 JSON 编码打开时，如果存在旧的 {namespace}.json 文件，
+    会把其中的数据导入新的存储，并把文件重命名为 {namespace}.json.migrated。
+    segments 和 parquet 格式有各自的编码，不使用 codec。
 
-    def __init__(self, storage_dir: str, storage_namespace: str):
+    开启 secondary_index 后，会在 {namespace}.index.db 中维护 update_date、category
+    和作者的二级索引（见 SecondaryIndex），随每次写入增量更新，
+    按日期范围、类别和作者的查询以及按 update_date 排序不再需要扫描全部记录。
+    没有开启索引的实例写入时，如果索引文件已经存在，也会把它标记为 dirty，
+    开启索引的实例在下次读写时从存储重建索引，不会读到缺少这些记录的索引。
+    """
+
+    def __init__(
+        self,
+        storage_dir: str,
+        storage_namespace: str,
+        lock_timeout: Optional[float] = None,
+        storage_format: str = "json",
+        secondary_index: bool = False,
+        codec: str = "json",
+    ):
         """初始化LocalStorage
 
         Args:
             storage_dir: 存储目录
             storage_namespace: 存储命名空间
+            lock_timeout: 获取文件锁的超时时间（秒），为空时使用默认超时时间
+            storage_format: 存储格式，json、segments 或 parquet
+            secondary_index: 是否维护 update_date、category 和作者的二级索引
+            codec: json 格式下存储文件的编码，见 CODECS
         """
+        if storage_format not in STORAGE_FORMATS:
+            raise ValueError(
+                f"Unknown storage format: {storage_format}, expected one of {STORAGE_FORMATS}"
+            )
         self.storage_dir = Path(storage_dir)
         self.storage_namespace = storage_namespace
+        self.storage_format = storage_format
+        self.codec = get_codec(codec)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
+        # 多个进程同时读-改-写存储文件时通过文件锁互斥
+        self.lock = FileLock(self.storage_dir / f"{storage_namespace}.lock", lock_timeout)
+
+        # segments 和 parquet 格式下实际保存记录的存储，json 格式下为空
+        self.record_store: Optional[Any] = None
+        if storage_format == "segments":
+            self.record_store = SegmentStore(
+                storage_dir, storage_namespace, lock_timeout=lock_timeout
+            )
+        elif storage_format == "parquet":
+            self.record_store = ParquetStore(
+                storage_dir, storage_namespace, lock_timeout=lock_timeout
+            )
+        if self.record_store is not None or self.codec.name != "json":
+            self._migrate_from_json()
+
+        self.index: Optional[SecondaryIndex] = None
+        if secondary_index:
+            self.index = SecondaryIndex(self.index_file)
+            self._refresh_index()
+
+    def _refresh_index(self):
+        """索引可能与存储不一致时从存储重建
+
+        包括新建的索引、上次写入存储后没有来得及更新的索引，
+        以及其他没有开启索引的实例写入存储后被标记为 dirty 的索引。
+        """
+        with self.lock:
+            if self.index.dirty:
+                self.index.rebuild(self.iter_records())
+                logger.info(
+                    f"已重建 {self.storage_namespace} 的二级索引，共 {len(self.index)} 条记录"
+                )
+
+    def _mark_index_dirty(self) -> bool:
+        """在文件锁中、写入存储之前调用，把索引标记为 dirty
+
+        没有开启索引的实例在索引文件存在时也会标记，否则其他实例的索引会悄悄过期。
+
+        Returns:
+            bool: 标记之前索引是否已经是 dirty 的，此时写入后不能增量更新，需要重建
+        """
+        if self.index is not None:
+            stale = self.index.dirty
+            self.index.mark_dirty()
+            return stale
+        if self.index_file.exists():
+            index = SecondaryIndex(self.index_file)
+            try:
+                index.mark_dirty()
+            finally:
+                index.close()
+        return True
+
+    def _migrate_from_json(self):
+        """把旧的JSON存储文件导入新的存储格式或编码"""
+        with self.lock:
+            if not self.json_file.exists():
+                return
+            if self.record_store is not None:
+                if len(self.record_store) > 0:
+                    return
+            elif self.storage_file.exists():
+                return
+            with open(self.json_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._put_records(data)
+            self.json_file.rename(
+                self.json_file.with_name(self.json_file.name + ".migrated")
+            )
+        logger.info(
+            f"已将 {len(data)} 条记录从 {self.json_file} 导入 "
+            f"{self.storage_format} ({self.codec.name}) 存储"
+        )
+
+    @property
+    def json_file(self) -> Path:
+        """旧的JSON存储文件路径"""
+        return self.storage_dir / f"{self.storage_namespace}.json"
+
+    @property
+    def index_file(self) -> Path:
+        """二级索引文件路径"""
+        return self.storage_dir / f"{self.storage_namespace}.index.db"
 
     @property
     def storage_file(self) -> Path:
         """获取存储文件路径"""
-        return self.storage_dir / f"{self.storage_namespace}.json"
+        return self.storage_dir / f"{self.storage_namespace}{self.codec.suffix}"
 
     def read_storage(self) -> Dict[str, Any]:
         """读取存储文件中的所有数据
@@ -31,20 +179,116 @@ class LocalStorage:
         Returns:
             Dict[str, Any]: 存储的数据字典
         """
+        if self.record_store is not None:
+            return dict(self.record_store.items())
+
         if not self.storage_file.exists():
             return {}
 
-        with open(self.storage_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(self.storage_file, "rb") as f:
+            return self.codec.decode(f.read())
 
     def write_storage(self, data: Dict[str, Any]):
-        """写入数据到存储文件
+        """原子地写入数据到存储文件，写入过程中崩溃不会留下不完整的文件
 
         Args:
             data: 要存储的数据字典
         """
-        with open(self.storage_file, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with self.lock:
+            self._mark_index_dirty()
+            self._write_all(data)
+            if self.index is not None:
+                self.index.rebuild(data.items())
+
+    def _write_all(self, data: Dict[str, Any]):
+        if self.record_store is not None:
+            self.record_store.replace_all(data)
+            return
+
+        with atomic_write(self.storage_file, "wb") as f:
+            f.write(self.codec.encode(data))
+
+    def put_records(self, records: Dict[str, Any]):
+        """写入或覆盖一批记录
+
+        Args:
+            records: key 到记录的映射
+        """
+        # 存储和索引在同一把锁中更新，多个进程写入同一个 key 时两者的顺序一致
+        with self.lock:
+            stale = self._mark_index_dirty()
+            self._put_records(records)
+            if self.index is None:
+                return
+            if stale:
+                self.index.rebuild(self.iter_records())
+            else:
+                self.index.update(records)
+
+    def _put_records(self, records: Dict[str, Any]):
+        if self.record_store is not None:
+            self.record_store.put_many(records)
+            return
+
+        # 在文件锁中读-改-写，避免覆盖其他进程同时写入的数据
+        with self.lock:
+            existing_data = self.read_storage()
+            existing_data.update(records)
+            self._write_all(existing_data)
+
+    def get_records(
+        self, keys: Sequence[str], fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Tuple[str, Any]]:
+        """按给定顺序读取多个 key 的记录，不存在的 key 会被跳过
+
+        Args:
+            keys: 需要读取的 key
+            fields: 只读取 value 中的这些字段，只有 parquet 格式会下推到文件读取
+
+        Returns:
+            Iterator[Tuple[str, Any]]: (key, 记录) 的迭代器
+        """
+        if self.record_store is None:
+            data = self.read_storage()
+            return ((key, data[key]) for key in keys if key in data)
+        return self._get_records_in_chunks(keys, fields)
+
+    def _get_records_in_chunks(
+        self, keys: Sequence[str], fields: Optional[Sequence[str]], chunk_size: int = 500
+    ) -> Iterator[Tuple[str, Any]]:
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start : start + chunk_size]
+            if isinstance(self.record_store, ParquetStore):
+                records = self.record_store.get_many(chunk, fields)
+            else:
+                records = self.record_store.get_many(chunk)
+            for key in chunk:
+                if key in records:
+                    yield key, records[key]
+
+    def iter_records(self, query: Optional["StorageQuery"] = None) -> Iterator[Tuple[str, Any]]:
+        """逐条返回存储的所有记录
+
+        parquet 格式会把查询中的 update_date 范围和需要读取的字段下推到文件扫描中，
+        返回的记录仍然需要调用方用 query.match 过滤。
+
+        Args:
+            query: 扫描时下推的过滤条件和字段投影，为空时读取全部记录
+
+        Returns:
+            Iterator[Tuple[str, Any]]: (key, 记录) 的迭代器
+        """
+        if isinstance(self.record_store, ParquetStore):
+            if query is None:
+                return self.record_store.items()
+            return self.record_store.items(
+                fields=query.scan_fields(),
+                update_date_from=query.update_date_from,
+                update_date_to=query.update_date_to,
+            )
+        if self.record_store is not None:
+            return self.record_store.items()
+        return iter(self.read_storage().items())
 
 
 class LocalStorageWriter(Operator, LocalStorage):
@@ -55,6 +299,10 @@ class LocalStorageWriter(Operator, LocalStorage):
         storage_dir: str,
         storage_namespace: str,
         key_value_getter: Callable[[Any], Tuple[str, Optional[Any]]] = None,
+        lock_timeout: Optional[float] = None,
+        storage_format: str = "json",
+        secondary_index: bool = False,
+        codec: str = "json",
     ):
         """初始化LocalStorageWriter
 
@@ -62,8 +310,20 @@ class LocalStorageWriter(Operator, LocalStorage):
             storage_dir: 存储目录
             storage_namespace: 存储命名空间
             key_value_getter: 从输入数据中提取key和value的函数
+            lock_timeout: 获取文件锁的超时时间（秒），为空时使用默认超时时间
+            storage_format: 存储格式，json、segments 或 parquet
+            secondary_index: 是否在写入时维护二级索引
+            codec: json 格式下存储文件的编码，见 CODECS
         """
-        LocalStorage.__init__(self, storage_dir, storage_namespace)
+        LocalStorage.__init__(
+            self,
+            storage_dir,
+            storage_namespace,
+            lock_timeout,
+            storage_format,
+            secondary_index,
+            codec,
+        )
         self.key_value_getter = key_value_getter
 
     async def process(self, items: List[Any]) -> List[Any]:
@@ -78,26 +338,109 @@ class LocalStorageWriter(Operator, LocalStorage):
         if not self.key_value_getter:
             raise ValueError("key_value_getter not provided")
 
-        # 读取现有数据
-        existing_data = self.read_storage()
-
         # 处理新数据
+        records = {}
         for item in items:
             key, value = self.key_value_getter(item)
             if value is None:
                 continue
             # 更新或添加新数据
-            existing_data[key] = {
+            records[key] = {
                 "value": value,
                 "stored_at": datetime.now().isoformat(),
             }
 
-        # 保存所有数据
-        self.write_storage(existing_data)
+        # 只写入本批数据，已有数据的合并由存储格式负责
+        self.put_records(records)
 
         return items
 
 
+@dataclass
+class StorageQuery:
+    """扫描存储时下推的过滤条件和字段投影
+
+    过滤条件在扫描记录时逐条判断，不满足条件的记录不会被转换为输出对象。
+    所有条件之间是“与”的关系，为空的条件不生效。
+
+    Attributes:
+        update_date_from: 只保留 update_date 不早于该日期（YYYY-MM-DD）的记录
+        update_date_to: 只保留 update_date 不晚于该日期（YYYY-MM-DD）的记录
+        categories: 只保留 category 属于其中之一的记录
+        author: 只保留作者中包含这些词的记录（不区分大小写），例如 "hinton"
+        exclude_finished: 状态管理器，key 在其中已完成的记录会被排除
+        predicate: 自定义过滤函数，接收 (key, value)
+        fields: 只保留 value 中的这些字段
+        order: 按 update_date 排序输出，"asc" 或 "desc"，为空时按存储顺序输出
+    """
+
+    update_date_from: Optional[str] = None
+    update_date_to: Optional[str] = None
+    categories: Optional[Collection[str]] = None
+    author: Optional[str] = None
+    exclude_finished: Optional[Any] = None
+    predicate: Optional[Callable[[str, Any], bool]] = None
+    fields: Optional[Sequence[str]] = None
+    order: Optional[str] = None
+
+    def __post_init__(self):
+        if self.order not in (None, "asc", "desc"):
+            raise ValueError(f"Unknown order: {self.order}, expected 'asc' or 'desc'")
+
+    @property
+    def indexable(self) -> bool:
+        """是否包含可以通过二级索引查询的条件或排序"""
+        return bool(
+            self.update_date_from
+            or self.update_date_to
+            or self.categories is not None
+            or self.author
+            or self.order
+        )
+
+    def match(self, key: str, value: Any) -> bool:
+        """判断单条记录是否满足除 exclude_finished 以外的条件"""
+        if self.update_date_from or self.update_date_to:
+            update_date = value.get("update_date") or ""
+            if self.update_date_from and update_date < self.update_date_from:
+                return False
+            if self.update_date_to and update_date > self.update_date_to:
+                return False
+        if self.categories is not None and value.get("category") not in self.categories:
+            return False
+        if self.author and not tokenize_authors(self.author) <= tokenize_authors(
+            value.get("authors")
+        ):
+            return False
+        if self.predicate is not None and not self.predicate(key, value):
+            return False
+        return True
+
+    def scan_fields(self) -> Optional[List[str]]:
+        """扫描时需要从存储中读取的字段，为空表示需要全部字段
+
+        自定义过滤函数可能用到任意字段，此时不做投影。
+        """
+        if self.fields is None or self.predicate is not None:
+            return None
+        fields = list(self.fields)
+        if self.update_date_from or self.update_date_to:
+            fields.append("update_date")
+        if self.categories is not None:
+            fields.append("category")
+        if self.author:
+            fields.append("authors")
+        if self.order:
+            fields.append("update_date")
+        return fields
+
+    def project(self, value: Any) -> Any:
+        """只保留需要的字段"""
+        if self.fields is None:
+            return value
+        return {field: value[field] for field in self.fields if field in value}
+
+
 class LocalStorageReader(Operator, LocalStorage):
     """从本地存储读取键值对数据的算子"""
 
@@ -106,6 +449,13 @@ class LocalStorageReader(Operator, LocalStorage):
         storage_dir: str,
         storage_namespace: str,
         value_reader: Callable[[str, Dict[str, Any]], Any] = None,
+        lock_timeout: Optional[float] = None,
+        storage_format: str = "json",
+        query: Optional[StorageQuery] = None,
+        scan_batch_size: int = 500,
+        secondary_index: bool = False,
+        codec: str = "json",
+        container: Optional[Callable[[Iterable[Any]], Any]] = None,
     ):
         """初始化LocalStorageReader
 
@@ -114,9 +464,83 @@ class LocalStorageReader(Operator, LocalStorage):
             storage_namespace: 存储命名空间
             value_reader: 将存储的键值对转换为输出数据的函数，接收 (key, value_dict) 作为参数
                          value_dict 包含 'value' 和 'stored_at' 两个字段
+            lock_timeout: 获取文件锁的超时时间（秒），为空时使用默认超时时间
+            storage_format: 存储格式，json、segments 或 parquet
+            query: 扫描时下推的过滤条件和字段投影，为空时读取全部记录
+            scan_batch_size: 扫描时每批查询已完成状态的记录数
+            secondary_index: 是否维护并使用二级索引，开启后按日期、类别、作者的查询
+                和排序通过索引完成
+            codec: json 格式下存储文件的编码，见 CODECS
+            container: 批量模式下收集输出数据的函数，默认收集为列表，
+                例如可以用 PaperBatch.from_papers 收集为列式的论文批次
         """
-        LocalStorage.__init__(self, storage_dir, storage_namespace)
+        LocalStorage.__init__(
+            self,
+            storage_dir,
+            storage_namespace,
+            lock_timeout,
+            storage_format,
+            secondary_index,
+            codec,
+        )
         self.value_reader = value_reader or (lambda k, v: v)
+        self.query = query
+        self.scan_batch_size = scan_batch_size
+        self.container = container or list
+
+    def _flush_batch(self, batch: List[Tuple[str, Any]]) -> List[Any]:
+        """排除已完成的记录，投影后转换为输出数据"""
+        query = self.query
+        if query is not None and query.exclude_finished is not None:
+            finished = query.exclude_finished.is_finished_many(key for key, _ in batch)
+            batch = [(key, value) for key, value in batch if key not in finished]
+        return [
+            self.value_reader(key, query.project(value) if query else value)
+            for key, value in batch
+        ]
+
+    def _matching_records(self) -> Iterator[Tuple[str, Any]]:
+        """返回候选记录，有二级索引时只读取索引命中的记录"""
+        query = self.query
+        if query is None:
+            return self.iter_records()
+        if self.index is not None and query.indexable:
+            self._refresh_index()
+            keys = self.index.scan(
+                update_date_from=query.update_date_from,
+                update_date_to=query.update_date_to,
+                categories=query.categories,
+                author=query.author,
+                descending=query.order == "desc",
+            )
+            return self.get_records(keys, query.scan_fields())
+        records = self.iter_records(query)
+        if query.order:
+            # 没有索引时只能读取全部记录后排序
+            records = sorted(
+                records,
+                key=lambda item: ((item[1]["value"].get("update_date") or ""), item[0]),
+                reverse=query.order == "desc",
+            )
+        return records
+
+    def scan(self) -> Iterator[List[Any]]:
+        """按批扫描存储，边扫描边过滤，逐批返回转换后的数据
+
+        Yields:
+            List[Any]: 一批满足条件的数据
+        """
+        batch = []
+        for key, value_dict in self._matching_records():
+            value = value_dict["value"]
+            if self.query is not None and not self.query.match(key, value):
+                continue
+            batch.append((key, value))
+            if len(batch) >= self.scan_batch_size:
+                yield self._flush_batch(batch)
+                batch = []
+        if batch:
+            yield self._flush_batch(batch)
 
     async def process(self, items: List[Any]) -> List[Any]:
         """从本地存储读取数据
@@ -125,14 +549,18 @@ class LocalStorageReader(Operator, LocalStorage):
             items: 输入数据列表（在这个算子中不会被使用）
 
         Returns:
-            List[Any]: 从存储中读取并转换后的数据列表
+            List[Any]: 从存储中读取、过滤并转换后的数据，容器类型由 container 决定
         """
-        stored_data = self.read_storage()
+        return self.container(item for batch in self.scan() for item in batch)
 
-        # 使用value_reader函数转换每个存储的键值对
-        result = []
-        for key, value_dict in stored_data.items():
-            transformed_value = self.value_reader(key, value_dict["value"])
-            result.append(transformed_value)
+    async def stream_process(self, _: Any) -> AsyncGenerator[Any, None]:
+        """流式读取数据，每扫描一批就输出，不会把整个命名空间加载到内存中
 
-        return result
+        Yields:
+            Any: 满足条件并转换后的单条数据
+        """
+        for batch in self.scan():
+            for item in batch:
+                yield item
+            # 每批之间让出事件循环，下游可以边读边处理
+            await asyncio.sleep(0)
@@ -0,0 +1,349 @@
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from daily_paper.core.common.file_lock import FileLock, fsync_dir
+from daily_paper.core.common.logger import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 是可选依赖，只有 parquet 存储格式需要
+    pa = pq = None
+
+# 记录的 key、写入时间和非字典 value 在 Parquet 文件中的列名
+KEY_COLUMN = "_key"
+STORED_AT_COLUMN = "_stored_at"
+VALUE_COLUMN = "_value"
+PARTITION_FIELD = "update_date"
+
+_FILE_PATTERN = re.compile(r"^part-(\d+)\.parquet$")
+
+
+def _partition_name(value: Any) -> str:
+    """记录所在分区的目录名"""
+    date = value.get(PARTITION_FIELD) if isinstance(value, dict) else None
+    date = re.sub(r"[^0-9A-Za-z_-]", "_", str(date)) if date else "unknown"
+    return f"{PARTITION_FIELD}={date}"
+
+
+class ParquetStore:
+    """按 update_date 分区的 Parquet 列式键值存储
+
+    数据保存在 {directory}/{namespace}.parquet/update_date=YYYY-MM-DD/part-{seq}.parquet 中。
+    每批写入按分区各追加一个小文件，文件编号全局递增；同一个 key 以编号最大的文件中的记录为准
+    （论文的 update_date 变化后新记录会写入新的分区）。内存中维护 key 到文件编号的索引，
+    打开时只读取各文件的 _key 列建立。
+
+    记录的 value 为字典时每个字段保存为一列，读取时可以只读取需要的列；
+    按 update_date 范围读取时只扫描对应的分区目录。
+
+    某个分区的文件数达到 compact_min_files 时，在后台线程中把它们合并为一个只包含
+    最新记录的文件：合并结果原子地替换编号最大的旧文件，再删除其余旧文件。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        namespace: str,
+        compact_min_files: int = 8,
+        lock_timeout: Optional[float] = None,
+    ):
+        """初始化 Parquet 存储
+
+        Args:
+            directory: 存储目录
+            namespace: 存储命名空间
+            compact_min_files: 触发分区合并的文件数
+            lock_timeout: 获取文件锁的超时时间（秒），为空时使用默认超时时间
+
+        Raises:
+            ImportError: 没有安装 pyarrow
+        """
+        if pa is None:
+            raise ImportError(
+                "pyarrow is required for the parquet storage format, "
+                "install it with `pip install pyarrow`"
+            )
+        self.dataset_dir = Path(directory) / f"{namespace}.parquet"
+        self.dataset_dir.mkdir(parents=True, exist_ok=True)
+        self.compact_min_files = compact_min_files
+        self.lock = FileLock(self.dataset_dir / "LOCK", lock_timeout)
+        self.compact_lock = FileLock(self.dataset_dir / "COMPACT.lock", lock_timeout)
+
+        # key -> 最新记录所在的文件编号
+        self._index: Dict[str, int] = {}
+        # 已读入索引的文件：编号 -> (分区名, inode)
+        self._files: Dict[int, Tuple[str, int]] = {}
+        self._compaction: Optional[threading.Thread] = None
+
+        with self.lock:
+            self._refresh()
+
+    def _file_path(self, partition: str, seq: int) -> Path:
+        return self.dataset_dir / partition / f"part-{seq:08d}.parquet"
+
+    def _list_files(self) -> Dict[int, Tuple[str, int]]:
+        files = {}
+        for partition in os.scandir(self.dataset_dir):
+            if not partition.is_dir():
+                continue
+            for entry in os.scandir(partition.path):
+                match = _FILE_PATTERN.match(entry.name)
+                if match:
+                    files[int(match.group(1))] = (partition.name, entry.inode())
+        return files
+
+    def _refresh(self):
+        """读入其他进程新写入的文件，文件被替换或删除时重新建立索引，调用方需持有锁"""
+        files = self._list_files()
+        if any(files.get(seq) != info for seq, info in self._files.items()):
+            self._index = {}
+            self._files = {}
+        for seq in sorted(set(files) - set(self._files)):
+            partition = files[seq][0]
+            keys = pq.read_table(
+                self._file_path(partition, seq), columns=[KEY_COLUMN]
+            ).column(KEY_COLUMN)
+            for key in keys.to_pylist():
+                if self._index.get(key, -1) < seq:
+                    self._index[key] = seq
+            self._files[seq] = files[seq]
+
+    def _write_file(self, path: Path, rows: List[dict]):
+        """原子地写入一个 Parquet 文件"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        pq.write_table(pa.Table.from_pylist(rows), tmp_path)
+        with open(tmp_path, "rb") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        fsync_dir(path.parent)
+
+    def put_many(self, records: Dict[str, Dict[str, Any]]):
+        """批量写入记录，已存在的 key 会被覆盖
+
+        Args:
+            records: key 到 {"value": ..., "stored_at": ...} 的映射
+        """
+        if not records:
+            return
+        partitions: Dict[str, List[Tuple[str, dict]]] = {}
+        for key, record in records.items():
+            value = record["value"]
+            if isinstance(value, dict):
+                row = dict(value)
+            else:
+                row = {VALUE_COLUMN: json.dumps(value, ensure_ascii=False)}
+            row[KEY_COLUMN] = key
+            row[STORED_AT_COLUMN] = record.get("stored_at")
+            partitions.setdefault(_partition_name(value), []).append((key, row))
+
+        with self.lock:
+            self._refresh()
+            compact = []
+            for partition, rows in partitions.items():
+                seq = max(self._files, default=0) + 1
+                path = self._file_path(partition, seq)
+                self._write_file(path, [row for _, row in rows])
+                self._files[seq] = (partition, os.stat(path).st_ino)
+                for key, _ in rows:
+                    self._index[key] = seq
+                if self._partition_file_count(partition) >= self.compact_min_files:
+                    compact.append(partition)
+            if compact:
+                self.compact(compact, wait=False)
+
+    def _partition_file_count(self, partition: str) -> int:
+        return sum(1 for name, _ in self._files.values() if name == partition)
+
+    def _row_to_record(self, row: dict) -> Tuple[str, Dict[str, Any]]:
+        key = row.pop(KEY_COLUMN)
+        stored_at = row.pop(STORED_AT_COLUMN, None)
+        if VALUE_COLUMN in row:
+            value = json.loads(row.pop(VALUE_COLUMN))
+        else:
+            value = row
+        return key, {"value": value, "stored_at": stored_at}
+
+    def items(
+        self,
+        fields: Optional[Sequence[str]] = None,
+        update_date_from: Optional[str] = None,
+        update_date_to: Optional[str] = None,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """逐个文件扫描，返回每个 key 的最新记录
+
+        Args:
+            fields: 只读取 value 中的这些字段，为空时读取全部字段
+            update_date_from: 只扫描 update_date 不早于该日期的分区
+            update_date_to: 只扫描 update_date 不晚于该日期的分区
+
+        Yields:
+            Tuple[str, Dict[str, Any]]: key 和 {"value": ..., "stored_at": ...}
+        """
+        with self.lock:
+            self._refresh()
+            index = dict(self._index)
+            files = sorted(self._files.items())
+
+        for seq, (partition, _) in files:
+            date = partition.split("=", 1)[1]
+            if date != "unknown":
+                if update_date_from and date < update_date_from:
+                    continue
+                if update_date_to and date > update_date_to:
+                    continue
+            path = self._file_path(partition, seq)
+            try:
+                table = pq.read_table(path, columns=self._read_columns(path, fields))
+            except FileNotFoundError:
+                # 扫描期间文件被合并，合并后的记录已经在更大编号的文件中
+                continue
+            for row in table.to_pylist():
+                if index.get(row[KEY_COLUMN]) == seq:
+                    yield self._row_to_record(row)
+
+    def _read_columns(self, path: Path, fields: Optional[Sequence[str]]) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        schema = pq.read_schema(path)
+        return [
+            name
+            for name in (KEY_COLUMN, STORED_AT_COLUMN, VALUE_COLUMN, *fields)
+            if name in schema.names
+        ]
+
+    def get_many(
+        self, keys: Iterable[str], fields: Optional[Sequence[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """批量读取多个 key 的最新记录，只读取包含这些 key 的文件
+
+        Args:
+            keys: 需要读取的 key
+            fields: 只读取 value 中的这些字段，为空时读取全部字段
+
+        Returns:
+            Dict[str, Dict[str, Any]]: key 到 {"value": ..., "stored_at": ...} 的映射，
+                不存在的 key 不会出现在结果中
+        """
+        with self.lock:
+            self._refresh()
+            by_file: Dict[int, List[str]] = {}
+            for key in keys:
+                seq = self._index.get(key)
+                if seq is not None:
+                    by_file.setdefault(seq, []).append(key)
+            result = {}
+            # 在锁内读取，避免文件在读取期间被合并删除
+            for seq, file_keys in sorted(by_file.items()):
+                path = self._file_path(self._files[seq][0], seq)
+                table = pq.read_table(
+                    path,
+                    columns=self._read_columns(path, fields),
+                    filters=[(KEY_COLUMN, "in", file_keys)],
+                )
+                for row in table.to_pylist():
+                    key, record = self._row_to_record(row)
+                    result[key] = record
+            return result
+
+    def __len__(self) -> int:
+        with self.lock:
+            self._refresh()
+            return len(self._index)
+
+    def compact(self, partitions: Optional[Sequence[str]] = None, wait: bool = True):
+        """合并分区中的小文件
+
+        其他进程正在合并时本次合并会被跳过。
+
+        Args:
+            partitions: 需要合并的分区目录名，为空时合并所有分区
+            wait: 是否等待合并完成，为 False 时在后台线程中进行
+        """
+        with self.lock:
+            if self._compaction is None or not self._compaction.is_alive():
+                self._compaction = threading.Thread(
+                    target=self._compact, args=(partitions,), daemon=True
+                )
+                self._compaction.start()
+            thread = self._compaction
+        if wait:
+            thread.join()
+
+    def _compact(self, partitions: Optional[Sequence[str]]):
+        if not self.compact_lock.acquire(blocking=False):
+            return
+        try:
+            with self.lock:
+                self._refresh()
+                if partitions is None:
+                    partitions = sorted({name for name, _ in self._files.values()})
+                plans = {
+                    partition: sorted(
+                        seq for seq, (name, _) in self._files.items() if name == partition
+                    )
+                    for partition in partitions
+                }
+            for partition, seqs in plans.items():
+                if len(seqs) >= 2:
+                    self._compact_partition(partition, seqs)
+        except Exception as e:
+            logger.error(f"合并 Parquet 文件 {self.dataset_dir} 失败: {e}")
+        finally:
+            self.compact_lock.release()
+
+    def _compact_partition(self, partition: str, seqs: List[int]):
+        tables = []
+        for seq in seqs:
+            table = pq.read_table(self._file_path(partition, seq))
+            with self.lock:
+                live = [self._index.get(key) == seq for key in table.column(KEY_COLUMN).to_pylist()]
+            tables.append(table.filter(pa.array(live, type=pa.bool_())))
+        merged = pa.concat_tables(tables, promote_options="default")
+
+        target = seqs[-1]
+        with self.lock:
+            # 合并期间被覆盖的 key 不再保留在合并结果中
+            keys = merged.column(KEY_COLUMN).to_pylist()
+            still_live = [self._index.get(key) in seqs for key in keys]
+            merged = merged.filter(pa.array(still_live, type=pa.bool_()))
+
+            path = self._file_path(partition, target)
+            tmp_path = path.with_name(path.name + ".merging")
+            pq.write_table(merged, tmp_path)
+            with open(tmp_path, "rb") as f:
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            fsync_dir(path.parent)
+            for seq in seqs[:-1]:
+                self._file_path(partition, seq).unlink()
+                self._files.pop(seq, None)
+            for key in merged.column(KEY_COLUMN).to_pylist():
+                self._index[key] = target
+            self._files[target] = (partition, os.stat(path).st_ino)
+        logger.debug(f"已合并分区 {partition} 的 {len(seqs)} 个文件，共 {merged.num_rows} 条记录")
+
+    def replace_all(self, records: Dict[str, Dict[str, Any]]):
+        """用给定的记录替换全部数据"""
+        with self.lock:
+            self._refresh()
+            old_files = dict(self._files)
+            self.put_many(records)
+            for seq, (partition, _) in old_files.items():
+                self._file_path(partition, seq).unlink()
+                self._files.pop(seq, None)
+            self._index = {}
+            self._files = {}
+            self._refresh()
+
+    def close(self):
+        """等待后台合并结束"""
+        with self.lock:
+            thread = self._compaction
+        if thread is not None:
+            thread.join()
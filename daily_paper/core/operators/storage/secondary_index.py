@@ -0,0 +1,207 @@
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterable, List, Optional, Set, Tuple
+
+# 单条 SQL 中 IN 子句的参数个数上限，避免超过 SQLite 的变量数限制
+_QUERY_CHUNK_SIZE = 500
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize_authors(authors: Any) -> Set[str]:
+    """把作者字段切分为小写的词，例如 "Geoffrey Hinton, Yann LeCun" 切分为
+    {"geoffrey", "hinton", "yann", "lecun"}"""
+    if not authors:
+        return set()
+    if not isinstance(authors, str):
+        authors = " ".join(str(author) for author in authors)
+    return {token.lower() for token in _TOKEN_PATTERN.findall(authors)}
+
+
+class SecondaryIndex:
+    """存储记录上的二级索引
+
+    在 SQLite 文件中按 key 保存记录的 update_date 和 category，以及作者切分后的词，
+    并在 (update_date)、(category, update_date)、(token) 上建立 B 树索引，
+    按日期范围、类别和作者查询时只需要访问命中的索引项，结果按 update_date 排序。
+
+    索引随存储的每次写入增量更新。写入存储前先把索引标记为 dirty，
+    索引更新完成后清除；进程在两者之间崩溃时，下次打开会从存储中重建索引。
+    """
+
+    def __init__(self, index_file: Path):
+        """初始化二级索引
+
+        Args:
+            index_file: 索引数据库文件路径
+        """
+        self.index_file = Path(index_file)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.index_file, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                key TEXT PRIMARY KEY,
+                update_date TEXT,
+                category TEXT
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_records_update_date
+                ON records (update_date, key);
+            CREATE INDEX IF NOT EXISTS idx_records_category
+                ON records (category, update_date, key);
+            CREATE TABLE IF NOT EXISTS author_tokens (
+                token TEXT NOT NULL,
+                key TEXT NOT NULL,
+                PRIMARY KEY (token, key)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_author_tokens_key ON author_tokens (key);
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            INSERT OR IGNORE INTO meta (name, value) VALUES ('dirty', '1');
+            """
+        )
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    @property
+    def dirty(self) -> bool:
+        """索引是否可能与存储不一致，新建的索引也是 dirty 的"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE name = 'dirty'").fetchone()
+        return row is None or row[0] == "1"
+
+    def mark_dirty(self):
+        """在写入存储之前调用"""
+        with self._transaction() as conn:
+            conn.execute("UPDATE meta SET value = '1' WHERE name = 'dirty'")
+
+    def _upsert(self, conn: sqlite3.Connection, records: Iterable[Tuple[str, Any]]):
+        rows = []
+        tokens = []
+        keys = []
+        for key, value in records:
+            if not isinstance(value, dict):
+                value = {}
+            keys.append((key,))
+            rows.append((key, value.get("update_date"), value.get("category")))
+            tokens.extend((token, key) for token in tokenize_authors(value.get("authors")))
+        conn.executemany("DELETE FROM author_tokens WHERE key = ?", keys)
+        conn.executemany(
+            "INSERT OR REPLACE INTO records (key, update_date, category) VALUES (?, ?, ?)",
+            rows,
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO author_tokens (token, key) VALUES (?, ?)", tokens
+        )
+
+    def update(self, records: Dict[str, Any]):
+        """增量更新一批记录的索引项，并清除 dirty 标记
+
+        Args:
+            records: key 到存储记录（{"value": ..., "stored_at": ...}）的映射
+        """
+        with self._transaction() as conn:
+            self._upsert(conn, ((key, record.get("value")) for key, record in records.items()))
+            conn.execute("UPDATE meta SET value = '0' WHERE name = 'dirty'")
+
+    def rebuild(self, records: Iterable[Tuple[str, Any]]):
+        """清空索引并从存储的全部记录重建
+
+        Args:
+            records: (key, 存储记录) 的迭代器
+        """
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM records")
+            conn.execute("DELETE FROM author_tokens")
+            batch = []
+            for key, record in records:
+                batch.append((key, record.get("value")))
+                if len(batch) >= _QUERY_CHUNK_SIZE:
+                    self._upsert(conn, batch)
+                    batch = []
+            self._upsert(conn, batch)
+            conn.execute("UPDATE meta SET value = '0' WHERE name = 'dirty'")
+
+    def scan(
+        self,
+        update_date_from: Optional[str] = None,
+        update_date_to: Optional[str] = None,
+        categories: Optional[Collection[str]] = None,
+        author: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[str]:
+        """按条件查询记录的 key，结果按 (update_date, key) 排序
+
+        Args:
+            update_date_from: 只保留 update_date 不早于该日期的记录
+            update_date_to: 只保留 update_date 不晚于该日期的记录
+            categories: 只保留 category 属于其中之一的记录
+            author: 只保留作者中包含这些词的记录，例如 "hinton" 或 "Geoffrey Hinton"
+            descending: 是否按 update_date 从新到旧排序
+            limit: 最多返回的记录数
+
+        Returns:
+            List[str]: 满足条件的 key
+        """
+        conditions = []
+        params: List[Any] = []
+        if update_date_from:
+            conditions.append("r.update_date >= ?")
+            params.append(update_date_from)
+        if update_date_to:
+            conditions.append("r.update_date <= ?")
+            params.append(update_date_to)
+        if categories is not None:
+            categories = list(categories)
+            if not categories:
+                return []
+            conditions.append(f"r.category IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        if author:
+            tokens = sorted(tokenize_authors(author))
+            if not tokens:
+                return []
+            for token in tokens:
+                conditions.append(
+                    "EXISTS (SELECT 1 FROM author_tokens t WHERE t.token = ? AND t.key = r.key)"
+                )
+                params.append(token)
+
+        order = "DESC" if descending else "ASC"
+        sql = "SELECT r.key FROM records r"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY r.update_date {order}, r.key {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
@@ -0,0 +1,349 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from daily_paper.core.common.file_lock import FileLock, atomic_write, fsync_dir
+from daily_paper.core.common.logger import logger
+
+
+class _Location(NamedTuple):
+    """记录在段文件中的位置"""
+
+    segment: int
+    offset: int
+    length: int
+
+
+def _encode_line(key: str, value: Any) -> bytes:
+    return (
+        json.dumps({"k": key, "v": value}, ensure_ascii=False, separators=(",", ":"))
+        + "\n"
+    ).encode("utf-8")
+
+
+def _decode_line(line: bytes) -> Optional[Tuple[str, Any]]:
+    """解码一行记录，记录不完整时返回 None"""
+    if not line.endswith(b"\n"):
+        return None
+    try:
+        record = json.loads(line)
+        return record["k"], record["v"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class SegmentStore:
+    """分段的追加式 JSONL 键值存储
+
+    数据保存在 {directory}/{namespace}.segments/ 下按编号递增的段文件中，每行一条
+    {"k": key, "v": value} 记录。写入只追加到最新的段，写满 max_segment_bytes 后开启新段；
+    同一个 key 以最后写入的记录为准。内存中维护 key 到 (段, 偏移, 长度) 的索引，
+    单次写入的开销只与本批数据量有关。
+
+    已写满的段数量达到 merge_min_segments 时，在后台线程中把它们合并为一个只包含
+    最新记录的段：合并结果原子地替换编号最大的旧段，再删除其余旧段，
+    中途崩溃时剩下的旧段只包含被覆盖的记录，重放结果不变。
+
+    所有读写都在跨进程的文件锁中进行，其他进程追加的记录会被增量读入索引，
+    段文件被替换（合并）后会重新建立索引。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        namespace: str,
+        max_segment_bytes: int = 64 * 2**20,
+        merge_min_segments: int = 4,
+        lock_timeout: Optional[float] = None,
+    ):
+        """初始化段存储
+
+        Args:
+            directory: 存储目录
+            namespace: 存储命名空间
+            max_segment_bytes: 单个段文件的最大字节数
+            merge_min_segments: 触发后台合并的已写满段的数量
+            lock_timeout: 获取文件锁的超时时间（秒），为空时使用默认超时时间
+        """
+        self.segment_dir = Path(directory) / f"{namespace}.segments"
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.merge_min_segments = merge_min_segments
+        self.lock = FileLock(self.segment_dir / "LOCK", lock_timeout)
+        self.merge_lock = FileLock(self.segment_dir / "MERGE.lock", lock_timeout)
+
+        self._index: Dict[str, _Location] = {}
+        # 已读入索引的段文件：编号 -> (inode, 已读取的字节数)
+        self._scanned: Dict[int, Tuple[int, int]] = {}
+        self._merge_thread: Optional[threading.Thread] = None
+
+        with self.lock:
+            self._refresh()
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.segment_dir / f"{segment:08d}.jsonl"
+
+    def _list_segments(self) -> Dict[int, int]:
+        """列出所有段文件，返回 编号 -> inode"""
+        segments = {}
+        for entry in os.scandir(self.segment_dir):
+            name = entry.name
+            if name.endswith(".jsonl") and name[:-6].isdigit():
+                segments[int(name[:-6])] = entry.inode()
+        return segments
+
+    def _scan(self, segment: int, offset: int, truncate: bool) -> int:
+        """从 offset 开始把段文件中的记录读入索引，返回有效记录的结束位置"""
+        path = self._segment_path(segment)
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                record = _decode_line(line)
+                if record is None:
+                    break
+                self._index[record[0]] = _Location(segment, offset, len(line))
+                offset += len(line)
+            torn = f.read(1) != b"" or f.tell() != offset
+        if torn and truncate:
+            logger.warning(f"段文件 {path} 在 {offset} 字节处损坏，截断之后的内容")
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+        return offset
+
+    def _refresh(self):
+        """读入其他进程追加的记录，段文件被替换或删除时重新建立索引，调用方需持有锁"""
+        segments = self._list_segments()
+        rebuild = any(
+            segments.get(segment) != inode
+            for segment, (inode, _) in self._scanned.items()
+        )
+        if rebuild:
+            self._index = {}
+            self._scanned = {}
+
+        for segment in sorted(segments):
+            inode, offset = self._scanned.get(segment, (segments[segment], 0))
+            if offset < self._segment_path(segment).stat().st_size:
+                offset = self._scan(segment, offset, truncate=True)
+            self._scanned[segment] = (inode, offset)
+
+    def _active_segment(self) -> int:
+        if not self._scanned:
+            return 1
+        segment = max(self._scanned)
+        if self._scanned[segment][1] >= self.max_segment_bytes:
+            return segment + 1
+        return segment
+
+    def put_many(self, records: Dict[str, Any]):
+        """批量写入记录，已存在的 key 会被覆盖
+
+        Args:
+            records: key 到 value 的映射，value 需要可以被 JSON 序列化
+        """
+        if not records:
+            return
+        with self.lock:
+            self._refresh()
+            segment = self._active_segment()
+            path = self._segment_path(segment)
+            with open(path, "ab") as f:
+                offset = f.tell()
+                locations = {}
+                lines = []
+                for key, value in records.items():
+                    line = _encode_line(key, value)
+                    locations[key] = _Location(segment, offset, len(line))
+                    offset += len(line)
+                    lines.append(line)
+                f.write(b"".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            self._index.update(locations)
+            self._scanned[segment] = (os.stat(path).st_ino, offset)
+            if offset >= self.max_segment_bytes:
+                fsync_dir(self.segment_dir)
+            sealed = len(self._scanned) - (0 if offset >= self.max_segment_bytes else 1)
+            if sealed >= self.merge_min_segments:
+                self.merge(wait=False)
+
+    def _read(self, location: _Location) -> Any:
+        with open(self._segment_path(location.segment), "rb") as f:
+            f.seek(location.offset)
+            return _decode_line(f.read(location.length))[1]
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取 key 对应的最新记录，不存在时返回 None"""
+        with self.lock:
+            self._refresh()
+            location = self._index.get(key)
+            return self._read(location) if location else None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """批量读取多个 key 的最新记录，不存在的 key 不会出现在结果中"""
+        with self.lock:
+            self._refresh()
+            locations = sorted(
+                (location, key)
+                for key in keys
+                if (location := self._index.get(key)) is not None
+            )
+            result = {}
+            handles = {}
+            try:
+                for location, key in locations:
+                    f = handles.get(location.segment)
+                    if f is None:
+                        f = handles[location.segment] = open(
+                            self._segment_path(location.segment), "rb"
+                        )
+                    f.seek(location.offset)
+                    result[key] = _decode_line(f.read(location.length))[1]
+            finally:
+                for f in handles.values():
+                    f.close()
+            return result
+
+    def keys(self) -> List[str]:
+        """获取所有 key"""
+        with self.lock:
+            self._refresh()
+            return list(self._index)
+
+    def __len__(self) -> int:
+        with self.lock:
+            self._refresh()
+            return len(self._index)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """按段的顺序扫描，逐条返回每个 key 的最新记录
+
+        扫描开始时对索引做一次快照，扫描期间的新写入不会出现在结果中。
+        """
+        with self.lock:
+            self._refresh()
+            live = {location: key for key, location in self._index.items()}
+            segments = sorted({location.segment for location in live})
+            handles = {}
+            # 在锁内打开文件，之后即使段被合并替换，已打开的文件内容也不会变化
+            for segment in segments:
+                handles[segment] = open(self._segment_path(segment), "rb")
+
+        by_segment: Dict[int, List[_Location]] = {}
+        for location in live:
+            by_segment.setdefault(location.segment, []).append(location)
+        try:
+            for segment in segments:
+                f = handles[segment]
+                for location in sorted(by_segment[segment]):
+                    f.seek(location.offset)
+                    record = _decode_line(f.read(location.length))
+                    yield record[0], record[1]
+        finally:
+            for f in handles.values():
+                f.close()
+
+    def replace_all(self, records: Dict[str, Any]):
+        """用给定的记录替换全部数据
+
+        Args:
+            records: key 到 value 的映射
+        """
+        with self.lock:
+            self._refresh()
+            segment = max(self._scanned, default=0) + 1
+            with atomic_write(self._segment_path(segment), "wb") as f:
+                for key, value in records.items():
+                    f.write(_encode_line(key, value))
+            for old in list(self._scanned):
+                self._segment_path(old).unlink()
+            self._index = {}
+            self._scanned = {}
+            self._refresh()
+
+    def merge(self, wait: bool = True):
+        """把已写满的段合并为一个只包含最新记录的段
+
+        其他进程正在合并时本次合并会被跳过。
+
+        Args:
+            wait: 是否等待合并完成，为 False 时在后台线程中进行
+        """
+        with self.lock:
+            if self._merge_thread is None or not self._merge_thread.is_alive():
+                self._merge_thread = threading.Thread(target=self._merge, daemon=True)
+                self._merge_thread.start()
+            thread = self._merge_thread
+        if wait:
+            thread.join()
+
+    def _merge(self):
+        if not self.merge_lock.acquire(blocking=False):
+            return
+        try:
+            with self.lock:
+                self._refresh()
+                if len(self._scanned) < 2:
+                    return
+                # 最新的段还在追加，只合并之前的段；段文件写满后不会再被修改
+                sealed = sorted(self._scanned)[:-1]
+                sealed_set = set(sealed)
+                live = sorted(
+                    (location, key)
+                    for key, location in self._index.items()
+                    if location.segment in sealed_set
+                )
+            if len(sealed) < 2:
+                return
+
+            target = sealed[-1]
+            tmp_path = self.segment_dir / f"{target:08d}.merging"
+            new_locations = {}
+            with open(tmp_path, "wb") as out:
+                offset = 0
+                handles = {}
+                try:
+                    for location, key in live:
+                        f = handles.get(location.segment)
+                        if f is None:
+                            f = handles[location.segment] = open(
+                                self._segment_path(location.segment), "rb"
+                            )
+                        f.seek(location.offset)
+                        line = f.read(location.length)
+                        out.write(line)
+                        new_locations[key] = (location, _Location(target, offset, len(line)))
+                        offset += len(line)
+                finally:
+                    for f in handles.values():
+                        f.close()
+                out.flush()
+                os.fsync(out.fileno())
+
+            with self.lock:
+                os.replace(tmp_path, self._segment_path(target))
+                fsync_dir(self.segment_dir)
+                for segment in sealed[:-1]:
+                    self._segment_path(segment).unlink()
+                    self._scanned.pop(segment, None)
+                # 合并期间被新写入覆盖的 key 保持指向新记录
+                for key, (old, new) in new_locations.items():
+                    if self._index.get(key) == old:
+                        self._index[key] = new
+                self._scanned[target] = (os.stat(self._segment_path(target)).st_ino, offset)
+            logger.debug(
+                f"已合并 {len(sealed)} 个段到 {self._segment_path(target)}，共 {len(live)} 条记录"
+            )
+        except Exception as e:
+            logger.error(f"合并段文件 {self.segment_dir} 失败: {e}")
+        finally:
+            self.merge_lock.release()
+
+    def close(self):
+        """等待后台合并结束"""
+        with self.lock:
+            thread = self._merge_thread
+        if thread is not None:
+            thread.join()
@@ -1,19 +1,131 @@
-from typing import Dict, List, Set, Any, Optional
+from typing import Dict, List, Set, Any, Optional, AsyncGenerator
 import asyncio
 from collections import defaultdict
+from collections.abc import Sequence
 
-from daily_paper.core.operators.base import Operator, OperatorNode, OperatorStatus
+from daily_paper.core.operators.base import (
+    Operator,
+    OperatorNode,
+    OperatorStatus,
+    iterate_items,
+)
+from daily_paper.core.common.logger import logger
+from daily_paper.core.checkpoint import CheckpointStore, compute_fingerprint
+from daily_paper.core.tracing import trace_span
+from daily_paper.core.metrics import (
+    MetricsCollector,
+    OperatorMetrics,
+    PipelineRunReport,
+    count_items,
+    notify_collectors,
+    _current_metrics,
+)
+
+# 流式执行模式下表示数据流结束的标记
+_END_OF_STREAM = object()
+
+
+class _StreamChannel:
+    """连接两个算子的有界异步队列
+
+    队列写满时上游算子会被阻塞，从而实现背压。
+    """
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.finished = False
+
+    async def put(self, item: Any):
+        await self.queue.put(item)
+
+    async def close(self):
+        await self.queue.put(_END_OF_STREAM)
+
+    async def items(self) -> AsyncGenerator[Any, None]:
+        """逐个读取队列中的数据，直到遇到结束标记"""
+        while not self.finished:
+            item = await self.queue.get()
+            if item is _END_OF_STREAM:
+                self.finished = True
+                return
+            yield item
+
+    async def drain(self):
+        """丢弃剩余数据，避免下游提前结束时上游被永久阻塞"""
+        while not self.finished:
+            if await self.queue.get() is _END_OF_STREAM:
+                self.finished = True
 
 
 class DAGPipeline:
     """DAG流水线实现"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        stream_queue_size: int = 16,
+        collectors: Optional[List[MetricsCollector]] = None,
+        checkpoint_dir: Optional[str] = None,
+        fuse_operators: bool = True,
+        release_fused_results: bool = False,
+    ):
+        """初始化DAGPipeline
+
+        Args:
+            max_concurrency: 同时运行的算子数量上限，None 表示不限制
+            stream_queue_size: 流式执行模式下算子之间队列的容量
+            collectors: 接收执行统计信息的回调列表
+            checkpoint_dir: 检查点存储目录。设置后 checkpointable 的算子的输出会被保存，
+                重新执行时如果算子的输入和配置没有变化，会直接复用检查点中的结果。
+                检查点只在批量模式下生效
+            fuse_operators: 是否把由 fusible 算子（如 CustomProcessor）组成的线性链
+                合并为一个调度单元执行。合并后链上的算子在同一个任务中依次执行，
+                减少任务调度的开销，执行结果与不合并时相同
+            release_fused_results: 是否在下一个算子使用后立即释放合并链的中间结果。
+                开启后可以降低内存占用，但链上中间算子的结果不会出现在 execute 的返回值中
+        """
         self.operators: Dict[str, OperatorNode] = {}
         self.execution_order: List[Set[str]] = []
+        self.max_concurrency = max_concurrency
+        self.stream_queue_size = stream_queue_size
+        self.collectors: List[MetricsCollector] = list(collectors or [])
+        # 最近一次执行的统计报告
+        self.last_report: Optional[PipelineRunReport] = None
+        self.checkpoint_store = (
+            CheckpointStore(checkpoint_dir) if checkpoint_dir else None
+        )
+        self._is_setup = False
+        self.fuse_operators = fuse_operators
+        self.release_fused_results = release_fused_results
+        # 合并执行的算子链，key 为链的第一个算子，value 为链上按顺序排列的算子
+        self.fused_chains: Dict[str, List[str]] = {}
+
+    def add_collector(self, collector: MetricsCollector):
+        """添加接收执行统计信息的回调"""
+        self.collectors.append(collector)
+
+    def _start_report(self, mode: str) -> PipelineRunReport:
+        """为一次执行创建统计报告"""
+        report = PipelineRunReport(mode=mode)
+        for name, op_node in self.operators.items():
+            report.operators[name] = OperatorMetrics(
+                name=name, operator=op_node.operator.__class__.__name__
+            )
+        self.last_report = report
+        notify_collectors(self.collectors, "on_pipeline_start", report)
+        return report
+
+    def _finish_report(self, report: PipelineRunReport, status: OperatorStatus):
+        """结束统计报告并通知回调"""
+        report.finish(status.value)
+        notify_collectors(self.collectors, "on_pipeline_end", report)
 
     def add_operator(
-        self, name: str, operator: Operator, dependencies: Optional[List[str]] = None
+        self,
+        name: str,
+        operator: Operator,
+        dependencies: Optional[List[str]] = None,
+        partitions: int = 1,
     ):
         """添加算子到DAG中
 
@@ -21,10 +133,14 @@ class DAGPipeline:
             name: 算子名称
             operator: 算子实例
             dependencies: 依赖的算子名称列表
+            partitions: 批量模式下将输入序列切分成的分片数，各分片由独立的算子实例
+                并发执行后按原顺序合并结果。大于 1 时要求算子是 partitionable 的
         """
         if name in self.operators:
             raise ValueError(f"Operator with name {name} already exists")
 
+        self._validate_partitions(name, operator, partitions)
+
         if dependencies is None:
             dependencies = set()
         else:
@@ -35,11 +151,76 @@ class DAGPipeline:
             dependencies = set(dependencies)
 
         self.operators[name] = OperatorNode(
-            operator=operator, name=name, dependencies=dependencies
+            operator=operator,
+            name=name,
+            dependencies=dependencies,
+            partitions=partitions,
         )
 
         # 重新计算执行顺序
         self._compute_execution_order()
+        self._compute_fused_chains()
+
+    def _validate_partitions(self, name: str, operator: Operator, partitions: int):
+        if partitions < 1:
+            raise ValueError(f"partitions must be positive, got {partitions}")
+        if partitions > 1 and not operator.partitionable:
+            raise ValueError(f"Operator {name} is not partitionable")
+        if partitions > 1 and type(operator).replicate is Operator.replicate:
+            raise ValueError(
+                f"Operator {name} is partitionable but does not implement replicate"
+            )
+
+    def set_partitions(self, name: str, partitions: int):
+        """设置算子在批量模式下的分片数
+
+        Args:
+            name: 算子名称
+            partitions: 分片数
+        """
+        if name not in self.operators:
+            raise ValueError(f"Operator {name} does not exist")
+        op_node = self.operators[name]
+        self._validate_partitions(name, op_node.operator, partitions)
+        op_node.partitions = partitions
+
+    def _compute_fused_chains(self):
+        """找出可以合并执行的算子链
+
+        当算子 B 只依赖算子 A，A 只被 B 依赖，且两者都是 fusible 的算子时，
+        B 会被合并到 A 所在的链中。只包含一个算子的链不做合并。
+        """
+        self.fused_chains = {}
+        if not self.fuse_operators:
+            return
+
+        dependents: Dict[str, List[str]] = defaultdict(list)
+        for name, op_node in self.operators.items():
+            for dep in op_node.dependencies:
+                dependents[dep].append(name)
+
+        def fused_successor(name: str) -> Optional[str]:
+            if len(dependents[name]) != 1:
+                return None
+            child = dependents[name][0]
+            child_node = self.operators[child]
+            if (
+                self.operators[name].operator.fusible
+                and child_node.operator.fusible
+                and child_node.dependencies == {name}
+            ):
+                return child
+            return None
+
+        fused = {child for name in self.operators if (child := fused_successor(name))}
+        for name in self.operators:
+            if name in fused:
+                continue
+            chain = [name]
+            while (child := fused_successor(chain[-1])) is not None:
+                chain.append(child)
+            if len(chain) > 1:
+                self.fused_chains[name] = chain
 
     def _compute_execution_order(self):
         """计算算子的执行顺序，生成可并行执行的层级"""
@@ -62,77 +243,468 @@ class DAGPipeline:
             self.execution_order.append(executable)
             remaining -= executable
 
-    async def execute(self, initial_data: Any = None) -> Dict[str, Any]:
+    def _collect_input(
+        self, op_node: OperatorNode, results: Dict[str, Any], initial_data: Any
+    ) -> Any:
+        """收集算子的输入数据
+
+        没有依赖的算子使用初始输入数据，只有一个依赖的算子直接使用该依赖的结果，
+        多个依赖的算子使用依赖结果组成的列表。
+        """
+        if not op_node.dependencies:
+            return initial_data
+
+        deps_results = [results[dep] for dep in op_node.dependencies]
+        if len(deps_results) == 1:
+            return deps_results[0]
+        return deps_results
+
+    async def execute(self, initial_data: Any = None, commit: bool = True) -> Dict[str, Any]:
         """执行流水线
 
+        算子在其所有依赖完成后立即被调度执行，而不是等待整个层级完成，
+        因此较慢的分支不会阻塞与其无关的下游算子。如果设置了 max_concurrency，
+        同时运行的算子数量不会超过该值。
+
         Args:
             initial_data: 初始输入数据
+            commit: 成功执行后是否调用 commit() 提交各算子暂存的状态
 
         Returns:
             Dict[str, Any]: 每个算子的执行结果
         """
+        report = self._start_report("batch")
+        run_status = OperatorStatus.FAILED
+        # 已经通过 setup() 初始化的流水线由调用方负责清理
+        owns_session = not self._is_setup
         try:
             # 初始化所有算子
-            setup_tasks = []
-            for op in self.operators.values():
-                setup_tasks.append(op.operator.setup())
-            await asyncio.gather(*setup_tasks)
+            if owns_session:
+                await self.setup()
 
             # 重置所有算子状态
             for op in self.operators.values():
-                op.status = OperatorStatus.PENDING
-                op.result = None
+                op.reset()
 
             results = {}
             if initial_data is not None:
                 results["initial"] = initial_data
 
-            # 按层级执行算子
-            for layer in self.execution_order:
-                # 同一层级的算子可以并行执行
-                tasks = []
-                for op_name in layer:
-                    op_node = self.operators[op_name]
-                    # 收集所有依赖的结果
-                    input_data = initial_data
-                    if op_node.dependencies:
-                        # 如果有依赖，使用依赖的结果作为输入
-                        deps_results = [results[dep] for dep in op_node.dependencies]
-                        if len(deps_results) == 1:
-                            input_data = deps_results[0]
-                        else:
-                            input_data = deps_results
-
-                    op_node.status = OperatorStatus.RUNNING
-                    tasks.append(self._execute_operator(op_node, input_data))
-
-                # 等待当前层级的所有算子执行完成
-                layer_results = await asyncio.gather(*tasks, return_exceptions=True)
-
-                # 处理执行结果
-                for op_name, result in zip(layer, layer_results):
+            semaphore = (
+                asyncio.Semaphore(self.max_concurrency)
+                if self.max_concurrency
+                else None
+            )
+
+            # 每个算子尚未完成的依赖，以及每个算子的下游算子
+            waiting_deps = {
+                name: set(op.dependencies) for name, op in self.operators.items()
+            }
+            dependents: Dict[str, Set[str]] = defaultdict(set)
+            for name, op in self.operators.items():
+                for dep in op.dependencies:
+                    dependents[dep].add(name)
+
+            running: Dict[asyncio.Task, str] = {}
+            failure: Optional[Exception] = None
+
+            def schedule(op_name: str):
+                op_node = self.operators[op_name]
+                input_data = self._collect_input(op_node, results, initial_data)
+                # 合并执行的算子链作为一个整体调度，以链的最后一个算子的名称记录
+                chain = self.fused_chains.get(op_name, [op_name])
+                task = asyncio.create_task(
+                    self._execute_chain_with_limit(chain, input_data, semaphore)
+                )
+                running[task] = chain
+
+            for op_name, deps in waiting_deps.items():
+                if not deps:
+                    schedule(op_name)
+
+            while running:
+                done, _ = await asyncio.wait(
+                    running.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    chain = running.pop(task)
+                    op_name = chain[-1]
                     op_node = self.operators[op_name]
-                    if isinstance(result, Exception):
-                        op_node.status = OperatorStatus.FAILED
-                        raise result
-                    else:
-                        op_node.status = OperatorStatus.COMPLETED
-                        op_node.result = result
-                        results[op_name] = result
+                    error = task.exception()
+                    if error is not None:
+                        # 记录第一个错误，不再调度新的算子，等待正在运行的算子结束
+                        if failure is None:
+                            failure = error
+                        continue
 
+                    op_node.status = OperatorStatus.COMPLETED
+                    op_node.result = task.result()
+                    results[op_name] = op_node.result
+                    if not self.release_fused_results:
+                        for name in chain[:-1]:
+                            results[name] = self.operators[name].result
+
+                    if failure is not None:
+                        continue
+
+                    # 依赖全部完成的下游算子立即进入调度
+                    for child in dependents[op_name]:
+                        waiting_deps[child].discard(op_name)
+                        if not waiting_deps[child]:
+                            schedule(child)
+
+            if failure is not None:
+                raise failure
+
+            if commit:
+                await self.commit()
+            run_status = OperatorStatus.COMPLETED
             return results
         except Exception as e:
             raise e
         finally:
             # 确保在执行完成或发生异常时都能清理资源
-            await self.cleanup()
+            if owns_session:
+                await self.cleanup()
+            self._finish_report(report, run_status)
+
+    async def _execute_chain_with_limit(
+        self,
+        chain: List[str],
+        input_data: Any,
+        semaphore: Optional[asyncio.Semaphore],
+    ) -> Any:
+        """在全局并发限制下执行一个算子或一条合并执行的算子链"""
+        if semaphore is None:
+            return await self._execute_chain(chain, input_data)
+
+        async with semaphore:
+            return await self._execute_chain(chain, input_data)
+
+    async def _execute_chain(self, chain: List[str], input_data: Any) -> Any:
+        """在同一个任务中依次执行链上的算子，返回最后一个算子的结果
+
+        开启 release_fused_results 时，除最后一个算子外，链上算子的结果只传递给下一个算子，
+        不会被保留。
+        """
+        data = input_data
+        for op_name in chain:
+            op_node = self.operators[op_name]
+            op_node.status = OperatorStatus.RUNNING
+            try:
+                data = await self._execute_operator(op_node, data)
+            except Exception as e:
+                op_node.error = e
+                raise e
+            if op_name != chain[-1]:
+                op_node.status = OperatorStatus.COMPLETED
+                if not self.release_fused_results:
+                    op_node.result = data
+        return data
+
+    async def execute_stream(
+        self, initial_data: Any = None, commit: bool = True
+    ) -> Dict[str, List[Any]]:
+        """以流式模式执行流水线
+
+        所有算子同时启动，通过有界队列逐条传递数据，每个算子调用
+        Operator.stream_process 处理上游的数据流。下游处理不过来时上游会被阻塞，
+        因此内存占用与队列容量相关，而不是与数据总量相关。
+
+        流式模式要求每个算子最多只有一个依赖。没有依赖的算子以 initial_data
+        中的元素作为输入流（initial_data 为 None 时输入流为空）。
+
+        Args:
+            initial_data: 初始输入数据
+            commit: 成功执行后是否调用 commit() 提交各算子暂存的状态
+
+        Returns:
+            Dict[str, List[Any]]: 没有下游算子的（汇点）算子输出的全部结果
+        """
+        for op_node in self.operators.values():
+            if len(op_node.dependencies) > 1:
+                raise ValueError(
+                    f"Operator {op_node.name} has multiple dependencies, "
+                    "which is not supported in streaming mode"
+                )
+
+        report = self._start_report("stream")
+        run_status = OperatorStatus.FAILED
+        owns_session = not self._is_setup
+        try:
+            if owns_session:
+                await self.setup()
+
+            for op in self.operators.values():
+                op.reset()
+
+            # 合并执行的算子链作为一个流式节点，以链的第一个算子为代表
+            chain_of: Dict[str, List[str]] = {}
+            for head, chain in self.fused_chains.items():
+                for name in chain:
+                    chain_of[name] = chain
+
+            # 为每条依赖边建立一个队列，链内部的边不需要队列
+            inputs: Dict[str, _StreamChannel] = {}
+            outputs: Dict[str, List[_StreamChannel]] = defaultdict(list)
+            for name, op_node in self.operators.items():
+                if name in chain_of and chain_of[name][0] != name:
+                    continue
+                for dep in op_node.dependencies:
+                    channel = _StreamChannel(self.stream_queue_size)
+                    inputs[name] = channel
+                    outputs[dep].append(channel)
+
+            results: Dict[str, List[Any]] = {
+                name: []
+                for name, op_node in self.operators.items()
+                if not outputs[name]
+                and (name not in chain_of or chain_of[name][-1] == name)
+            }
+
+            tasks = {}
+            for name, op_node in self.operators.items():
+                if name in chain_of:
+                    chain = chain_of[name]
+                    if chain[0] != name:
+                        continue
+                    task = asyncio.create_task(
+                        self._execute_stream_chain(
+                            chain,
+                            inputs.get(name),
+                            outputs[chain[-1]],
+                            results.get(chain[-1]),
+                            initial_data,
+                        )
+                    )
+                else:
+                    task = asyncio.create_task(
+                        self._execute_stream_operator(
+                            op_node,
+                            inputs.get(name),
+                            outputs[name],
+                            results.get(name),
+                            initial_data,
+                        )
+                    )
+                tasks[task] = name
+
+            done, pending = await asyncio.wait(
+                tasks.keys(), return_when=asyncio.FIRST_EXCEPTION
+            )
+            failed = [task for task in done if task.exception() is not None]
+            if failed:
+                # 任意算子失败时取消其余算子，避免队列阻塞导致的死锁
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                raise failed[0].exception()
+
+            if commit:
+                await self.commit()
+            run_status = OperatorStatus.COMPLETED
+            return results
+        except Exception as e:
+            raise e
+        finally:
+            if owns_session:
+                await self.cleanup()
+            self._finish_report(report, run_status)
+
+    async def _execute_stream_operator(
+        self,
+        op_node: OperatorNode,
+        input_channel: Optional[_StreamChannel],
+        output_channels: List[_StreamChannel],
+        collected: Optional[List[Any]],
+        initial_data: Any,
+    ):
+        """以流式模式执行单个算子
+
+        Args:
+            op_node: 算子节点
+            input_channel: 输入队列，没有依赖的算子为 None
+            output_channels: 下游算子的输入队列
+            collected: 用于收集汇点算子输出的列表
+            initial_data: 初始输入数据
+        """
+        metrics = self.last_report.operators[op_node.name]
+        items_in = 0
+
+        async def counted(stream):
+            nonlocal items_in
+            async for item in stream:
+                items_in += 1
+                yield item
+
+        if input_channel is None:
+            input_stream = iterate_items(initial_data)
+        else:
+            input_stream = input_channel.items()
+
+        op_node.status = OperatorStatus.RUNNING
+        metrics.start()
+        notify_collectors(self.collectors, "on_operator_start", metrics)
+        token = _current_metrics.set(metrics)
+        items_out = 0
+        try:
+            async for item in op_node.operator.stream_process(counted(input_stream)):
+                items_out += 1
+                for channel in output_channels:
+                    await channel.put(item)
+                if collected is not None:
+                    collected.append(item)
+
+            if input_channel is not None:
+                await input_channel.drain()
+            for channel in output_channels:
+                await channel.close()
+        except Exception as e:
+            op_node.status = OperatorStatus.FAILED
+            op_node.error = e
+            metrics.items_in = items_in
+            metrics.finish(OperatorStatus.FAILED.value, items_out, error=e)
+            notify_collectors(self.collectors, "on_operator_end", metrics)
+            raise e
+        finally:
+            _current_metrics.reset(token)
+
+        op_node.status = OperatorStatus.COMPLETED
+        metrics.items_in = items_in
+        metrics.finish(OperatorStatus.COMPLETED.value, items_out)
+        notify_collectors(self.collectors, "on_operator_end", metrics)
+
+    async def _replicas(self, op_node: OperatorNode, count: int) -> List[Operator]:
+        """获取算子的 count 个副本，不足时创建并初始化新的副本
+
+        副本在多次执行之间复用，在 cleanup() 时清理。
+        """
+        while len(op_node.replicas) < count:
+            replica = op_node.operator.replicate()
+            await replica.setup()
+            op_node.replicas.append(replica)
+        return op_node.replicas[:count]
+
+    async def _process_partitioned(self, op_node: OperatorNode, input_data: Any) -> Any:
+        """调用算子处理数据，需要时把输入序列分片后并发处理
+
+        第一个分片由算子本身处理，其余分片由算子的副本处理，
+        每个副本拥有独立的连接、线程池等资源。输入可以是任意支持切片的序列，
+        例如 list 或 PaperBatch。
+
+        Args:
+            op_node: 算子节点
+            input_data: 输入数据
+
+        Returns:
+            Any: 算子执行结果，分片处理时为各分片结果按顺序拼接的列表
+        """
+        if (
+            op_node.partitions <= 1
+            or not isinstance(input_data, Sequence)
+            or isinstance(input_data, (str, bytes))
+        ):
+            return await op_node.operator.process(input_data)
+
+        shard_size = -(-len(input_data) // op_node.partitions)
+        shards = [
+            input_data[i : i + shard_size]
+            for i in range(0, len(input_data), shard_size)
+        ]
+        if len(shards) <= 1:
+            return await op_node.operator.process(input_data)
+
+        operators = [op_node.operator] + await self._replicas(op_node, len(shards) - 1)
+
+        async def process_shard(index: int, shard: Sequence) -> Any:
+            with trace_span(
+                f"{op_node.name}[{index}]", "partition", items=len(shard)
+            ):
+                return await operators[index].process(shard)
+
+        shard_results = await asyncio.gather(
+            *[process_shard(i, shard) for i, shard in enumerate(shards)]
+        )
+
+        merged = []
+        for shard_result in shard_results:
+            if not isinstance(shard_result, list):
+                raise TypeError(
+                    f"Partitioned operator {op_node.name} must return a list, "
+                    f"got {type(shard_result).__name__}"
+                )
+            merged.extend(shard_result)
+        return merged
+
+    async def _execute_stream_chain(
+        self,
+        chain: List[str],
+        input_channel: Optional[_StreamChannel],
+        output_channels: List[_StreamChannel],
+        collected: Optional[List[Any]],
+        initial_data: Any,
+    ):
+        """以流式模式执行合并的算子链
+
+        链上的算子都是需要完整输入的 fusible 算子，因此只收集一次上游数据，
+        在同一个任务中依次执行后再把最后一个算子的结果逐个输出。
+        """
+        if input_channel is None:
+            items = [item async for item in iterate_items(initial_data)]
+        else:
+            items = [item async for item in input_channel.items()]
+
+        result = await self._execute_chain(chain, items)
+        self.operators[chain[-1]].status = OperatorStatus.COMPLETED
+
+        for item in result:
+            for channel in output_channels:
+                await channel.put(item)
+            if collected is not None:
+                collected.append(item)
+        for channel in output_channels:
+            await channel.close()
+
+    async def setup(self):
+        """初始化所有算子的资源
+
+        显式调用 setup() 后，流水线可以多次执行而不会重复初始化和清理算子，
+        连接池、线程池等资源会在多次执行之间复用，直到调用 cleanup()。
+        也可以使用 async with pipeline: 管理这个过程。
+        """
+        if self._is_setup:
+            return
+
+        setup_tasks = []
+        for op in self.operators.values():
+            setup_tasks.append(op.operator.setup())
+        await asyncio.gather(*setup_tasks)
+        self._is_setup = True
+
+    async def commit(self):
+        """提交各算子暂存的状态
+
+        execute 和 execute_stream 成功后会自动调用。多次执行共同完成一项工作时，
+        可以在执行时传入 commit=False，全部完成后再显式调用。
+        """
+        await asyncio.gather(*(op.operator.commit() for op in self.operators.values()))
 
     async def cleanup(self):
-        """清理所有算子的资源"""
+        """清理所有算子及其分片副本的资源"""
         cleanup_tasks = []
         for op in self.operators.values():
             cleanup_tasks.append(op.operator.cleanup())
+            cleanup_tasks.extend(replica.cleanup() for replica in op.replicas)
+            op.replicas = []
         await asyncio.gather(*cleanup_tasks, return_exceptions=True)
+        self._is_setup = False
+
+    async def __aenter__(self) -> "DAGPipeline":
+        await self.setup()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.cleanup()
 
     async def _execute_operator(self, op_node: OperatorNode, input_data: Any) -> Any:
         """执行单个算子
@@ -144,8 +716,35 @@ class DAGPipeline:
         Returns:
             Any: 算子执行结果
         """
+        metrics = self.last_report.operators[op_node.name]
+        metrics.start(count_items(input_data))
+        notify_collectors(self.collectors, "on_operator_start", metrics)
+        token = _current_metrics.set(metrics)
         try:
-            return await op_node.operator.process(input_data)
+            fingerprint = None
+            if self.checkpoint_store and op_node.operator.checkpointable:
+                fingerprint = compute_fingerprint(
+                    op_node.name, op_node.operator, input_data
+                )
+                hit, result = self.checkpoint_store.load(op_node.name, fingerprint)
+                if hit:
+                    logger.info(f"算子 {op_node.name} 命中检查点，跳过执行")
+                    metrics.cached = True
+                    metrics.finish(OperatorStatus.COMPLETED.value, count_items(result))
+                    return result
+
+            result = await self._process_partitioned(op_node, input_data)
+            if fingerprint is not None:
+                if op_node.operator.should_checkpoint(result):
+                    self.checkpoint_store.save(op_node.name, fingerprint, result)
+                else:
+                    logger.info(f"算子 {op_node.name} 的输出包含失败的结果，不保存检查点")
+            metrics.finish(OperatorStatus.COMPLETED.value, count_items(result))
+            return result
         except Exception as e:
             op_node.status = OperatorStatus.FAILED
+            metrics.finish(OperatorStatus.FAILED.value, error=e)
             raise e
+        finally:
+            _current_metrics.reset(token)
+            notify_collectors(self.collectors, "on_operator_end", metrics)
@@ -0,0 +1,261 @@
+import asyncio
+import contextvars
+import functools
+import heapq
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from daily_paper.core.metrics import MetricsCollector, OperatorMetrics, PipelineRunReport
+
+
+class TraceRecorder:
+    """记录 Chrome trace-event 格式事件的记录器
+
+    每个 span 记录为一个完整事件（ph=X）。为了在 Perfetto / chrome://tracing 中
+    正确展示并发，同一类别下同时进行的 span 会被分配到不同的泳道（tid），
+    泳道编号尽量复用，因此泳道数量反映了该类别的最大并发度。
+    """
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._pids: Dict[str, int] = {}
+        self._free_lanes: Dict[str, List[int]] = {}
+        self._lane_count: Dict[str, int] = {}
+
+    def now_us(self) -> float:
+        """距离记录开始的时间（微秒）"""
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def acquire_lane(self, category: str) -> int:
+        """为一个新的 span 分配泳道"""
+        with self._lock:
+            if category not in self._pids:
+                pid = len(self._pids) + 1
+                self._pids[category] = pid
+                self._free_lanes[category] = []
+                self._lane_count[category] = 0
+                self.events.append(
+                    {
+                        "name": "process_name",
+                        "ph": "M",
+                        "pid": pid,
+                        "args": {"name": category},
+                    }
+                )
+
+            free_lanes = self._free_lanes[category]
+            if free_lanes:
+                return heapq.heappop(free_lanes)
+
+            lane = self._lane_count[category]
+            self._lane_count[category] += 1
+            self.events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pids[category],
+                    "tid": lane,
+                    "args": {"name": f"{category}-{lane}"},
+                }
+            )
+            return lane
+
+    def release_lane(self, category: str, lane: int):
+        with self._lock:
+            heapq.heappush(self._free_lanes[category], lane)
+
+    def add_span(
+        self,
+        name: str,
+        category: str,
+        lane: int,
+        start_us: float,
+        end_us: float,
+        args: Optional[Dict[str, Any]] = None,
+    ):
+        """添加一个完整的 span 事件"""
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_us,
+            "dur": max(end_us - start_us, 0),
+            "pid": self._pids[category],
+            "tid": lane,
+            "args": args or {},
+        }
+        with self._lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name: str, category: str, **args) -> Iterator[Dict[str, Any]]:
+        """记录一个 span，yield 出的字典可以用来补充事件参数"""
+        lane = self.acquire_lane(category)
+        start_us = self.now_us()
+        span_args = dict(args)
+        span_args["thread"] = threading.current_thread().name
+        try:
+            yield span_args
+        except BaseException as e:
+            span_args["error"] = f"{e.__class__.__name__}: {e}"
+            raise
+        finally:
+            self.add_span(name, category, lane, start_us, self.now_us(), span_args)
+            self.release_lane(category, lane)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+    def save(self, path: str):
+        """将事件保存为 Chrome trace 文件"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+
+# 当前生效的记录器，由 ChromeTraceCollector 在流水线执行期间设置
+_current_recorder: ContextVar[Optional[TraceRecorder]] = ContextVar(
+    "current_trace_recorder", default=None
+)
+
+
+@contextmanager
+def trace_span(name: str, category: str = "item", **args) -> Iterator[Dict[str, Any]]:
+    """在当前的 trace 中记录一个 span
+
+    用于标记算子内部的单个任务（例如下载或总结一篇论文）。
+    没有启用 trace 时不做任何记录。
+
+    Args:
+        name: span 名称
+        category: span 类别，同一类别的 span 会展示在同一组泳道中
+        **args: 附加在事件上的参数
+    """
+    recorder = _current_recorder.get()
+    if recorder is None:
+        yield {}
+        return
+
+    with recorder.span(name, category, **args) as span_args:
+        yield span_args
+
+
+def traced(
+    name: Optional[str] = None, category: str = "item", capture: Sequence[str] = ()
+):
+    """将函数的每次调用记录为一个 span 的装饰器，同时支持同步函数和异步函数
+
+    Args:
+        name: span 名称，默认使用函数的 __qualname__
+        category: span 类别
+        capture: 需要记录到事件参数中的函数参数名
+    """
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+        signature = inspect.signature(func)
+
+        def span_args(args, kwargs) -> Dict[str, Any]:
+            if not capture:
+                return {}
+            bound = signature.bind_partial(*args, **kwargs)
+            return {k: bound.arguments[k] for k in capture if k in bound.arguments}
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with trace_span(span_name, category, **span_args(args, kwargs)):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with trace_span(span_name, category, **span_args(args, kwargs)):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+async def run_in_executor(executor, func: Callable, *args) -> Any:
+    """在线程池中执行函数，并把当前上下文（包括 trace 记录器）带到线程中"""
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        executor, functools.partial(context.run, func, *args)
+    )
+
+
+class ChromeTraceCollector(MetricsCollector):
+    """将流水线执行过程导出为 Chrome trace-event 格式文件的回调
+
+    生成的文件可以用 Perfetto（https://ui.perfetto.dev）或 chrome://tracing 打开，
+    其中包含整个流水线、每个算子以及算子内部通过 trace_span 标记的任务。
+    """
+
+    def __init__(self, output_path: str):
+        """初始化ChromeTraceCollector
+
+        Args:
+            output_path: trace 文件保存路径，多次执行时后一次会覆盖前一次
+        """
+        self.output_path = output_path
+        self.recorder: Optional[TraceRecorder] = None
+        self._token = None
+        self._pipeline_lane = None
+        self._operator_spans: Dict[str, tuple] = {}
+
+    def on_pipeline_start(self, report: PipelineRunReport):
+        self.recorder = TraceRecorder()
+        self._operator_spans = {}
+        self._pipeline_lane = self.recorder.acquire_lane("pipeline")
+        self._token = _current_recorder.set(self.recorder)
+
+    def on_operator_start(self, metrics: OperatorMetrics):
+        lane = self.recorder.acquire_lane("operator")
+        self._operator_spans[metrics.name] = (lane, self.recorder.now_us())
+
+    def on_operator_end(self, metrics: OperatorMetrics):
+        lane, start_us = self._operator_spans.pop(metrics.name)
+        self.recorder.add_span(
+            metrics.name,
+            "operator",
+            lane,
+            start_us,
+            self.recorder.now_us(),
+            {
+                "operator": metrics.operator,
+                "status": metrics.status,
+                "items_in": metrics.items_in,
+                "items_out": metrics.items_out,
+                "exception_count": metrics.exception_count,
+            },
+        )
+        self.recorder.release_lane("operator", lane)
+
+    def on_pipeline_end(self, report: PipelineRunReport):
+        self.recorder.add_span(
+            f"pipeline ({report.mode})",
+            "pipeline",
+            self._pipeline_lane,
+            0,
+            self.recorder.now_us(),
+            {"status": report.status, "pid": os.getpid()},
+        )
+        self.recorder.release_lane("pipeline", self._pipeline_lane)
+        if self._token is not None:
+            _current_recorder.reset(self._token)
+            self._token = None
+        self.recorder.save(self.output_path)
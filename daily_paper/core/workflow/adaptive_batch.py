@@ -0,0 +1,132 @@
+from typing import Any, List, Optional, Sequence
+
+from daily_paper.core.common.logger import logger
+from daily_paper.core.metrics import PipelineRunReport, get_current_rss_bytes
+
+
+class AdaptiveBatchController:
+    """根据上一批次的运行情况调整下一批次大小的控制器
+
+    每个批次结束后根据以下指标调整批次大小：
+    1. 当前进程内存超过上限，或者批次中大部分论文处理出错时，批次减半
+    2. 单篇论文的处理耗时比上一批次明显变长（例如 LLM 服务开始限流）时，批次减半
+    3. LLM 并发利用率低于目标值时，说明并发没有被用满，批次翻倍
+    批次大小始终限制在 [min_batch_size, max_batch_size] 范围内。
+
+    单篇耗时按实际并行度换算：批次内的论文以 min(批次大小, max_concurrency) 的并行度处理，
+    算子总耗时乘以并行度再除以论文数，近似为每篇论文的请求耗时，不随批次大小变化。
+    否则批次小于并发上限时，批次减半会让"单篇耗时"翻倍，引发连锁的减半。
+    批次刚缩小后的那一批不做耗时比较，只用来更新基准。
+    """
+
+    def __init__(
+        self,
+        initial_batch_size: int,
+        min_batch_size: int,
+        max_batch_size: int,
+        max_concurrency: int,
+        memory_limit_bytes: Optional[int] = None,
+        target_utilization: float = 0.8,
+        latency_slowdown_ratio: float = 1.5,
+        max_error_ratio: float = 0.5,
+        timed_operators: Sequence[str] = ("paper_reader", "paper_summarizer"),
+    ):
+        """初始化AdaptiveBatchController
+
+        Args:
+            initial_batch_size: 初始批次大小
+            min_batch_size: 批次大小下限
+            max_batch_size: 批次大小上限
+            max_concurrency: LLM 最大并发请求数
+            memory_limit_bytes: 进程内存上限，None 表示不限制
+            target_utilization: LLM 并发利用率的目标值
+            latency_slowdown_ratio: 单篇耗时超过上一批次的该倍数时缩小批次
+            max_error_ratio: 出错论文占比超过该值时缩小批次
+            timed_operators: 用于计算单篇论文耗时的算子名称
+        """
+        if min_batch_size < 1 or min_batch_size > max_batch_size:
+            raise ValueError(
+                f"Invalid batch size bounds: [{min_batch_size}, {max_batch_size}]"
+            )
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.batch_size = self._clamp(initial_batch_size)
+        self.max_concurrency = max_concurrency
+        self.memory_limit_bytes = memory_limit_bytes
+        self.target_utilization = target_utilization
+        self.latency_slowdown_ratio = latency_slowdown_ratio
+        self.max_error_ratio = max_error_ratio
+        self.timed_operators = list(timed_operators)
+        self.last_latency_per_item: Optional[float] = None
+        # 上一次调整是否缩小了批次
+        self.shrunk_last_update = False
+
+    def _clamp(self, batch_size: int) -> int:
+        return max(self.min_batch_size, min(self.max_batch_size, batch_size))
+
+    def limit(self, items: List[Any]) -> List[Any]:
+        """截取当前批次大小的数据"""
+        return items[: self.batch_size]
+
+    def update(
+        self,
+        report: PipelineRunReport,
+        processed: int,
+        peak_concurrency: Optional[int] = None,
+    ) -> int:
+        """根据上一批次的统计报告计算下一批次的大小
+
+        Args:
+            report: 上一批次的执行统计报告
+            processed: 上一批次处理的论文数量
+            peak_concurrency: 上一批次中 LLM 的最大并发请求数
+
+        Returns:
+            int: 下一批次的大小
+        """
+        if processed <= 0:
+            return self.batch_size
+
+        old_batch_size = self.batch_size
+        timed = [report.operators[n] for n in self.timed_operators if n in report.operators]
+        parallelism = min(processed, self.max_concurrency) if self.max_concurrency > 0 else 1
+        latency_per_item = sum(m.wall_time_sec for m in timed) * parallelism / processed
+        error_ratio = sum(m.exception_count for m in timed) / processed
+        rss = get_current_rss_bytes()
+        utilization = (
+            peak_concurrency / self.max_concurrency
+            if peak_concurrency is not None and self.max_concurrency > 0
+            else None
+        )
+
+        reason = "保持不变"
+        if self.memory_limit_bytes and rss is not None and rss > self.memory_limit_bytes:
+            self.batch_size = self._clamp(self.batch_size // 2)
+            reason = f"内存 {rss / 2**20:.0f}MB 超过上限"
+        elif error_ratio > self.max_error_ratio:
+            self.batch_size = self._clamp(self.batch_size // 2)
+            reason = f"出错比例 {error_ratio:.0%} 过高"
+        elif (
+            self.last_latency_per_item is not None
+            and not self.shrunk_last_update
+            and latency_per_item
+            > self.last_latency_per_item * self.latency_slowdown_ratio
+        ):
+            self.batch_size = self._clamp(self.batch_size // 2)
+            reason = f"单篇耗时从 {self.last_latency_per_item:.2f}s 增加到 {latency_per_item:.2f}s"
+        elif (
+            processed >= old_batch_size
+            and utilization is not None
+            and utilization < self.target_utilization
+        ):
+            # 只有批次被填满时才扩大，数据不足导致的低利用率不需要调整
+            self.batch_size = self._clamp(self.batch_size * 2)
+            reason = f"LLM 并发利用率 {utilization:.0%} 低于目标值"
+
+        self.last_latency_per_item = latency_per_item
+        self.shrunk_last_update = self.batch_size < old_batch_size
+        logger.info(
+            f"批次大小 {old_batch_size} -> {self.batch_size} ({reason}), "
+            f"单篇耗时 {latency_per_item:.2f}s"
+        )
+        return self.batch_size
@@ -1,4 +1,7 @@
 from daily_paper.core.pipeline import DAGPipeline
+from daily_paper.core.metrics import JsonReportCollector
+from daily_paper.core.tracing import ChromeTraceCollector
+from daily_paper.core.workflow.adaptive_batch import AdaptiveBatchController
 from daily_paper.core.operators.datasource.arxiv import ArxivSource
 from daily_paper.core.operators.processor.paper_reader import PaperReader
 from daily_paper.core.operators.processor.llm_summarizer import LLMSummarizer
@@ -6,36 +9,78 @@ from daily_paper.core.operators.processor.custom_processor import CustomProcesso
 from daily_paper.core.operators.state.pending import (
     FilterFinishedIDs,
     MarkIDsAsFinished,
+    ClaimIDs,
+    create_state_manager,
     InsertPendingIDs,
 )
-from daily_paper.core.models import Paper, PaperWithSummary
+from daily_paper.core.models import Paper, PaperBatch, PaperWithSummary
 from daily_paper.core.config import LLMConfig
 from daily_paper.core.operators.sink.feishu import FeishuPusher
 from daily_paper.core.config import Config
 from daily_paper.core.common import logger
+from daily_paper.core.common.file_lock import set_default_lock_timeout
 from daily_paper.core.operators.storage.local_storage import (
     LocalStorageWriter,
     LocalStorageReader,
+    StorageQuery,
 )
 import os
 import asyncio
 import argparse
-from typing import Tuple, List, Any
+from typing import Tuple, List, Any, Optional
 from dataclasses import asdict
+from functools import partial
 from daily_paper.core.operators.processor.abstract_based_llm_filter import AbstractBasedLLMFilter
 import logging
 
 def id_getter(x: Paper):
     return x.id
 
+def arxiv_watermark_dir(config: Config) -> Optional[str]:
+    """增量获取 arXiv 论文时高水位的保存目录"""
+    if not config.arxiv_incremental:
+        return None
+    return os.path.join(config.storage.base_path, "state")
+
+async def execute_pipeline(pipeline: DAGPipeline, config: Config, commit: bool = True):
+    """根据配置选择批量或流式模式执行pipeline"""
+    set_default_lock_timeout(config.storage.lock_timeout)
+    for name, partitions in config.operator_partitions.items():
+        if name not in pipeline.operators:
+            continue
+        if partitions > 1 and not pipeline.operators[name].operator.partitionable:
+            logger.warning(f"算子 {name} 不支持分片执行，忽略 operator_partitions 中的配置")
+            continue
+        pipeline.set_partitions(name, partitions)
+
+    if config.metrics_report_dir and not any(
+        isinstance(c, JsonReportCollector) for c in pipeline.collectors
+    ):
+        pipeline.add_collector(JsonReportCollector(config.metrics_report_dir))
+    if config.trace_output_path and not any(
+        isinstance(c, ChromeTraceCollector) for c in pipeline.collectors
+    ):
+        pipeline.add_collector(ChromeTraceCollector(config.trace_output_path))
+
+    if config.enable_streaming:
+        return await pipeline.execute_stream(commit=commit)
+    return await pipeline.execute(commit=commit)
+
 async def create_paper_filter_pipeline(config: Config) -> DAGPipeline:
     """创建论文过滤pipeline"""
-    pipeline = DAGPipeline()
+    pipeline = DAGPipeline(checkpoint_dir=config.checkpoint_dir or None)
 
     pipeline.add_operator(
         name="arxiv_source",
         operator=ArxivSource(
-            topic=config.arxiv_topic_list, search_offset=config.arxiv_search_offset, search_limit=config.arxiv_search_limit
+            topic=config.arxiv_topic_list,
+            search_offset=config.arxiv_search_offset,
+            search_limit=config.arxiv_search_limit,
+            split_topics=config.arxiv_split_topics,
+            max_connections=config.arxiv_max_connections,
+            watermark_dir=arxiv_watermark_dir(config),
+            watermark_namespace="arxiv_llm_filter",
+            watermark_overlap_days=config.arxiv_watermark_overlap_days,
         ),
         dependencies=None,
     )
@@ -46,6 +91,9 @@ async def create_paper_filter_pipeline(config: Config) -> DAGPipeline:
             base_dir=os.path.join(config.storage.base_path, "state"),
             namespace="arxiv_llm_filter",
             id_getter=id_getter,
+            backend=config.storage.state_backend,
+            bloom_filter=config.storage.state_bloom_filter,
+            codec=config.storage.codec,
         ),
         dependencies=["arxiv_source"],
     )
@@ -69,6 +117,9 @@ async def create_paper_filter_pipeline(config: Config) -> DAGPipeline:
             storage_dir=os.path.join(config.storage.base_path, "filtered_papers"),
             storage_namespace="filtered_papers",
             key_value_getter=kv_getter,
+            storage_format=config.storage.storage_format,
+            secondary_index=config.storage.secondary_index,
+            codec=config.storage.codec,
         ),
         dependencies=["llm_filter"],
     )
@@ -81,14 +132,19 @@ async def create_paper_filter_pipeline(config: Config) -> DAGPipeline:
         operator=MarkIDsAsFinished(
             base_dir=os.path.join(config.storage.base_path, "state"),
             namespace="arxiv_llm_filter",
-            id_getter=paper_with_filter_status_id_getter,  
+            id_getter=paper_with_filter_status_id_getter,
+            backend=config.storage.state_backend,
+            bloom_filter=config.storage.state_bloom_filter,
+            codec=config.storage.codec,
         ),
         dependencies=["save_filtered_papers"],
     )
     
     return pipeline
 
-async def create_paper_summarize_pipeline(config: Config) -> DAGPipeline:
+async def create_paper_summarize_pipeline(
+    config: Config, batch_controller: Optional[AdaptiveBatchController] = None
+) -> DAGPipeline:
     """创建论文处理pipeline
 
     包含以下步骤：
@@ -96,17 +152,28 @@ async def create_paper_summarize_pipeline(config: Config) -> DAGPipeline:
     2. 使用PaperReader读取论文
     3. 使用LLMSummarizer总结论文
 
+    Args:
+        config: 配置
+        batch_controller: 批次大小控制器，为空时使用固定的 process_batch_size
+
     Returns:
         DAGPipeline: 配置好的pipeline实例
     """
-    pipeline = DAGPipeline()
+    pipeline = DAGPipeline(checkpoint_dir=config.checkpoint_dir or None)
 
     if not config.enable_llm_filter:
         # 添加数据源算子
         pipeline.add_operator(
             name="paper_source",
             operator=ArxivSource(
-                topic=config.arxiv_topic_list, search_offset=config.arxiv_search_offset, search_limit=config.arxiv_search_limit
+                topic=config.arxiv_topic_list,
+                search_offset=config.arxiv_search_offset,
+                search_limit=config.arxiv_search_limit,
+                split_topics=config.arxiv_split_topics,
+                max_connections=config.arxiv_max_connections,
+                watermark_dir=arxiv_watermark_dir(config),
+                watermark_namespace="arxiv",
+                watermark_overlap_days=config.arxiv_watermark_overlap_days,
             ),
             dependencies=None,
         )
@@ -120,6 +187,21 @@ async def create_paper_summarize_pipeline(config: Config) -> DAGPipeline:
                 storage_dir=os.path.join(config.storage.base_path, "filtered_papers"),
                 storage_namespace="filtered_papers",
                 value_reader=convert_to_paper,
+                # 整批论文以列式保存，不为每篇论文常驻一个对象
+                container=partial(PaperBatch.from_papers, paper_cls=Paper),
+                storage_format=config.storage.storage_format,
+                secondary_index=config.storage.secondary_index,
+                codec=config.storage.codec,
+                # 扫描时直接跳过已总结的论文，不为它们构造 Paper 对象
+                query=StorageQuery(
+                    exclude_finished=create_state_manager(
+                        os.path.join(config.storage.base_path, "state"),
+                        "arxiv",
+                        config.storage.state_backend,
+                        config.storage.state_bloom_filter,
+                        config.storage.codec,
+                    )
+                ),
             ),
             dependencies=None,
         )
@@ -130,15 +212,44 @@ async def create_paper_summarize_pipeline(config: Config) -> DAGPipeline:
             base_dir=os.path.join(config.storage.base_path, "state"),
             namespace="arxiv",
             id_getter=id_getter,
+            backend=config.storage.state_backend,
+            bloom_filter=config.storage.state_bloom_filter,
+            codec=config.storage.codec,
         ),
         dependencies=["paper_source"],
     )
 
-    pipeline.add_operator(
-        name="limit_batch_size",
-        operator=CustomProcessor(lambda x: x[:config.process_batch_size]),
-        dependencies=["filter_pending_ids"],
-    )
+    if config.summarize_lease_seconds > 0:
+        # 认领本批次的论文，其他 worker 不会再处理这些论文
+        pipeline.add_operator(
+            name="limit_batch_size",
+            operator=ClaimIDs(
+                base_dir=os.path.join(config.storage.base_path, "state"),
+                namespace="arxiv",
+                batch_size=(
+                    (lambda: batch_controller.batch_size)
+                    if batch_controller
+                    else config.process_batch_size
+                ),
+                lease_seconds=config.summarize_lease_seconds,
+                worker_id=config.worker_id or None,
+                id_getter=id_getter,
+                backend=config.storage.state_backend,
+                bloom_filter=config.storage.state_bloom_filter,
+                codec=config.storage.codec,
+            ),
+            dependencies=["filter_pending_ids"],
+        )
+    else:
+        pipeline.add_operator(
+            name="limit_batch_size",
+            operator=CustomProcessor(
+                batch_controller.limit
+                if batch_controller
+                else lambda x: x[:config.process_batch_size]
+            ),
+            dependencies=["filter_pending_ids"],
+        )
 
     # only read the unprocessed papers
     pipeline.add_operator(
@@ -163,6 +274,9 @@ async def create_paper_summarize_pipeline(config: Config) -> DAGPipeline:
             storage_dir=os.path.join(config.storage.base_path, "paper_summaries"),
             storage_namespace="paper_summaries",
             key_value_getter=kv_getter,
+            storage_format=config.storage.storage_format,
+            secondary_index=config.storage.secondary_index,
+            codec=config.storage.codec,
         ),
         dependencies=["paper_summarizer"],
     )
@@ -174,6 +288,9 @@ async def create_paper_summarize_pipeline(config: Config) -> DAGPipeline:
             base_dir=os.path.join(config.storage.base_path, "state"),
             namespace="arxiv",
             id_getter=id_getter,
+            backend=config.storage.state_backend,
+            bloom_filter=config.storage.state_bloom_filter,
+            codec=config.storage.codec,
         ),
         dependencies=["save_paper_summaries"],
     )
@@ -189,7 +306,7 @@ async def create_paper_push_pipeline(config: Config) -> DAGPipeline:
     2. 使用FeishuPush算子推送论文摘要到飞书
     3. 将推送成功的论文摘要标记为已推送
     """
-    pipeline = DAGPipeline()
+    pipeline = DAGPipeline(checkpoint_dir=config.checkpoint_dir or None)
 
     def convert_to_paper_with_summary(key: str, value: dict):
         return PaperWithSummary(**value)
@@ -200,6 +317,21 @@ async def create_paper_push_pipeline(config: Config) -> DAGPipeline:
             storage_dir=os.path.join(config.storage.base_path, "paper_summaries"),
             storage_namespace="paper_summaries",
             value_reader=convert_to_paper_with_summary,
+            container=partial(PaperBatch.from_papers, paper_cls=PaperWithSummary),
+            storage_format=config.storage.storage_format,
+            secondary_index=config.storage.secondary_index,
+            codec=config.storage.codec,
+            # 扫描时直接跳过已推送的论文，并按更新时间从旧到新输出
+            query=StorageQuery(
+                exclude_finished=create_state_manager(
+                    os.path.join(config.storage.base_path, "state"),
+                    "push",
+                    config.storage.state_backend,
+                    config.storage.state_bloom_filter,
+                    config.storage.codec,
+                ),
+                order="asc",
+            ),
         ),
         dependencies=None,
     )
@@ -211,19 +343,13 @@ async def create_paper_push_pipeline(config: Config) -> DAGPipeline:
             base_dir=os.path.join(config.storage.base_path, "state"),
             namespace="push",
             id_getter=id_getter,
+            backend=config.storage.state_backend,
+            bloom_filter=config.storage.state_bloom_filter,
+            codec=config.storage.codec,
         ),
         dependencies=["read_paper_summaries"],
     )
 
-    def order_by_update_date(x: List[PaperWithSummary]) -> List[PaperWithSummary]:
-        return sorted(x, key=lambda y: y.update_date)
-
-    pipeline.add_operator(
-        name="order_by_update_date",
-        operator=CustomProcessor(order_by_update_date),
-        dependencies=["filter_pushed_papers"],
-    )
-
     def title_and_content_getter(x: PaperWithSummary) -> Tuple[str, str]:
         title = "📄 新论文推荐"
         content = f"**{x.title}**\n"
@@ -237,7 +363,7 @@ async def create_paper_push_pipeline(config: Config) -> DAGPipeline:
     pipeline.add_operator(
         name="push_paper_summaries",
         operator=FeishuPusher(config.feishu_webhook_url, title_and_content_getter),
-        dependencies=["order_by_update_date"],
+        dependencies=["filter_pushed_papers"],
     )
 
     def filter_out_failed_papers(
@@ -257,6 +383,9 @@ async def create_paper_push_pipeline(config: Config) -> DAGPipeline:
             base_dir=os.path.join(config.storage.base_path, "state"),
             namespace="push",
             id_getter=id_getter,
+            backend=config.storage.state_backend,
+            bloom_filter=config.storage.state_bloom_filter,
+            codec=config.storage.codec,
         ),
         dependencies=["filter_out_push_failed_papers"],
     )
@@ -269,13 +398,34 @@ async def run_paper_summarize_pipeline(config_path: str):
     config = Config.from_yaml(config_path)
     total_results = []
     # TODO(ysj): use sink to collect results
-    while True:
-      pipeline: DAGPipeline = await create_paper_summarize_pipeline(config)
-      results = await pipeline.execute()
-      logger.info(f"Paper Summarize Pipeline small batch completed with {len(results)} results")
-      total_results.extend(results)
-      if len(results) == 0:
-        break
+    batch_controller = None
+    if config.adaptive_batch_size:
+        batch_controller = AdaptiveBatchController(
+            initial_batch_size=config.process_batch_size,
+            min_batch_size=config.min_process_batch_size,
+            max_batch_size=config.max_process_batch_size,
+            max_concurrency=config.llm.max_concurrent_requests,
+            memory_limit_bytes=config.batch_memory_limit_mb * 2**20 or None,
+        )
+
+    # pipeline 只创建和初始化一次，LLM 客户端、线程池和已加载的状态在各个批次之间复用
+    pipeline: DAGPipeline = await create_paper_summarize_pipeline(config, batch_controller)
+    summarizer: LLMSummarizer = pipeline.operators["paper_summarizer"].operator
+    async with pipeline:
+      while True:
+        summarizer.reset_concurrency_stats()
+        # 各批次获取的是同一批新论文，全部处理完之后才提交 arXiv 的高水位
+        results = await execute_pipeline(pipeline, config, commit=False)
+        processed = results.get("mark_processed_papers") or []
+        logger.info(f"Paper Summarize Pipeline small batch completed with {len(processed)} results")
+        total_results.extend(processed)
+        if len(processed) == 0:
+          break
+        if batch_controller:
+          batch_controller.update(
+              pipeline.last_report, len(processed), summarizer.peak_in_flight_requests
+          )
+      await pipeline.commit()
 
     logger.info(f"Paper Summarize Pipeline completed with {len(total_results)} results")
 
@@ -285,14 +435,14 @@ async def run_paper_summarize_pipeline(config_path: str):
 async def run_paper_push_pipeline(config_path: str):
     config = Config.from_yaml(config_path)
     pipeline: DAGPipeline = await create_paper_push_pipeline(config)
-    results = await pipeline.execute()
+    results = await execute_pipeline(pipeline, config)
     logger.info(f"Paper Push Pipeline completed with {len(results)} results")
     return results
 
 async def run_paper_filter_pipeline(config_path: str):
     config = Config.from_yaml(config_path)
     pipeline: DAGPipeline = await create_paper_filter_pipeline(config)
-    results = await pipeline.execute()
+    results = await execute_pipeline(pipeline, config)
     logger.info(f"Paper Filter Pipeline completed with {len(results)} results")
     return results
 
@@ -3,7 +3,7 @@ import logging
 import asyncio
 import os
 from daily_paper.core.config import Config
-from daily_paper.core.workflow.daily_paper_workflow import DAGPipeline
+from daily_paper.core.workflow.daily_paper_workflow import DAGPipeline, arxiv_watermark_dir
 from daily_paper.core.operators.datasource.arxiv import ArxivSource
 from daily_paper.core.operators.storage.local_storage import LocalStorageWriter
 from daily_paper.core.models import Paper
@@ -12,7 +12,16 @@ from dataclasses import asdict
 
 async def run_pipeline(config: Config):
     """创建arxiv源pipeline"""
-    source_operator = ArxivSource(topic=config.arxiv_topic_list, search_offset=config.arxiv_search_offset, search_limit=config.arxiv_search_limit)
+    source_operator = ArxivSource(
+        topic=config.arxiv_topic_list,
+        search_offset=config.arxiv_search_offset,
+        search_limit=config.arxiv_search_limit,
+        split_topics=config.arxiv_split_topics,
+        max_connections=config.arxiv_max_connections,
+        watermark_dir=arxiv_watermark_dir(config),
+        watermark_namespace="fetched_papers",
+        watermark_overlap_days=config.arxiv_watermark_overlap_days,
+    )
 
     def kv_getter(x: Paper):
       return x.id, asdict(x)
@@ -21,6 +30,9 @@ async def run_pipeline(config: Config):
         storage_dir=os.path.join(config.storage.base_path, "fetched_papers"),
         storage_namespace="fetched_papers",
         key_value_getter=kv_getter,
+        storage_format=config.storage.storage_format,
+        secondary_index=config.storage.secondary_index,
+        codec=config.storage.codec,
     )
 
     # batch process
@@ -35,6 +47,7 @@ async def run_pipeline(config: Config):
 
     if len(paper_list) > 0:
         await writer.process(paper_list)
+    await source_operator.commit()
 
 if __name__ == "__main__":
     args = argparse.ArgumentParser()
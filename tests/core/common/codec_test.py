@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from daily_paper.core.common.codec import CODECS, get_codec
+from daily_paper.core.operators.state.pending import IDState, StateManager
+from daily_paper.core.operators.storage.local_storage import LocalStorage
+
+
+def _available_codecs():
+    codecs = []
+    for name in CODECS:
+        try:
+            get_codec(name)
+        except ImportError:
+            continue
+        codecs.append(name)
+    return codecs
+
+
+RECORDS = {
+    "2401.00001v1": {
+        "value": {"id": "2401.00001v1", "title": "论文标题", "authors": "A, B"},
+        "stored_at": "2024-01-01T00:00:00",
+    }
+}
+
+
+@pytest.mark.parametrize("name", _available_codecs())
+def test_codec_round_trip(name: str):
+    codec = get_codec(name)
+    assert codec.name == name
+    assert codec.decode(codec.encode(RECORDS)) == RECORDS
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_codec("pickle")
+
+
+@pytest.mark.parametrize("name", _available_codecs())
+def test_local_storage_codec(tmp_path: Path, name: str):
+    storage = LocalStorage(str(tmp_path), "papers", codec=name)
+    storage.put_records(RECORDS)
+
+    assert storage.storage_file.name == f"papers{storage.codec.suffix}"
+    assert LocalStorage(str(tmp_path), "papers", codec=name).read_storage() == RECORDS
+
+
+def test_local_storage_migrates_json_to_codec(tmp_path: Path):
+    pytest.importorskip("msgpack")
+    (tmp_path / "papers.json").write_text(json.dumps(RECORDS), encoding="utf-8")
+
+    storage = LocalStorage(str(tmp_path), "papers", codec="msgpack")
+
+    assert storage.read_storage() == RECORDS
+    assert (tmp_path / "papers.json.migrated").exists()
+
+
+@pytest.mark.parametrize("name", _available_codecs())
+def test_state_manager_codec(tmp_path: Path, name: str):
+    manager = StateManager(str(tmp_path), "test", codec=name)
+    manager.store_pending_ids(["a", "b"])
+    manager.mark_as_finished(["a"])
+
+    reopened = StateManager(str(tmp_path), "test", codec=name)
+    assert reopened.is_finished("a")
+    assert reopened.get_pending_ids() == {"b"}
+
+
+def test_state_manager_migrates_json_to_codec(tmp_path: Path):
+    pytest.importorskip("msgpack")
+    StateManager(str(tmp_path), "test").update_states(
+        {"a": IDState.FINISHED, "b": IDState.PENDING}
+    )
+
+    manager = StateManager(str(tmp_path), "test", codec="msgpack")
+
+    assert manager.state_file.name == "test_states.msgpack"
+    assert manager.is_finished("a")
+    assert manager.get_pending_ids() == {"b"}
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import multiprocessing
+import threading
+from pathlib import Path
+
+import pytest
+
+from daily_paper.core.common.file_lock import FileLock, FileLockTimeout, atomic_write
+from daily_paper.core.operators.state.pending import create_state_manager
+from daily_paper.core.operators.storage.local_storage import LocalStorageWriter
+
+
+def test_file_lock_is_reentrant_and_exclusive(tmp_path: Path):
+    lock = FileLock(tmp_path / "test.lock")
+    other = FileLock(tmp_path / "test.lock", timeout=0.1)
+
+    with lock:
+        with lock:
+            assert not other.acquire(blocking=False)
+        with pytest.raises(FileLockTimeout):
+            other.acquire()
+
+    assert other.acquire(blocking=False)
+    other.release()
+
+
+def test_atomic_write_keeps_old_file_on_error(tmp_path: Path):
+    target = tmp_path / "data.json"
+    target.write_text('{"a": 1}')
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(target) as f:
+            f.write('{"a": ')
+            raise RuntimeError("crash")
+
+    assert json.loads(target.read_text()) == {"a": 1}
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def _mark_ids(base_dir: str, backend: str, worker: int):
+    manager = create_state_manager(base_dir, "test", backend)
+    for i in range(20):
+        manager.mark_as_finished([f"{worker}-{i}"])
+    close = getattr(manager, "close", None)
+    if close is not None:
+        close()
+
+
+@pytest.mark.parametrize("backend", ["json", "log"])
+def test_concurrent_processes_do_not_lose_updates(tmp_path: Path, backend: str):
+    """测试多个进程同时读-改-写状态文件时不会丢失更新"""
+    context = multiprocessing.get_context("fork")
+    processes = [
+        context.Process(target=_mark_ids, args=(str(tmp_path), backend, worker))
+        for worker in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    manager = create_state_manager(str(tmp_path), "test", backend)
+    expected = {f"{worker}-{i}" for worker in range(4) for i in range(20)}
+    assert manager.get_finished_ids() == expected
+
+
+@pytest.mark.asyncio
+async def test_local_storage_writers_do_not_overwrite_each_other(tmp_path: Path):
+    writers = [
+        LocalStorageWriter(str(tmp_path), "papers", key_value_getter=lambda x: (x, x))
+        for _ in range(4)
+    ]
+
+    def write(writer, worker):
+        asyncio.run(writer.process([f"{worker}-{i}" for i in range(10)]))
+
+    threads = [
+        threading.Thread(target=write, args=(writer, worker))
+        for worker, writer in enumerate(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(writers[0].read_storage()) == 40
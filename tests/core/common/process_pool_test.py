@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from daily_paper.core.common import process_pool
+from daily_paper.core.common.process_pool import (
+    acquire_process_pool,
+    release_process_pool,
+)
+
+
+def test_shared_pool_reference_counting():
+    first = acquire_process_pool()
+    second = acquire_process_pool()
+    assert first is second
+
+    release_process_pool()
+    # 还有一个使用者，进程池保持打开
+    assert process_pool._pool is first
+    assert first.submit(abs, -1).result() == 1
+
+    release_process_pool()
+    assert process_pool._pool is None
+    with pytest.raises(RuntimeError):
+        first.submit(abs, -1)
+
+    # 释放后再次获取会创建新的进程池
+    third = acquire_process_pool()
+    try:
+        assert third is not first
+    finally:
+        release_process_pool()
+
+
+def test_release_does_not_wait_for_workers():
+    pool = acquire_process_pool()
+    future = pool.submit(time.sleep, 1)
+    # 等待子进程开始执行任务
+    while not future.running():
+        time.sleep(0.01)
+
+    begin = time.monotonic()
+    release_process_pool()
+    assert time.monotonic() - begin < 0.5
+    # 已提交的任务仍会执行完
+    assert future.result(timeout=10) is None
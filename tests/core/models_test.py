@@ -0,0 +1,78 @@
+import pickle
+from dataclasses import asdict
+
+import pytest
+
+from daily_paper.core.models import Paper, PaperBatch, PaperWithSummary
+from daily_paper.core.operators.state.pending import FilterFinishedIDs
+
+
+def _paper(id: str, category: str = "cs.CL") -> Paper:
+    return Paper(
+        id=id,
+        title=f"title {id}",
+        url=f"http://arxiv.org/abs/{id}",
+        abstract="abstract",
+        authors="A, B",
+        category="".join(["cs", ".", category[3:]]),
+        publish_date="2024-01-01",
+        update_date="2024-01-02",
+    )
+
+
+def test_paper_is_slotted_and_interns_fields():
+    a, b = _paper("1"), _paper("2")
+
+    assert not hasattr(a, "__dict__")
+    with pytest.raises(AttributeError):
+        a.extra = 1
+    # 运行时拼接出的字符串也会被驻留
+    assert a.category is b.category
+    assert pickle.loads(pickle.dumps(a)) == a
+
+    summary = PaperWithSummary(**asdict(a), summary="summary")
+    assert not hasattr(summary, "__dict__")
+    assert summary.category is a.category
+
+
+def test_paper_batch_sequence():
+    papers = [_paper(str(i)) for i in range(5)]
+    batch = PaperBatch.from_papers(iter(papers))
+
+    assert len(batch) == 5
+    assert batch[1] == papers[1]
+    assert list(batch) == papers
+    assert batch.column("id") == ["0", "1", "2", "3", "4"]
+
+    sliced = batch[1:3]
+    assert isinstance(sliced, PaperBatch)
+    assert sliced.to_papers() == papers[1:3]
+
+    selected = batch.select([True, False, True, False, False])
+    assert selected.to_papers() == [papers[0], papers[2]]
+    assert pickle.loads(pickle.dumps(batch)) == batch
+
+
+def test_paper_batch_with_summary():
+    paper = PaperWithSummary(**asdict(_paper("1")), summary="summary")
+    batch = PaperBatch.from_papers([paper], paper_cls=PaperWithSummary)
+
+    assert batch.column("summary") == ["summary"]
+    assert batch[0] == paper
+
+
+def test_paper_batch_rejects_ragged_columns():
+    with pytest.raises(ValueError):
+        PaperBatch(Paper, {"id": ["1", "2"], "title": ["t"]})
+
+
+@pytest.mark.asyncio
+async def test_filter_finished_ids_keeps_paper_batch(tmp_path):
+    operator = FilterFinishedIDs(str(tmp_path), "test", id_getter=lambda x: x.id)
+    operator.state_manager.mark_as_finished(["1"])
+    batch = PaperBatch.from_papers([_paper("0"), _paper("1"), _paper("2")])
+
+    result = await operator.process(batch)
+
+    assert isinstance(result, PaperBatch)
+    assert result.column("id") == ["0", "2"]
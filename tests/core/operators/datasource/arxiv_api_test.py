@@ -0,0 +1,373 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import List
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from daily_paper.core.operators.base import Operator
+from daily_paper.core.operators.datasource.arxiv import ArxivSource
+from daily_paper.core.operators.datasource.arxiv_api import (
+    ArxivAPIClient,
+    AtomFeedParser,
+    QueryWatermark,
+    TokenBucket,
+    paper_key,
+)
+from daily_paper.core.operators.datasource.watermark import WatermarkStore
+from daily_paper.core.pipeline import DAGPipeline
+
+TOTAL = 5
+
+
+def _published(i: int) -> str:
+    # 结果按提交时间降序排列
+    return f"2024-01-{10 - i:02d}T09:00:00Z"
+
+
+def _entry(i: int, shift: int = 0) -> str:
+    return f"""
+  <entry>
+    <id>http://arxiv.org/abs/2401.{i + shift:05d}v2</id>
+    <updated>2024-01-0{i + 1}T10:00:00Z</updated>
+    <published>{_published(i)}</published>
+    <title>Paper
+      {i}</title>
+    <summary>  Line one
+line two.
+</summary>
+    <author><name>Alice</name></author>
+    <author><name>Bob</name></author>
+    <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="cs.CL"/>
+  </entry>"""
+
+
+def _feed(start: int, count: int, shift: int = 0) -> str:
+    entries = "".join(_entry(i, shift) for i in range(start, min(start + count, TOTAL)))
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"
+      xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">
+  <opensearch:totalResults>{TOTAL}</opensearch:totalResults>
+  <opensearch:startIndex>{start}</opensearch:startIndex>{entries}
+</feed>"""
+
+
+@asynccontextmanager
+async def _api_server(requests_seen: List[dict], empty_page: bool = True):
+    """启动一个模拟 arXiv API 的本地服务器，返回查询接口地址
+
+    查询 "RAG" 时结果ID整体后移 3，与其他查询的结果部分重叠。
+    """
+    empty_pages = {"remaining": 1 if empty_page else 0}
+
+    async def handler(request: web.Request) -> web.Response:
+        params = dict(request.query)
+        requests_seen.append(params)
+        start, count = int(params["start"]), int(params["max_results"])
+        # 第一次请求第二页时模拟 arXiv 偶发的空页
+        if start > 0 and empty_pages["remaining"]:
+            empty_pages["remaining"] -= 1
+            return web.Response(text=_feed(TOTAL, 0), content_type="application/atom+xml")
+        shift = 3 if params["search_query"] == '"RAG"' else 0
+        return web.Response(
+            text=_feed(start, count, shift), content_type="application/atom+xml"
+        )
+
+    app = web.Application()
+    app.router.add_get("/api/query", handler)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        yield str(server.make_url("/api/query"))
+    finally:
+        await server.close()
+
+
+def test_paper_key():
+    assert paper_key("http://arxiv.org/abs/2108.09112v1") == "2108.09112"
+    assert paper_key("http://arxiv.org/abs/solv-int/9901001v3") == "solv-int/9901001"
+
+
+def test_atom_feed_parser_is_incremental():
+    data = _feed(0, 2).encode("utf-8")
+    parser = AtomFeedParser()
+
+    papers = []
+    for i in range(0, len(data), 50):
+        papers.extend(parser.feed(data[i : i + 50]))
+    parser.close()
+
+    assert parser.total_results == TOTAL
+    assert [p.id for p in papers] == ["2401.00000", "2401.00001"]
+    paper = papers[1]
+    assert paper.title == "Paper 1"
+    assert paper.abstract == "Line one line two."
+    assert paper.authors == "Alice, Bob"
+    assert paper.category == "cs.CL"
+    assert paper.url == "http://arxiv.org/abs/2401.00001"
+    assert (paper.publish_date, paper.update_date) == ("2024-01-09", "2024-01-02")
+    assert parser.timestamps["2401.00001"] == "2024-01-09T09:00:00Z"
+
+
+@pytest.mark.asyncio
+async def test_client_pages_and_retries_empty_page():
+    requests_seen = []
+    async with _api_server(requests_seen) as api_url:
+        client = ArxivAPIClient(base_url=api_url, page_size=2, delay_seconds=0)
+        papers = [
+            paper async for paper in client.results('"LLM"', offset=0, max_results=10)
+        ]
+
+    assert [p.id for p in papers] == [f"2401.{i:05d}" for i in range(TOTAL)]
+    # 0, 2(空页), 2, 4
+    assert [int(r["start"]) for r in requests_seen] == [0, 2, 2, 4]
+    assert requests_seen[0]["sortBy"] == "submittedDate"
+
+
+@pytest.mark.asyncio
+async def test_client_does_not_block_event_loop():
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    async with _api_server([]) as api_url:
+        client = ArxivAPIClient(base_url=api_url, page_size=1, delay_seconds=0.05)
+        task = asyncio.create_task(ticker())
+        papers = [paper async for paper in client.results('"LLM"', max_results=3)]
+        task.cancel()
+
+    assert len(papers) == 3
+    # 请求间隔期间其他协程可以继续运行
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_arxiv_source_uses_async_client():
+    async with _api_server([]) as api_url:
+        source = ArxivSource(
+            topic=["LLM", "RAG"],
+            search_offset=1,
+            search_limit=3,
+            page_size=2,
+            request_delay_seconds=0,
+            api_url=api_url,
+        )
+        papers = await source.process(None)
+        streamed = [paper async for paper in source.stream_process(None)]
+
+    assert [p.id for p in papers] == ["2401.00001", "2401.00002", "2401.00003"]
+    assert streamed == papers
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(capacity=2, refill_seconds=0.05)
+
+    begin = time.monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+
+    # 前两个令牌立即可用，之后每 0.05 秒补充一个
+    assert time.monotonic() - begin >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_client_harvests_queries_concurrently():
+    requests_seen = []
+    async with _api_server(requests_seen, empty_page=False) as api_url:
+        client = ArxivAPIClient(
+            base_url=api_url, page_size=2, delay_seconds=0, max_connections=4
+        )
+        papers = [
+            paper
+            async for paper in client.harvest(['"LLM"', '"RAG"'], offset=1, max_results=10)
+        ]
+
+    # LLM: 00001-00004，RAG: 00004-00007，00004 只输出一次
+    assert sorted(p.id for p in papers) == [f"2401.{i:05d}" for i in range(1, 8)]
+    starts = sorted((r["search_query"], int(r["start"])) for r in requests_seen)
+    assert starts == [('"LLM"', 1), ('"LLM"', 3), ('"RAG"', 1), ('"RAG"', 3)]
+
+
+@pytest.mark.asyncio
+async def test_arxiv_source_split_topics():
+    async with _api_server([], empty_page=False) as api_url:
+        source = ArxivSource(
+            topic=["LLM", "RAG"],
+            search_limit=2,
+            page_size=1,
+            request_delay_seconds=0,
+            api_url=api_url,
+            split_topics=True,
+            max_connections=2,
+        )
+        papers = await source.process(None)
+
+    assert source.queries == ['"LLM"', '"RAG"']
+    assert sorted(p.id for p in papers) == [
+        "2401.00000",
+        "2401.00001",
+        "2401.00003",
+        "2401.00004",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_client_stops_at_watermark():
+    requests_seen = []
+    watermark = QueryWatermark(since=_published(2))
+    async with _api_server(requests_seen, empty_page=False) as api_url:
+        client = ArxivAPIClient(base_url=api_url, page_size=1, delay_seconds=0)
+        papers = [paper async for paper in client.results('"LLM"', watermark=watermark)]
+
+    assert [p.id for p in papers] == ["2401.00000", "2401.00001"]
+    # 第三页的论文越过高水位后不再继续翻页
+    assert [int(r["start"]) for r in requests_seen] == [0, 1, 2]
+    assert watermark.latest == _published(0)
+    assert not watermark.truncated
+    assert watermark.next_since == _published(0)
+
+    with pytest.raises(ValueError):
+        await client.results('"LLM"', sort_order="ascending", watermark=watermark).__anext__()
+
+
+@pytest.mark.asyncio
+async def test_watermark_overlap_refetches_recent_papers():
+    """测试重叠窗口内的论文会重新获取，高水位不会后退"""
+    requests_seen = []
+    watermark = QueryWatermark(since=_published(1), overlap_seconds=86400)
+    assert watermark.cutoff == _published(2)
+    async with _api_server(requests_seen, empty_page=False) as api_url:
+        client = ArxivAPIClient(base_url=api_url, page_size=1, delay_seconds=0)
+        papers = [paper async for paper in client.results('"LLM"', watermark=watermark)]
+
+    assert [p.id for p in papers] == ["2401.00000", "2401.00001"]
+    assert watermark.latest == _published(0)
+
+    # 无法解析的高水位退化为严格的截止时间
+    assert QueryWatermark(since="yesterday", overlap_seconds=86400).cutoff == "yesterday"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("harvest", [False, True])
+async def test_truncated_fetch_does_not_advance_watermark(harvest: bool):
+    """测试新论文超过结果数上限时高水位不前进，越过高水位时正常前进"""
+    requests_seen = []
+    async with _api_server(requests_seen, empty_page=False) as api_url:
+        client = ArxivAPIClient(base_url=api_url, page_size=2, delay_seconds=0)
+
+        async def fetch(watermark: QueryWatermark, max_results: int) -> List[str]:
+            if harvest:
+                papers = client.harvest(
+                    ['"LLM"'], max_results=max_results, watermarks={'"LLM"': watermark}
+                )
+            else:
+                papers = client.results('"LLM"', max_results=max_results, watermark=watermark)
+            return [paper.id async for paper in papers]
+
+        # 高水位之后有 4 篇新论文，只获取了最新的 2 篇
+        truncated = QueryWatermark(since=_published(4))
+        assert await fetch(truncated, 2) == ["2401.00000", "2401.00001"]
+        assert truncated.truncated
+        assert truncated.latest == _published(0)
+        assert truncated.next_since == _published(4)
+
+        # 上限足够时越过高水位，高水位前进到最新的论文
+        complete = QueryWatermark(since=_published(4))
+        assert len(await fetch(complete, 10)) == 4
+        assert not complete.truncated
+        assert complete.next_since == _published(0)
+
+        # 没有高水位时获取全部结果不算截断；首次运行只获取最新的结果，高水位照常前进
+        first_run = QueryWatermark()
+        assert len(await fetch(first_run, 10)) == TOTAL
+        assert not first_run.truncated
+        limited_first_run = QueryWatermark()
+        assert len(await fetch(limited_first_run, 2)) == 2
+        assert limited_first_run.truncated
+        assert limited_first_run.next_since == _published(0)
+
+
+@pytest.mark.asyncio
+async def test_harvest_pages_watermarked_queries_sequentially():
+    requests_seen = []
+    watermarks = {'"LLM"': QueryWatermark(since=_published(2)), '"RAG"': QueryWatermark()}
+    async with _api_server(requests_seen, empty_page=False) as api_url:
+        client = ArxivAPIClient(
+            base_url=api_url, page_size=2, delay_seconds=0, max_connections=4
+        )
+        papers = [
+            paper
+            async for paper in client.harvest(['"LLM"', '"RAG"'], watermarks=watermarks)
+        ]
+
+    # LLM 只输出高水位之后的 00000、00001，RAG 没有高水位，输出全部 00003-00007
+    assert sorted(p.id for p in papers) == [
+        f"2401.{i:05d}" for i in (0, 1, 3, 4, 5, 6, 7)
+    ]
+    starts = sorted((r["search_query"], int(r["start"])) for r in requests_seen)
+    assert starts == [
+        ('"LLM"', 0),
+        ('"LLM"', 2),
+        ('"RAG"', 0),
+        ('"RAG"', 2),
+        ('"RAG"', 4),
+    ]
+    assert watermarks['"RAG"'].latest == _published(0)
+
+
+class _FailingOperator(Operator):
+    async def process(self, input_data):
+        raise RuntimeError("boom")
+
+
+@pytest.mark.asyncio
+async def test_arxiv_source_commits_watermark_after_pipeline_succeeds(tmp_path):
+    requests_seen = []
+    async with _api_server(requests_seen, empty_page=False) as api_url:
+
+        def make_source():
+            return ArxivSource(
+                topic="LLM",
+                page_size=2,
+                request_delay_seconds=0,
+                api_url=api_url,
+                watermark_dir=str(tmp_path),
+                watermark_overlap_days=1,
+            )
+
+        failing = DAGPipeline()
+        failing.add_operator("source", make_source())
+        failing.add_operator("failing", _FailingOperator(), ["source"])
+        with pytest.raises(RuntimeError):
+            await failing.execute()
+        store = WatermarkStore(str(tmp_path), "arxiv")
+        assert store.get('"LLM"') is None
+
+        pipeline = DAGPipeline()
+        pipeline.add_operator("source", make_source())
+        first = await pipeline.execute()
+        assert len(first["source"]) == TOTAL
+        assert store.get('"LLM"') == _published(0)
+
+        requests_seen.clear()
+        second = await pipeline.execute()
+
+    # 只重新获取高水位之前一天内的论文，第一页的第二篇论文就越过了截止时间
+    assert [p.id for p in second["source"]] == ["2401.00000"]
+    assert len(requests_seen) == 1
+    assert store.get('"LLM"') == _published(0)
+
+
+def test_watermark_store_only_moves_forward(tmp_path):
+    store = WatermarkStore(str(tmp_path), "test")
+    store.update({"a": "2024-01-02T00:00:00Z"})
+    store.update({"a": "2024-01-01T00:00:00Z", "b": "2024-01-01T00:00:00Z"})
+
+    assert store.load() == {"a": "2024-01-02T00:00:00Z", "b": "2024-01-01T00:00:00Z"}
@@ -3,7 +3,14 @@ import pytest
 import asyncio
 import tempfile
 import shutil
-from daily_paper.core.operators.processor.paper_reader import PaperReader
+from daily_paper.core.operators.processor.paper_reader import (
+    PaperReader,
+    extract_text_from_pdf,
+)
+from daily_paper.core.common.process_pool import (
+    acquire_process_pool,
+    release_process_pool,
+)
 from daily_paper.core.models import Paper
 from daily_paper.core.common import logger
 from datetime import date
@@ -65,3 +72,108 @@ async def test_paper_download_and_process(paper_reader):
             assert len(text) > 0  # 确保提取到了文本
 
             logger.info(f"title: {paper.title}, 摘要: {text}")
+
+
+@pytest.mark.asyncio
+async def test_extract_text_in_process_pool(temp_dir):
+    """测试在进程池中解析PDF，解析失败时返回空字符串"""
+    acquire_process_pool()
+    try:
+        missing_pdf = os.path.join(temp_dir, "missing.pdf")
+        results = await asyncio.gather(
+            *[extract_text_from_pdf.run_in_pool(missing_pdf) for _ in range(2)]
+        )
+        assert results == ["", ""]
+    finally:
+        release_process_pool()
+
+
+def _write_pdf(path: str, text: str):
+    """写入一个只包含一行文本的最小PDF文件"""
+    stream = f"BT /F1 24 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (i, obj)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+@pytest.mark.asyncio
+async def test_parse_real_pdf_in_shared_process_pool(temp_dir):
+    """测试在共享进程池中解析真实的PDF，多个 PaperReader 共享同一个进程池"""
+    pytest.importorskip("PyPDF2")
+    from daily_paper.core.common import process_pool
+
+    pdf_path = os.path.join(temp_dir, "hello.pdf")
+    _write_pdf(pdf_path, "Hello daily paper")
+
+    first = PaperReader(cache_dir=temp_dir)
+    second = PaperReader(cache_dir=temp_dir)
+    await first.setup()
+    await second.setup()
+    pool = process_pool._pool
+    try:
+        texts = await asyncio.gather(
+            *[extract_text_from_pdf.run_in_pool(pdf_path) for _ in range(2)]
+        )
+        assert all("Hello daily paper" in text for text in texts)
+
+        await first.cleanup()
+        # 另一个使用者仍然持有进程池
+        assert process_pool._pool is pool
+        assert "Hello" in await extract_text_from_pdf.run_in_pool(pdf_path)
+    finally:
+        await second.cleanup()
+    assert process_pool._pool is None
+
+
+@pytest.mark.asyncio
+async def test_failed_papers_are_not_checkpointed(temp_dir, monkeypatch):
+    """测试下载失败的论文不会被写入检查点，恢复执行时会重试"""
+    from daily_paper.core.pipeline import DAGPipeline
+
+    paper = Paper(
+        id="2401.00001",
+        title="title",
+        url="http://arxiv.org/abs/2401.00001",
+        authors="A",
+        abstract="abstract",
+        category="cs.CL",
+        publish_date="2024-01-01",
+        update_date="2024-01-01",
+    )
+    calls = []
+
+    def failing_download(self, url, paper_id):
+        calls.append(paper_id)
+        raise IOError("network down")
+
+    monkeypatch.setattr(PaperReader, "_download_paper", failing_download)
+    checkpoint_dir = os.path.join(temp_dir, "checkpoints")
+    for _ in range(2):
+        pipeline = DAGPipeline(checkpoint_dir=checkpoint_dir)
+        pipeline.add_operator(
+            "reader",
+            PaperReader(cache_dir=temp_dir, max_workers=1, use_process_pool=False),
+        )
+        results = await pipeline.execute([paper])
+        assert results["reader"] == [(paper, "")]
+
+    assert calls == ["2401.00001", "2401.00001"]
@@ -0,0 +1,139 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from daily_paper.core.operators.state.bloom import (
+    BloomFilter,
+    BloomFilteredStateManager,
+)
+from daily_paper.core.operators.state.pending import (
+    FilterFinishedIDs,
+    MarkIDsAsFinished,
+    create_state_manager,
+)
+
+
+def test_bloom_filter_has_no_false_negatives(tmp_path: Path):
+    bloom = BloomFilter(1000, error_rate=0.01)
+    added = [f"2401.{i:05d}" for i in range(1000)]
+    for id in added:
+        bloom.add(id)
+
+    assert all(id in bloom for id in added)
+    false_positives = sum(f"2402.{i:05d}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+    bloom.save(tmp_path / "test.bloom", {"state_version": "1"})
+    loaded, metadata = BloomFilter.load(tmp_path / "test.bloom")
+    assert metadata == {"state_version": "1"}
+    assert all(id in loaded for id in added)
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite", "log"])
+def test_bloom_filtered_manager_matches_backend(tmp_path: Path, backend: str):
+    """测试加上布隆过滤器后的查询结果与底层状态一致"""
+    manager = create_state_manager(str(tmp_path), "test", backend, bloom_filter=True)
+    assert isinstance(manager, BloomFilteredStateManager)
+
+    manager.store_pending_ids(["id1", "id2"])
+    manager.mark_as_finished(["id1"])
+    assert manager.is_finished_many(["id1", "id2", "id3"]) == {"id1"}
+    assert manager.get_pending_ids() == {"id2"}
+
+    # 其他实例绕过布隆过滤器的写入也能被发现
+    create_state_manager(str(tmp_path), "test", backend).mark_as_finished(["id2"])
+    assert manager.is_finished("id2")
+
+
+def test_bloom_skips_backing_store_for_unseen_ids(tmp_path: Path, monkeypatch):
+    manager = create_state_manager(str(tmp_path), "test", bloom_filter=True)
+    manager.mark_as_finished(["id1"])
+
+    queried = []
+    inner_is_finished_many = manager.state_manager.is_finished_many
+    monkeypatch.setattr(
+        manager.state_manager,
+        "is_finished_many",
+        lambda ids: queried.extend(ids) or inner_is_finished_many(ids),
+    )
+
+    unseen = [f"new{i}" for i in range(100)]
+    assert manager.is_finished_many(unseen + ["id1"]) == {"id1"}
+    assert "id1" in queried
+    assert len(queried) < 10
+
+
+@pytest.mark.asyncio
+async def test_bloom_filter_is_reused_between_runs(tmp_path: Path, monkeypatch):
+    """测试过滤器文件与状态版本一致时不会重新构建"""
+    mark = MarkIDsAsFinished(str(tmp_path), "test", bloom_filter=True)
+    await mark.process(["id1", "id2"])
+
+    rebuilds = []
+    original_rebuild = BloomFilteredStateManager.rebuild
+    monkeypatch.setattr(
+        BloomFilteredStateManager,
+        "rebuild",
+        lambda self: rebuilds.append(self) or original_rebuild(self),
+    )
+
+    operator = FilterFinishedIDs(str(tmp_path), "test", bloom_filter=True)
+    assert await operator.process(["id1", "id3"]) == ["id3"]
+    assert rebuilds == []
+
+
+def test_bloom_rebuilds_when_saturated(tmp_path: Path):
+    manager = BloomFilteredStateManager(
+        create_state_manager(str(tmp_path), "test"), min_capacity=10
+    )
+    ids = [f"id{i}" for i in range(50)]
+    for id in ids:
+        manager.mark_as_finished([id])
+
+    assert manager._bloom.capacity >= 50
+    assert manager.is_finished_many(ids) == set(ids)
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite", "log"])
+def test_concurrent_write_is_not_hidden_by_version(tmp_path: Path, backend: str):
+    """测试其他实例的写入不会夹在本实例的写入和读取版本之间"""
+    manager = create_state_manager(str(tmp_path), "test", backend, bloom_filter=True)
+    other = create_state_manager(str(tmp_path), "test", backend)
+    manager.mark_as_finished(["id0"])
+
+    writer = threading.Thread(target=other.mark_as_finished, args=(["id1"],))
+    inner_mark_as_finished = manager.state_manager.mark_as_finished
+
+    def mark_and_race(ids):
+        inner_mark_as_finished(ids)
+        writer.start()
+        time.sleep(0.2)
+
+    manager.state_manager.mark_as_finished = mark_and_race
+    manager.mark_as_finished(["id2"])
+    writer.join(timeout=10)
+
+    assert manager.is_finished_many(["id0", "id1", "id2"]) == {"id0", "id1", "id2"}
+
+
+def test_concurrent_saves_do_not_share_temp_file(tmp_path: Path):
+    bloom = BloomFilter(1000)
+    errors = []
+
+    def save_repeatedly():
+        try:
+            for _ in range(50):
+                bloom.save(tmp_path / "test.bloom")
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save_repeatedly) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert [p.name for p in tmp_path.iterdir()] == ["test.bloom"]
@@ -0,0 +1,137 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from daily_paper.core.operators.state.pending import (
+    ClaimIDs,
+    IDState,
+    create_state_manager,
+)
+
+BACKENDS = ["json", "sqlite", "log"]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request) -> str:
+    return request.param
+
+
+def test_claim_is_exclusive(tmp_path: Path, backend: str):
+    """测试同一批ID不会被两个 worker 同时认领"""
+    first = create_state_manager(str(tmp_path), "test", backend)
+    second = create_state_manager(str(tmp_path), "test", backend)
+    first.store_pending_ids(["id1", "id2", "id3"])
+
+    claimed_by_first = first.claim_pending_ids("worker-1", 2, lease_seconds=60)
+    claimed_by_second = second.claim_pending_ids("worker-2", 2, lease_seconds=60)
+
+    assert claimed_by_first == ["id1", "id2"]
+    assert claimed_by_second == ["id3"]
+    assert first.get_pending_ids() == set()
+    assert second.claim_ids(["id1", "new"], "worker-2", 10, lease_seconds=60) == ["new"]
+
+
+def test_expired_lease_is_reclaimed(tmp_path: Path, backend: str):
+    """测试 worker 崩溃后租约过期的ID可以被重新认领"""
+    manager = create_state_manager(str(tmp_path), "test", backend)
+    manager.store_pending_ids(["id1"])
+    assert manager.claim_pending_ids("crashed", 1, lease_seconds=0.05) == ["id1"]
+    assert manager.claim_pending_ids("worker-2", 1, lease_seconds=60) == []
+
+    time.sleep(0.1)
+
+    assert manager.get_pending_ids() == {"id1"}
+    assert manager.claim_pending_ids("worker-2", 1, lease_seconds=60) == ["id1"]
+    # 原 worker 的租约已被接管，不能再续约
+    assert manager.renew_leases("crashed", ["id1"], lease_seconds=60) == []
+    assert manager.renew_leases("worker-2", ["id1"], lease_seconds=60) == ["id1"]
+
+
+def test_finish_and_release(tmp_path: Path, backend: str):
+    manager = create_state_manager(str(tmp_path), "test", backend)
+    manager.store_pending_ids(["id1", "id2"])
+    manager.claim_pending_ids("worker-1", 2, lease_seconds=60)
+
+    manager.mark_as_finished(["id1"])
+    manager.store_pending_ids(["id2"])
+    assert manager.is_finished("id1")
+    assert manager.get_pending_ids() == set()
+
+    assert manager.release_ids("worker-2") == []
+    assert manager.release_ids("worker-1") == ["id2"]
+    assert manager.get_pending_ids() == {"id2"}
+    assert manager.claim_ids(["id1"], "worker-2", 1, lease_seconds=60) == []
+
+
+@pytest.mark.asyncio
+async def test_claim_ids_operator(tmp_path: Path, backend: str):
+    """测试两个 worker 的算子并行认领时不会拿到重复的对象"""
+    items = [{"id": f"id{i}"} for i in range(10)]
+    workers = [
+        ClaimIDs(
+            str(tmp_path),
+            "test",
+            batch_size=lambda: 4,
+            lease_seconds=60,
+            worker_id=f"worker-{i}",
+            id_getter=lambda x: x["id"],
+            backend=backend,
+        )
+        for i in range(3)
+    ]
+
+    batches = await asyncio.gather(*(worker.process(items) for worker in workers))
+
+    claimed = [item["id"] for batch in batches for item in batch]
+    assert sorted(claimed) == sorted(item["id"] for item in items)
+
+    await workers[0].cleanup()
+    manager = create_state_manager(str(tmp_path), "test", backend)
+    assert manager.get_pending_ids() == {item["id"] for item in batches[0]}
+
+
+def test_store_pending_ids_keeps_existing_states(tmp_path: Path, backend: str):
+    """测试 store_pending_ids 只记录新的ID，不会重置 FINISHED 或其他 worker 正在处理的ID"""
+    manager = create_state_manager(str(tmp_path), "test", backend)
+    manager.store_pending_ids(["done", "claimed", "pending"])
+    manager.mark_as_finished(["done"])
+    assert manager.claim_ids(["claimed"], "worker-1", 1, lease_seconds=60) == ["claimed"]
+
+    manager.store_pending_ids(["done", "claimed", "pending", "new"])
+
+    assert manager.is_finished("done")
+    assert manager.get_pending_ids() == {"pending", "new"}
+    # 租约仍然属于 worker-1
+    assert manager.claim_ids(["claimed"], "worker-2", 1, lease_seconds=60) == []
+    assert manager.renew_leases("worker-1", ["claimed"], lease_seconds=60) == ["claimed"]
+
+
+@pytest.mark.asyncio
+async def test_claim_ids_heartbeat_renews_leases(tmp_path: Path, backend: str):
+    """测试处理时间超过租约时长时，心跳续约让其他 worker 无法抢走正在处理的对象"""
+    worker = ClaimIDs(
+        str(tmp_path),
+        "test",
+        batch_size=2,
+        lease_seconds=0.3,
+        worker_id="slow",
+        backend=backend,
+    )
+    other = create_state_manager(str(tmp_path), "test", backend)
+
+    await worker.setup()
+    try:
+        assert await worker.process(["id1", "id2"]) == ["id1", "id2"]
+        other.mark_as_finished(["id2"])
+
+        # 超过租约时长后仍然持有 id1，已完成的 id2 不再续约
+        await asyncio.sleep(0.6)
+        assert other.claim_ids(["id1"], "fast", 1, lease_seconds=60) == []
+        assert worker.held_ids == {"id1"}
+    finally:
+        await worker.cleanup()
+
+    assert worker._heartbeat is None
+    assert other.claim_ids(["id1"], "fast", 1, lease_seconds=60) == ["id1"]
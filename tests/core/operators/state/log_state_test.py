@@ -0,0 +1,113 @@
+from pathlib import Path
+
+import pytest
+
+from daily_paper.core.operators.state.log_state import LogStateManager
+from daily_paper.core.operators.state.pending import IDState, StateManager
+
+
+@pytest.fixture
+def log_manager(tmp_path: Path) -> LogStateManager:
+    manager = LogStateManager(str(tmp_path), "test")
+    yield manager
+    manager.close()
+
+
+def test_log_store_and_mark(log_manager: LogStateManager):
+    """测试与JSON后端一致的状态流转"""
+    log_manager.store_pending_ids(["id1", "id2", "id3"])
+    log_manager.mark_as_finished(["id1"])
+    log_manager.store_pending_ids(["id1"])
+
+    assert log_manager.get_pending_ids() == {"id2", "id3"}
+    assert log_manager.is_finished("id1")
+    assert log_manager.is_finished_many(["id1", "id2", "unknown"]) == {"id1"}
+
+
+def test_log_appends_only_changes(log_manager: LogStateManager):
+    """测试每次写入只追加发生变化的ID"""
+    log_manager.store_pending_ids(["id1", "id2"])
+    size = log_manager.log_file.stat().st_size
+
+    log_manager.store_pending_ids(["id1", "id2"])
+    assert log_manager.log_file.stat().st_size == size
+
+    log_manager.mark_as_finished(["id1"])
+    assert log_manager.log_file.read_bytes().count(b"\n") == 2
+
+
+def test_log_replay_after_restart(tmp_path: Path):
+    first = LogStateManager(str(tmp_path), "test")
+    first.store_pending_ids(["id1", "id2"])
+    first.mark_as_finished(["id1"])
+    first.close()
+
+    second = LogStateManager(str(tmp_path), "test")
+    assert second.get_pending_ids() == {"id2"}
+    assert second.is_finished("id1")
+    second.close()
+
+
+def test_log_truncates_torn_record(tmp_path: Path):
+    """测试崩溃留下的不完整记录在重放时被截断"""
+    manager = LogStateManager(str(tmp_path), "test")
+    manager.store_pending_ids(["id1"])
+    manager.close()
+    valid_size = manager.log_file.stat().st_size
+
+    with open(manager.log_file, "ab") as f:
+        f.write(b'0badc0de {"id2":"fini')
+
+    reopened = LogStateManager(str(tmp_path), "test")
+    assert reopened.get_pending_ids() == {"id1"}
+    assert reopened.log_file.stat().st_size == valid_size
+
+    reopened.mark_as_finished(["id1"])
+    reopened.close()
+    assert LogStateManager(str(tmp_path), "test").is_finished("id1")
+
+
+def test_log_compaction(tmp_path: Path):
+    """测试日志压缩为快照后状态不变"""
+    manager = LogStateManager(str(tmp_path), "test", compact_min_records=10)
+    for i in range(5):
+        manager.store_pending_ids([f"id{i}"])
+        manager.mark_as_finished([f"id{i}"])
+    manager.store_pending_ids(["pending"])
+    manager.close()
+
+    assert manager.snapshot_file.exists()
+    assert not manager.compacting_file.exists()
+    assert manager.log_file.stat().st_size < 100
+
+    reopened = LogStateManager(str(tmp_path), "test")
+    assert reopened.get_pending_ids() == {"pending"}
+    assert reopened.is_finished_many([f"id{i}" for i in range(5)]) == {
+        f"id{i}" for i in range(5)
+    }
+    reopened.close()
+
+
+def test_log_sees_other_instance_writes(tmp_path: Path):
+    reader = LogStateManager(str(tmp_path), "test")
+    writer = LogStateManager(str(tmp_path), "test")
+
+    writer.store_pending_ids(["id1"])
+    assert reader.get_pending_ids() == {"id1"}
+
+    writer.mark_as_finished(["id1"])
+    writer.compact()
+    assert reader.is_finished("id1")
+    reader.close()
+    writer.close()
+
+
+def test_log_migrate_from_json(tmp_path: Path):
+    json_manager = StateManager(str(tmp_path), "test")
+    json_manager.update_states({"id1": IDState.FINISHED, "id2": IDState.PENDING})
+
+    manager = LogStateManager(str(tmp_path), "test")
+    assert manager.get_pending_ids() == {"id2"}
+    assert manager.is_finished("id1")
+    assert not json_manager.state_file.exists()
+    manager.close()
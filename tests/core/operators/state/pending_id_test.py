@@ -4,11 +4,13 @@ from typing import List
 
 import pytest
 
+from daily_paper.core.models import PaperBatch
 from daily_paper.core.operators.state.pending import (
     StateManager,
     InsertPendingIDs,
     GetAllPendingIDs,
     MarkIDsAsFinished,
+    FilterFinishedIDs,
     IDState,
 )
 
@@ -138,3 +140,74 @@ async def test_operator_workflow(tmp_path: Path, sample_ids: List[str]):
     await insert_op.process(finished_ids)
     final_pending = await get_op.process(None)
     assert set(final_pending) == {sample_ids[2]}  # 已完成的ID不应该变回pending状态
+
+
+def test_state_manager_reloads_after_external_change(tmp_path: Path):
+    """测试其他实例修改状态文件后能读取到最新状态"""
+    reader = StateManager(str(tmp_path), "test")
+    writer = StateManager(str(tmp_path), "test")
+
+    writer.store_pending_ids(["id1"])
+    assert not reader.is_finished("id1")
+
+    writer.mark_as_finished(["id1"])
+    assert reader.is_finished("id1")
+
+
+def test_state_manager_skips_unchanged_update(
+    state_manager: StateManager, sample_ids: List[str]
+):
+    """测试没有状态变化时不重写状态文件"""
+    state_manager.mark_as_finished(sample_ids)
+    stamp = state_manager._file_stamp()
+
+    state_manager.mark_as_finished(sample_ids)
+    state_manager.store_pending_ids(sample_ids)
+
+    assert state_manager._file_stamp() == stamp
+
+
+@pytest.mark.asyncio
+async def test_filter_finished_ids_queries_in_bulk(
+    tmp_path: Path, sample_ids: List[str], monkeypatch
+):
+    """测试过滤时只进行一次批量查询"""
+    operator = FilterFinishedIDs(str(tmp_path), "test", id_getter=lambda x: x["id"])
+    operator.state_manager.mark_as_finished(sample_ids[:1])
+
+    calls = []
+    is_finished_many = operator.state_manager.is_finished_many
+    monkeypatch.setattr(
+        operator.state_manager,
+        "is_finished_many",
+        lambda ids: calls.append(ids) or is_finished_many(ids),
+    )
+
+    items = [{"id": id} for id in sample_ids]
+    assert await operator.process(items) == items[1:]
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_filter_finished_ids_reads_paper_batch_id_column(
+    tmp_path: Path, sample_ids: List[str], monkeypatch
+):
+    """测试过滤 PaperBatch 时直接读取 id 列，不为每篇论文构造对象"""
+    batch = PaperBatch(
+        columns={
+            name: list(sample_ids) if name == "id" else [""] * len(sample_ids)
+            for name in PaperBatch().field_names
+        }
+    )
+    operator = FilterFinishedIDs(str(tmp_path), "test", id_getter=lambda x: x.id)
+    operator.state_manager.mark_as_finished(sample_ids[:1])
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Paper objects should not be built")
+
+    monkeypatch.setattr(PaperBatch, "__iter__", fail)
+    monkeypatch.setattr(PaperBatch, "__getitem__", fail)
+    result = await operator.process(batch)
+
+    assert isinstance(result, PaperBatch)
+    assert result.column("id") == sample_ids[1:]
@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from daily_paper.core.operators.state.pending import (
+    FilterFinishedIDs,
+    IDState,
+    StateManager,
+    create_state_manager,
+)
+from daily_paper.core.operators.state.sqlite_state import SqliteStateManager
+
+
+@pytest.fixture
+def sqlite_manager(tmp_path: Path) -> SqliteStateManager:
+    manager = SqliteStateManager(str(tmp_path), "test")
+    yield manager
+    manager.close()
+
+
+def test_sqlite_store_and_mark(sqlite_manager: SqliteStateManager):
+    """测试与JSON后端一致的状态流转"""
+    sqlite_manager.store_pending_ids(["id1", "id2", "id3"])
+    assert sqlite_manager.get_pending_ids() == {"id1", "id2", "id3"}
+
+    sqlite_manager.mark_as_finished(["id1", "id2"])
+    assert sqlite_manager.get_pending_ids() == {"id3"}
+    assert sqlite_manager.is_finished("id1")
+    assert not sqlite_manager.is_finished("id3")
+    assert not sqlite_manager.is_finished("unknown")
+
+    # 已完成的ID不会被重新标记为pending
+    sqlite_manager.store_pending_ids(["id1"])
+    assert sqlite_manager.is_finished("id1")
+
+
+def test_sqlite_is_finished_many(sqlite_manager: SqliteStateManager):
+    """测试超过单条查询参数上限的批量查询"""
+    ids = [f"id{i}" for i in range(1200)]
+    sqlite_manager.store_pending_ids(ids)
+    sqlite_manager.mark_as_finished(ids[::2])
+
+    assert sqlite_manager.is_finished_many(ids + ["unknown"]) == set(ids[::2])
+
+
+def test_sqlite_namespaces_are_isolated(tmp_path: Path):
+    first = SqliteStateManager(str(tmp_path), "first")
+    second = SqliteStateManager(str(tmp_path), "second")
+    first.mark_as_finished(["id1"])
+
+    assert first.is_finished("id1")
+    assert not second.is_finished("id1")
+
+
+def test_sqlite_uses_wal_mode(sqlite_manager: SqliteStateManager):
+    mode = sqlite_manager._conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_migrate_from_json(tmp_path: Path):
+    """测试从JSON状态文件迁移"""
+    json_manager = StateManager(str(tmp_path), "test")
+    json_manager.store_pending_ids(["id1", "id2"])
+    json_manager.mark_as_finished(["id1"])
+
+    manager = SqliteStateManager(str(tmp_path), "test")
+
+    assert manager.get_pending_ids() == {"id2"}
+    assert manager.is_finished("id1")
+    assert not json_manager.state_file.exists()
+    assert json_manager.state_file.with_name("test_states.json.migrated").exists()
+
+
+def test_update_states_is_shared_by_backends(tmp_path: Path):
+    for backend in ("json", "sqlite"):
+        manager = create_state_manager(str(tmp_path / backend), "test", backend)
+        manager.update_states({"id1": IDState.FINISHED, "id2": IDState.PENDING})
+        assert manager.get_pending_ids() == {"id2"}
+        assert manager.is_finished_many(["id1", "id2"]) == {"id1"}
+
+    with pytest.raises(ValueError):
+        create_state_manager(str(tmp_path), "test", "unknown")
+
+
+@pytest.mark.asyncio
+async def test_filter_finished_ids_with_sqlite_backend(tmp_path: Path):
+    operator = FilterFinishedIDs(str(tmp_path), "test", backend="sqlite")
+    operator.state_manager.mark_as_finished(["id1"])
+
+    assert await operator.process(["id1", "id2"]) == ["id2"]
@@ -0,0 +1,71 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from daily_paper.core.operators.state.pending import StateManager
+from daily_paper.core.operators.storage.local_storage import (
+    LocalStorageReader,
+    LocalStorageWriter,
+    StorageQuery,
+)
+
+PAPERS = [
+    {"id": "p1", "category": "cs.CL", "update_date": "2024-01-01", "abstract": "a1"},
+    {"id": "p2", "category": "cs.CV", "update_date": "2024-01-05", "abstract": "a2"},
+    {"id": "p3", "category": "cs.CL", "update_date": "2024-01-10", "abstract": "a3"},
+    {"id": "p4", "category": "cs.CL", "update_date": "2024-01-20", "abstract": "a4"},
+]
+
+
+@pytest.fixture(params=["json", "segments"])
+def storage_format(request, tmp_path: Path) -> str:
+    writer = LocalStorageWriter(
+        str(tmp_path),
+        "papers",
+        key_value_getter=lambda x: (x["id"], x),
+        storage_format=request.param,
+    )
+    asyncio.run(writer.process(PAPERS))
+    return request.param
+
+
+@pytest.mark.asyncio
+async def test_reader_pushdown_filters(tmp_path: Path, storage_format: str):
+    finished = StateManager(str(tmp_path / "state"), "push")
+    finished.mark_as_finished(["p3"])
+
+    converted = []
+    reader = LocalStorageReader(
+        str(tmp_path),
+        "papers",
+        value_reader=lambda k, v: converted.append(k) or v,
+        storage_format=storage_format,
+        query=StorageQuery(
+            update_date_from="2024-01-02",
+            categories={"cs.CL"},
+            exclude_finished=finished,
+            fields=["id", "update_date"],
+        ),
+    )
+
+    result = await reader.process(None)
+
+    assert result == [{"id": "p4", "update_date": "2024-01-20"}]
+    # 不满足条件的记录不会被转换
+    assert converted == ["p4"]
+
+
+@pytest.mark.asyncio
+async def test_reader_stream_process(tmp_path: Path, storage_format: str):
+    reader = LocalStorageReader(
+        str(tmp_path),
+        "papers",
+        storage_format=storage_format,
+        query=StorageQuery(update_date_to="2024-01-10"),
+        scan_batch_size=1,
+    )
+
+    ids = [paper["id"] async for paper in reader.stream_process(None)]
+
+    assert sorted(ids) == ["p1", "p2", "p3"]
@@ -0,0 +1,156 @@
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from daily_paper.core.operators.storage.local_storage import (
+    LocalStorage,
+    LocalStorageReader,
+    LocalStorageWriter,
+    StorageQuery,
+)
+from daily_paper.core.operators.storage.parquet_store import ParquetStore
+
+
+def _paper(id: str, update_date: str, category: str = "cs.CL", **extra) -> dict:
+    return {
+        "id": id,
+        "title": f"title {id}",
+        "abstract": "abstract " * 20,
+        "update_date": update_date,
+        "category": category,
+        **extra,
+    }
+
+
+def _record(value) -> dict:
+    return {"value": value, "stored_at": "2024-01-01T00:00:00"}
+
+
+def test_parquet_store_partitions_by_update_date(tmp_path: Path):
+    store = ParquetStore(str(tmp_path), "papers")
+    store.put_many(
+        {
+            "1": _record(_paper("1", "2024-01-01")),
+            "2": _record(_paper("2", "2024-01-02")),
+        }
+    )
+
+    partitions = sorted(p.name for p in store.dataset_dir.iterdir() if p.is_dir())
+    assert partitions == ["update_date=2024-01-01", "update_date=2024-01-02"]
+    assert dict(store.items())["2"]["value"]["title"] == "title 2"
+
+
+def test_parquet_store_last_write_wins_across_partitions(tmp_path: Path):
+    store = ParquetStore(str(tmp_path), "papers")
+    store.put_many({"1": _record(_paper("1", "2024-01-01"))})
+    # 论文更新后 update_date 变化，新记录写入新的分区
+    store.put_many({"1": _record(_paper("1", "2024-02-01", title="revised"))})
+
+    items = dict(store.items())
+    assert len(items) == 1
+    assert items["1"]["value"]["title"] == "revised"
+
+    reopened = ParquetStore(str(tmp_path), "papers")
+    assert dict(reopened.items()) == items
+
+
+def test_parquet_store_projection_and_partition_pruning(tmp_path: Path):
+    store = ParquetStore(str(tmp_path), "papers")
+    store.put_many({str(i): _record(_paper(str(i), f"2024-01-0{i}")) for i in range(1, 6)})
+
+    items = dict(
+        store.items(
+            fields=["title"], update_date_from="2024-01-02", update_date_to="2024-01-03"
+        )
+    )
+
+    assert sorted(items) == ["2", "3"]
+    assert items["2"]["value"] == {"title": "title 2"}
+
+
+def test_parquet_store_non_dict_values(tmp_path: Path):
+    store = ParquetStore(str(tmp_path), "values")
+    store.put_many({"a": _record([1, 2]), "b": _record("text")})
+
+    items = dict(store.items())
+    assert items["a"]["value"] == [1, 2]
+    assert items["b"]["value"] == "text"
+
+
+def test_parquet_store_compaction(tmp_path: Path):
+    store = ParquetStore(str(tmp_path), "papers", compact_min_files=100)
+    for i in range(5):
+        store.put_many({str(i): _record(_paper(str(i), "2024-01-01"))})
+    store.put_many({"0": _record(_paper("0", "2024-01-01", title="new"))})
+    before = dict(store.items())
+
+    store.compact()
+
+    files = list(store.dataset_dir.glob("*/*.parquet"))
+    assert len(files) == 1
+    assert dict(store.items()) == before
+    assert dict(ParquetStore(str(tmp_path), "papers").items()) == before
+
+
+def test_parquet_store_compacts_automatically(tmp_path: Path):
+    store = ParquetStore(str(tmp_path), "papers", compact_min_files=3)
+    for i in range(3):
+        store.put_many({str(i): _record(_paper(str(i), "2024-01-01"))})
+    store.close()
+
+    assert len(list(store.dataset_dir.glob("*/*.parquet"))) == 1
+    assert sorted(dict(store.items())) == ["0", "1", "2"]
+
+
+def test_local_storage_migrates_json_to_parquet(tmp_path: Path):
+    data = {"1": _record(_paper("1", "2024-01-01"))}
+    (tmp_path / "papers.json").write_text(json.dumps(data), encoding="utf-8")
+
+    storage = LocalStorage(str(tmp_path), "papers", storage_format="parquet")
+
+    assert storage.read_storage() == data
+    assert (tmp_path / "papers.json.migrated").exists()
+
+
+@pytest.mark.asyncio
+async def test_parquet_reader_pushes_down_query(tmp_path: Path):
+    writer = LocalStorageWriter(
+        str(tmp_path),
+        "papers",
+        key_value_getter=lambda paper: (paper["id"], paper),
+        storage_format="parquet",
+    )
+    await writer.process(
+        [
+            _paper("1", "2024-01-01"),
+            _paper("2", "2024-01-05", category="cs.CV"),
+            _paper("3", "2024-01-06"),
+        ]
+    )
+
+    reader = LocalStorageReader(
+        str(tmp_path),
+        "papers",
+        storage_format="parquet",
+        query=StorageQuery(
+            update_date_from="2024-01-02", categories={"cs.CL"}, fields=["id", "title"]
+        ),
+    )
+
+    assert await reader.process([]) == [{"id": "3", "title": "title 3"}]
+
+
+def test_parquet_store_get_many(tmp_path: Path):
+    store = ParquetStore(str(tmp_path), "papers")
+    store.put_many({str(i): _record(_paper(str(i), f"2024-01-0{i}")) for i in range(1, 4)})
+    store.put_many({"1": _record(_paper("1", "2024-01-09", title="revised"))})
+
+    records = store.get_many(["1", "3", "missing"], fields=["title"])
+
+    assert records == {
+        "1": {"value": {"title": "revised"}, "stored_at": "2024-01-01T00:00:00"},
+        "3": {"value": {"title": "title 3"}, "stored_at": "2024-01-01T00:00:00"},
+    }
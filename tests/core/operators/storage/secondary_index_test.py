@@ -0,0 +1,187 @@
+from pathlib import Path
+
+import pytest
+
+from daily_paper.core.operators.storage.local_storage import (
+    LocalStorage,
+    LocalStorageReader,
+    LocalStorageWriter,
+    StorageQuery,
+)
+from daily_paper.core.operators.storage.secondary_index import (
+    SecondaryIndex,
+    tokenize_authors,
+)
+
+
+def _record(id: str, update_date: str, category: str = "cs.CL", authors: str = "") -> dict:
+    return {
+        "value": {
+            "id": id,
+            "update_date": update_date,
+            "category": category,
+            "authors": authors,
+        },
+        "stored_at": "2024-01-01T00:00:00",
+    }
+
+
+def test_tokenize_authors():
+    assert tokenize_authors("Geoffrey Hinton, Yann LeCun") == {
+        "geoffrey",
+        "hinton",
+        "yann",
+        "lecun",
+    }
+    assert tokenize_authors(None) == set()
+
+
+def test_secondary_index_range_scan(tmp_path: Path):
+    index = SecondaryIndex(tmp_path / "papers.index.db")
+    index.update(
+        {
+            "1": _record("1", "2024-01-03", authors="Alice Smith"),
+            "2": _record("2", "2024-01-01", category="cs.CV", authors="Bob Smith"),
+            "3": _record("3", "2024-01-02", authors="Alice Jones"),
+        }
+    )
+
+    assert index.scan() == ["2", "3", "1"]
+    assert index.scan(update_date_from="2024-01-02", categories=["cs.CL"]) == ["3", "1"]
+    assert index.scan(author="smith", descending=True) == ["1", "2"]
+    assert index.scan(author="Alice Smith") == ["1"]
+    assert index.scan(categories=[]) == []
+
+    # 更新记录时替换旧的索引项
+    index.update({"1": _record("1", "2023-12-31", category="cs.AI", authors="Carol")})
+    assert index.scan(categories=["cs.CL"]) == ["3"]
+    assert index.scan(author="smith") == ["2"]
+    assert index.scan(limit=1) == ["1"]
+
+
+def test_secondary_index_dirty_flag(tmp_path: Path):
+    index = SecondaryIndex(tmp_path / "papers.index.db")
+    assert index.dirty
+
+    index.rebuild([("1", _record("1", "2024-01-01"))])
+    assert not index.dirty
+    assert len(index) == 1
+
+    index.mark_dirty()
+    assert SecondaryIndex(tmp_path / "papers.index.db").dirty
+
+
+@pytest.mark.parametrize("storage_format", ["json", "segments"])
+def test_local_storage_maintains_index(tmp_path: Path, storage_format: str):
+    storage = LocalStorage(
+        str(tmp_path), "papers", storage_format=storage_format, secondary_index=True
+    )
+    storage.put_records({"1": _record("1", "2024-01-02")})
+    storage.put_records({"2": _record("2", "2024-01-01")})
+
+    assert storage.index.scan() == ["2", "1"]
+    assert list(storage.get_records(["1", "missing", "2"])) == [
+        ("1", _record("1", "2024-01-02")),
+        ("2", _record("2", "2024-01-01")),
+    ]
+
+    storage.write_storage({"3": _record("3", "2024-01-03")})
+    assert storage.index.scan() == ["3"]
+
+
+def test_local_storage_rebuilds_dirty_index(tmp_path: Path):
+    storage = LocalStorage(str(tmp_path), "papers", storage_format="segments")
+    storage.put_records({"1": _record("1", "2024-01-01")})
+
+    # 之前没有开启索引，打开时从存储构建
+    indexed = LocalStorage(
+        str(tmp_path), "papers", storage_format="segments", secondary_index=True
+    )
+    assert indexed.index.scan() == ["1"]
+
+    # 模拟写入存储后、更新索引前崩溃
+    indexed.index.mark_dirty()
+    storage.put_records({"2": _record("2", "2024-01-02")})
+    reopened = LocalStorage(
+        str(tmp_path), "papers", storage_format="segments", secondary_index=True
+    )
+    assert reopened.index.scan() == ["1", "2"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage_format", ["json", "segments"])
+async def test_unindexed_writer_invalidates_existing_index(tmp_path: Path, storage_format: str):
+    """测试没有开启索引的实例写入后，开启索引的读写实例不会使用过期的索引"""
+
+    def make_writer(secondary_index: bool) -> LocalStorageWriter:
+        return LocalStorageWriter(
+            str(tmp_path),
+            "papers",
+            key_value_getter=lambda paper: (paper["id"], paper),
+            storage_format=storage_format,
+            secondary_index=secondary_index,
+        )
+
+    def make_reader(secondary_index: bool) -> LocalStorageReader:
+        return LocalStorageReader(
+            str(tmp_path),
+            "papers",
+            value_reader=lambda key, value: key,
+            storage_format=storage_format,
+            secondary_index=secondary_index,
+            query=StorageQuery(update_date_from="2024-01-01", order="asc"),
+        )
+
+    indexed_writer = make_writer(True)
+    indexed_reader = make_reader(True)
+    await indexed_writer.process([_record("a", "2024-01-01")["value"]])
+    await make_writer(False).process([_record("b", "2024-01-02")["value"]])
+
+    # 已经打开的读取实例和新打开的读取实例都能看到 b
+    assert await indexed_reader.process(None) == ["a", "b"]
+    assert await make_reader(True).process(None) == ["a", "b"]
+    assert await make_reader(False).process(None) == ["a", "b"]
+
+    # 开启索引的实例之后的增量写入也不会覆盖掉重建的结果
+    await indexed_writer.process([_record("c", "2024-01-03")["value"]])
+    await make_writer(False).process([_record("d", "2024-01-04")["value"]])
+    await indexed_writer.process([_record("e", "2024-01-05")["value"]])
+    assert indexed_writer.index.scan() == ["a", "b", "c", "d", "e"]
+    assert not indexed_writer.index.dirty
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("secondary_index", [True, False])
+async def test_reader_ordered_range_scan(tmp_path: Path, secondary_index: bool):
+    writer = LocalStorageWriter(
+        str(tmp_path),
+        "papers",
+        key_value_getter=lambda paper: (paper["id"], paper),
+        storage_format="segments",
+        secondary_index=secondary_index,
+    )
+    await writer.process(
+        [
+            _record("1", "2024-01-05", authors="Alice")["value"],
+            _record("2", "2024-01-02", authors="Alice")["value"],
+            _record("3", "2024-01-04", category="cs.CV", authors="Alice")["value"],
+            _record("4", "2024-01-01", authors="Alice")["value"],
+            _record("5", "2024-01-03", authors="Bob")["value"],
+        ]
+    )
+
+    reader = LocalStorageReader(
+        str(tmp_path),
+        "papers",
+        value_reader=lambda key, value: key,
+        storage_format="segments",
+        secondary_index=secondary_index,
+        query=StorageQuery(
+            update_date_from="2024-01-02",
+            categories={"cs.CL"},
+            author="alice",
+            order="desc",
+        ),
+    )
+
+    assert await reader.process([]) == ["1", "2"]
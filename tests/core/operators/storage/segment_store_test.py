@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from daily_paper.core.operators.storage.local_storage import (
+    LocalStorageReader,
+    LocalStorageWriter,
+)
+from daily_paper.core.operators.storage.segment_store import SegmentStore
+
+
+def test_segment_store_last_write_wins(tmp_path: Path):
+    store = SegmentStore(str(tmp_path), "test")
+    store.put_many({"a": 1, "b": 2})
+    store.put_many({"a": 3})
+
+    assert store.get("a") == 3
+    assert store.get("missing") is None
+    assert dict(store.items()) == {"a": 3, "b": 2}
+
+    # 重新打开时从段文件重建索引
+    reopened = SegmentStore(str(tmp_path), "test")
+    assert dict(reopened.items()) == {"a": 3, "b": 2}
+
+
+def test_segment_store_only_appends_batch(tmp_path: Path):
+    store = SegmentStore(str(tmp_path), "test")
+    store.put_many({f"key{i}": {"value": i} for i in range(100)})
+    size = sum(p.stat().st_size for p in store.segment_dir.glob("*.jsonl"))
+
+    store.put_many({"key0": {"value": -1}})
+
+    new_size = sum(p.stat().st_size for p in store.segment_dir.glob("*.jsonl"))
+    assert 0 < new_size - size < 100
+
+
+def test_segment_store_ignores_torn_tail(tmp_path: Path):
+    store = SegmentStore(str(tmp_path), "test")
+    store.put_many({"a": 1})
+    segment = next(store.segment_dir.glob("*.jsonl"))
+    with open(segment, "ab") as f:
+        f.write(b'{"k":"b","v":')
+
+    reopened = SegmentStore(str(tmp_path), "test")
+    assert dict(reopened.items()) == {"a": 1}
+    reopened.put_many({"c": 3})
+    assert dict(SegmentStore(str(tmp_path), "test").items()) == {"a": 1, "c": 3}
+
+
+def test_segment_store_merges_sealed_segments(tmp_path: Path):
+    store = SegmentStore(str(tmp_path), "test", max_segment_bytes=200, merge_min_segments=3)
+    expected = {}
+    for round in range(10):
+        batch = {f"key{i}": f"{round}-{i}" for i in range(5)}
+        store.put_many(batch)
+        expected.update(batch)
+    store.merge()
+    store.close()
+
+    assert len(list(store.segment_dir.glob("*.jsonl"))) <= 3
+    assert dict(store.items()) == expected
+    assert dict(SegmentStore(str(tmp_path), "test").items()) == expected
+
+
+def test_segment_store_sees_other_instance_writes(tmp_path: Path):
+    reader = SegmentStore(str(tmp_path), "test")
+    writer = SegmentStore(str(tmp_path), "test", max_segment_bytes=50, merge_min_segments=2)
+
+    for i in range(6):
+        writer.put_many({f"key{i}": i})
+        assert reader.get(f"key{i}") == i
+    writer.merge()
+
+    assert dict(reader.items()) == {f"key{i}": i for i in range(6)}
+
+
+@pytest.mark.asyncio
+async def test_local_storage_segments_format(tmp_path: Path):
+    # 旧格式的数据会被导入段存储
+    legacy = {"old": {"value": {"id": "old"}, "stored_at": "2024-01-01T00:00:00"}}
+    (tmp_path / "papers.json").write_text(json.dumps(legacy))
+
+    writer = LocalStorageWriter(
+        str(tmp_path),
+        "papers",
+        key_value_getter=lambda x: (x["id"], x),
+        storage_format="segments",
+    )
+    await writer.process([{"id": "new"}])
+
+    reader = LocalStorageReader(str(tmp_path), "papers", storage_format="segments")
+    assert sorted(x["id"] for x in await reader.process(None)) == ["new", "old"]
+    assert (tmp_path / "papers.json.migrated").exists()
+
+    with pytest.raises(ValueError):
+        LocalStorageReader(str(tmp_path), "papers", storage_format="unknown")
@@ -0,0 +1,565 @@
+import asyncio
+import json
+import time
+from typing import Any, AsyncGenerator, List
+
+import pytest
+
+from daily_paper.core.models import Paper, PaperBatch
+from daily_paper.core.pipeline import DAGPipeline
+from daily_paper.core.metrics import MetricsCollector, record_exception
+from daily_paper.core.tracing import ChromeTraceCollector, trace_span, traced
+from daily_paper.core.operators.base import Operator, OperatorStatus
+from daily_paper.core.operators.processor.custom_processor import CustomProcessor
+
+
+class SleepOperator(Operator):
+    """等待指定时间后返回输入并记录完成时间的测试算子"""
+
+    def __init__(self, delay: float, finished_at: dict, name: str):
+        self.delay = delay
+        self.finished_at = finished_at
+        self.name = name
+
+    async def process(self, input_data: Any) -> Any:
+        await asyncio.sleep(self.delay)
+        self.finished_at[self.name] = time.monotonic()
+        return input_data
+
+
+class FailingOperator(Operator):
+    """总是抛出异常的测试算子"""
+
+    async def process(self, input_data: Any) -> Any:
+        raise RuntimeError("boom")
+
+
+@pytest.mark.asyncio
+async def test_node_starts_when_its_dependencies_finish():
+    """测试下游算子不需要等待同层级的慢算子"""
+    finished_at = {}
+    pipeline = DAGPipeline()
+    pipeline.add_operator("source", SleepOperator(0, finished_at, "source"))
+    pipeline.add_operator("slow", SleepOperator(0.3, finished_at, "slow"), ["source"])
+    pipeline.add_operator("fast", SleepOperator(0, finished_at, "fast"), ["source"])
+    pipeline.add_operator("after_fast", SleepOperator(0, finished_at, "after_fast"), ["fast"])
+
+    results = await pipeline.execute([1, 2, 3])
+
+    assert results["after_fast"] == [1, 2, 3]
+    assert finished_at["after_fast"] < finished_at["slow"]
+    assert all(
+        op.status == OperatorStatus.COMPLETED for op in pipeline.operators.values()
+    )
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_limits_running_operators():
+    """测试全局并发上限"""
+    running = 0
+    peak = 0
+
+    class CountingOperator(Operator):
+        async def process(self, input_data: Any) -> Any:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            return input_data
+
+    pipeline = DAGPipeline(max_concurrency=2)
+    for i in range(5):
+        pipeline.add_operator(f"op{i}", CountingOperator())
+
+    await pipeline.execute([])
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_failure_stops_scheduling_downstream():
+    """测试算子失败后不再调度下游算子"""
+    finished_at = {}
+    pipeline = DAGPipeline()
+    pipeline.add_operator("failing", FailingOperator())
+    pipeline.add_operator("downstream", SleepOperator(0, finished_at, "downstream"), ["failing"])
+
+    with pytest.raises(RuntimeError):
+        await pipeline.execute([])
+
+    assert pipeline.operators["failing"].status == OperatorStatus.FAILED
+    assert pipeline.operators["downstream"].status == OperatorStatus.PENDING
+    assert "downstream" not in finished_at
+
+
+class StreamSource(Operator):
+    """逐条输出数据并记录输出时间的测试数据源"""
+
+    def __init__(self, items: List[Any], delay: float, emitted_at: List[float]):
+        self.items = items
+        self.delay = delay
+        self.emitted_at = emitted_at
+
+    async def process(self, _: Any) -> List[Any]:
+        return list(self.items)
+
+    async def stream_process(self, _) -> AsyncGenerator[Any, None]:
+        for item in self.items:
+            await asyncio.sleep(self.delay)
+            self.emitted_at.append(time.monotonic())
+            yield item
+
+
+class DoubleOperator(Operator):
+    """逐条处理数据的测试算子"""
+
+    def __init__(self):
+        self.received_at: List[float] = []
+
+    async def process(self, items: List[int]) -> List[int]:
+        return [item * 2 for item in items]
+
+    async def stream_process(self, items) -> AsyncGenerator[int, None]:
+        async for item in items:
+            self.received_at.append(time.monotonic())
+            yield item * 2
+
+
+@pytest.mark.asyncio
+async def test_execute_stream_processes_items_incrementally():
+    """测试流式模式下下游算子在上游结束前就开始处理"""
+    emitted_at = []
+    double = DoubleOperator()
+    pipeline = DAGPipeline(stream_queue_size=1)
+    pipeline.add_operator("source", StreamSource([1, 2, 3], 0.05, emitted_at))
+    pipeline.add_operator("double", double, ["source"])
+    # 使用默认的 stream_process 实现，会收集完整的输入后调用 process
+    pipeline.add_operator("sort", CustomProcessor(sorted), ["double"])
+
+    results = await pipeline.execute_stream()
+
+    assert results == {"sort": [2, 4, 6]}
+    assert double.received_at[0] < emitted_at[-1]
+    assert all(
+        op.status == OperatorStatus.COMPLETED for op in pipeline.operators.values()
+    )
+
+
+@pytest.mark.asyncio
+async def test_execute_stream_rejects_multiple_dependencies():
+    """测试流式模式不支持多依赖算子"""
+    pipeline = DAGPipeline()
+    pipeline.add_operator("a", DoubleOperator())
+    pipeline.add_operator("b", DoubleOperator())
+    pipeline.add_operator("c", DoubleOperator(), ["a", "b"])
+
+    with pytest.raises(ValueError):
+        await pipeline.execute_stream([1])
+
+
+@pytest.mark.asyncio
+async def test_execute_stream_propagates_failure():
+    """测试流式模式下算子失败会终止整个流水线"""
+    pipeline = DAGPipeline(stream_queue_size=1)
+    pipeline.add_operator("source", StreamSource(list(range(10)), 0, []))
+    pipeline.add_operator("failing", FailingOperator(), ["source"])
+
+    with pytest.raises(RuntimeError):
+        await pipeline.execute_stream()
+
+    assert pipeline.operators["failing"].status == OperatorStatus.FAILED
+
+
+class RecordingCollector(MetricsCollector):
+    """记录回调调用顺序的测试回调"""
+
+    def __init__(self):
+        self.events = []
+
+    def on_pipeline_start(self, report):
+        self.events.append(("pipeline_start", None))
+
+    def on_operator_start(self, metrics):
+        self.events.append(("operator_start", metrics.name))
+
+    def on_operator_end(self, metrics):
+        self.events.append(("operator_end", metrics.name))
+
+    def on_pipeline_end(self, report):
+        self.events.append(("pipeline_end", report.status))
+
+
+@pytest.mark.asyncio
+async def test_execute_records_operator_metrics():
+    """测试批量模式下的执行统计和回调"""
+    collector = RecordingCollector()
+    pipeline = DAGPipeline(collectors=[collector])
+    pipeline.add_operator("source", SleepOperator(0.05, {}, "source"))
+    pipeline.add_operator("double", DoubleOperator(), ["source"])
+
+    await pipeline.execute([1, 2, 3, 4])
+
+    report = pipeline.last_report
+    assert report.status == "COMPLETED"
+    source = report.operators["source"]
+    assert source.status == "COMPLETED"
+    assert source.items_in == 4 and source.items_out == 4
+    assert source.wall_time_sec >= 0.05
+    assert 0 < source.items_per_sec <= 4 / 0.05
+    assert report.operators["double"].exception_count == 0
+
+    data = json.loads(report.to_json())
+    assert set(data["operators"]) == {"source", "double"}
+    assert collector.events[0] == ("pipeline_start", None)
+    assert collector.events[-1] == ("pipeline_end", "COMPLETED")
+    assert collector.events.index(("operator_end", "source")) < collector.events.index(
+        ("operator_start", "double")
+    )
+
+
+@pytest.mark.asyncio
+async def test_metrics_record_failures_and_handled_exceptions():
+    """测试失败算子和算子内部处理的异常都会被统计"""
+
+    class PartiallyFailingOperator(Operator):
+        async def process(self, items: List[int]) -> List[int]:
+            for item in items:
+                if item < 0:
+                    record_exception(ValueError(item))
+            return [item for item in items if item >= 0]
+
+    pipeline = DAGPipeline()
+    pipeline.add_operator("partial", PartiallyFailingOperator())
+    pipeline.add_operator("failing", FailingOperator(), ["partial"])
+
+    with pytest.raises(RuntimeError):
+        await pipeline.execute([1, -1, -2])
+
+    report = pipeline.last_report
+    assert report.status == "FAILED"
+    assert report.operators["partial"].exception_count == 2
+    assert report.operators["partial"].items_out == 1
+    assert report.operators["failing"].exception_count == 1
+    assert "boom" in report.operators["failing"].error
+
+
+@pytest.mark.asyncio
+async def test_execute_stream_records_item_counts():
+    """测试流式模式下按元素统计输入输出"""
+    pipeline = DAGPipeline()
+    pipeline.add_operator("source", StreamSource([1, 2, 3], 0, []))
+    pipeline.add_operator("double", DoubleOperator(), ["source"])
+
+    await pipeline.execute_stream()
+
+    report = pipeline.last_report
+    assert report.mode == "stream"
+    assert report.operators["source"].items_out == 3
+    assert report.operators["double"].items_in == 3
+    assert report.operators["double"].items_out == 3
+
+
+@pytest.mark.asyncio
+async def test_chrome_trace_records_operator_and_item_spans(tmp_path):
+    """测试导出的 trace 包含算子 span 和并发的任务 span"""
+
+    class TracedOperator(Operator):
+        @traced(capture=("item",))
+        async def handle(self, item: int) -> int:
+            await asyncio.sleep(0.02)
+            return item
+
+        async def process(self, items: List[int]) -> List[int]:
+            return list(await asyncio.gather(*[self.handle(i) for i in items]))
+
+    trace_path = tmp_path / "trace.json"
+    pipeline = DAGPipeline(collectors=[ChromeTraceCollector(str(trace_path))])
+    pipeline.add_operator("traced", TracedOperator())
+
+    await pipeline.execute([1, 2, 3])
+
+    with open(trace_path, encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    spans = [e for e in events if e["ph"] == "X"]
+    operator_span = next(e for e in spans if e["cat"] == "operator")
+    item_spans = [e for e in spans if e["cat"] == "item"]
+
+    assert operator_span["name"] == "traced"
+    assert operator_span["args"]["items_out"] == 3
+    assert sorted(e["args"]["item"] for e in item_spans) == [1, 2, 3]
+    # 三个任务并发执行，应该分布在三个不同的泳道上
+    assert len({e["tid"] for e in item_spans}) == 3
+    for e in item_spans:
+        assert operator_span["ts"] <= e["ts"]
+        assert e["ts"] + e["dur"] <= operator_span["ts"] + operator_span["dur"]
+
+
+def test_trace_span_is_noop_without_collector():
+    """测试没有启用 trace 时 trace_span 不做记录"""
+    with trace_span("noop") as args:
+        assert args == {}
+
+
+class CountingCheckpointOperator(Operator):
+    """记录调用次数、可以保存检查点的测试算子"""
+
+    checkpointable = True
+
+    def __init__(self, factor: int):
+        self.factor = factor
+        self.calls = 0
+
+    async def process(self, items: List[int]) -> List[int]:
+        self.calls += 1
+        return [item * self.factor for item in items]
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_skips_unchanged_nodes(tmp_path):
+    """测试输入和配置不变时复用检查点，变化时重新执行"""
+    checkpointed = CountingCheckpointOperator(2)
+    pipeline = DAGPipeline(checkpoint_dir=str(tmp_path))
+    pipeline.add_operator("double", checkpointed)
+    pipeline.add_operator("failing", FailingOperator(), ["double"])
+
+    # 下游失败后，已经完成的算子的结果仍然被保存
+    with pytest.raises(RuntimeError):
+        await pipeline.execute([1, 2])
+    assert checkpointed.calls == 1
+
+    rerun = CountingCheckpointOperator(2)
+    pipeline = DAGPipeline(checkpoint_dir=str(tmp_path))
+    pipeline.add_operator("double", rerun)
+    results = await pipeline.execute([1, 2])
+    assert results["double"] == [2, 4]
+    assert rerun.calls == 0
+    assert pipeline.last_report.operators["double"].cached
+
+    # 输入变化
+    await pipeline.execute([1, 2, 3])
+    assert rerun.calls == 1
+
+    # 配置变化
+    changed = CountingCheckpointOperator(3)
+    pipeline = DAGPipeline(checkpoint_dir=str(tmp_path))
+    pipeline.add_operator("double", changed)
+    results = await pipeline.execute([1, 2, 3])
+    assert results["double"] == [3, 6, 9]
+    assert changed.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_setup_once_across_executions():
+    """测试显式 setup 后多次执行不会重复初始化和清理算子"""
+
+    class LifecycleOperator(Operator):
+        def __init__(self):
+            self.setup_calls = 0
+            self.cleanup_calls = 0
+
+        async def setup(self):
+            self.setup_calls += 1
+
+        async def cleanup(self):
+            self.cleanup_calls += 1
+
+        async def process(self, items: List[int]) -> List[int]:
+            return items
+
+    operator = LifecycleOperator()
+    pipeline = DAGPipeline()
+    pipeline.add_operator("op", operator)
+
+    async with pipeline:
+        for batch in ([1], [2], [3]):
+            assert (await pipeline.execute(batch))["op"] == batch
+        assert operator.setup_calls == 1
+        assert operator.cleanup_calls == 0
+    assert operator.cleanup_calls == 1
+
+    # 没有显式 setup 时每次执行都会初始化和清理
+    await pipeline.execute([4])
+    assert operator.setup_calls == 2
+    assert operator.cleanup_calls == 2
+
+
+@pytest.mark.asyncio
+async def test_linear_custom_processor_chain_is_fused():
+    """测试线性的 CustomProcessor 链被合并执行"""
+    pipeline = DAGPipeline()
+    pipeline.add_operator("source", DoubleOperator())
+    pipeline.add_operator("sort", CustomProcessor(sorted), ["source"])
+    pipeline.add_operator("head", CustomProcessor(lambda x: x[:2]), ["sort"])
+    pipeline.add_operator("negate", CustomProcessor(lambda x: [-i for i in x]), ["head"])
+    # 被两个算子依赖的 negate 不能和下游继续合并
+    pipeline.add_operator("left", CustomProcessor(list), ["negate"])
+    pipeline.add_operator("right", CustomProcessor(list), ["negate"])
+
+    assert pipeline.fused_chains == {"sort": ["sort", "head", "negate"]}
+
+    results = await pipeline.execute([3, 1, 2])
+    assert results["negate"] == [-2, -4]
+    assert results["left"] == results["right"] == [-2, -4]
+    # 合并执行不改变返回值，链的中间结果仍然可以读取
+    assert results["sort"] == [2, 4, 6] and results["head"] == [2, 4]
+    assert all(
+        op.status == OperatorStatus.COMPLETED for op in pipeline.operators.values()
+    )
+    assert pipeline.last_report.operators["head"].items_out == 2
+
+    stream_results = await pipeline.execute_stream([3, 1, 2])
+    assert stream_results == {"left": [-2, -4], "right": [-2, -4]}
+
+
+@pytest.mark.asyncio
+async def test_fused_intermediate_results_can_be_released():
+    """测试开启 release_fused_results 后不保留合并链的中间结果"""
+    pipeline = DAGPipeline(release_fused_results=True)
+    pipeline.add_operator("sort", CustomProcessor(sorted))
+    pipeline.add_operator("head", CustomProcessor(lambda x: x[:1]), ["sort"])
+
+    results = await pipeline.execute([2, 1])
+    assert results == {"initial": [2, 1], "head": [1]}
+    assert pipeline.operators["sort"].result is None
+
+
+@pytest.mark.asyncio
+async def test_fusion_can_be_disabled():
+    """测试关闭算子合并后每个算子单独执行"""
+    pipeline = DAGPipeline(fuse_operators=False)
+    pipeline.add_operator("sort", CustomProcessor(sorted))
+    pipeline.add_operator("head", CustomProcessor(lambda x: x[:1]), ["sort"])
+
+    assert pipeline.fused_chains == {}
+    results = await pipeline.execute([2, 1])
+    assert results == {"initial": [2, 1], "sort": [1, 2], "head": [1]}
+
+
+@pytest.mark.asyncio
+async def test_partitioned_operator_runs_shards_concurrently():
+    """测试各分片由独立的算子实例并发处理，并按顺序合并结果"""
+    shards = []
+    running = 0
+    peak = 0
+    instances = []
+
+    class ShardedOperator(Operator):
+        partitionable = True
+
+        def __init__(self):
+            # 每个实例同时只处理一个请求，只有多个实例才能并发
+            self.semaphore = asyncio.Semaphore(1)
+            self.setup_calls = 0
+            self.cleanup_calls = 0
+            instances.append(self)
+
+        def replicate(self) -> "ShardedOperator":
+            return type(self)()
+
+        async def setup(self):
+            self.setup_calls += 1
+
+        async def cleanup(self):
+            self.cleanup_calls += 1
+
+        async def process(self, items: List[int]) -> List[int]:
+            nonlocal running, peak
+            async with self.semaphore:
+                shards.append(list(items))
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.02)
+                running -= 1
+            return [item * 10 for item in items]
+
+    pipeline = DAGPipeline()
+    pipeline.add_operator("sharded", ShardedOperator(), partitions=3)
+
+    async with pipeline:
+        results = await pipeline.execute(list(range(7)))
+        assert results["sharded"] == [i * 10 for i in range(7)]
+        assert sorted(len(shard) for shard in shards) == [1, 3, 3]
+        assert peak == 3
+
+        # 副本在多次执行之间复用
+        await pipeline.execute(list(range(7)))
+        assert len(instances) == 3
+        assert all(op.setup_calls == 1 for op in instances)
+
+    assert all(op.cleanup_calls == 1 for op in instances)
+    assert pipeline.operators["sharded"].replicas == []
+
+    # PaperBatch 等序列也会被分片
+    batch = PaperBatch.from_papers(
+        Paper(str(i), "t", "u", "a", "au", "cs.CL", "2024-01-01", "2024-01-01")
+        for i in range(4)
+    )
+
+    class IdOperator(ShardedOperator):
+        async def process(self, papers: PaperBatch) -> List[str]:
+            assert isinstance(papers, PaperBatch)
+            shards.append(papers.column("id"))
+            return list(papers.column("id"))
+
+    shards.clear()
+    pipeline = DAGPipeline()
+    pipeline.add_operator("ids", IdOperator(), partitions=2)
+    results = await pipeline.execute(batch)
+    assert results["ids"] == ["0", "1", "2", "3"]
+    assert sorted(shards) == [["0", "1"], ["2", "3"]]
+
+
+def test_partitions_require_partitionable_operator():
+    """测试非 partitionable 的算子不能分片"""
+    pipeline = DAGPipeline()
+    with pytest.raises(ValueError):
+        pipeline.add_operator("double", DoubleOperator(), partitions=2)
+
+    pipeline.add_operator("double", DoubleOperator())
+    with pytest.raises(ValueError):
+        pipeline.set_partitions("double", 2)
+
+    class NoReplicaOperator(DoubleOperator):
+        partitionable = True
+
+    with pytest.raises(ValueError):
+        pipeline.add_operator("no_replica", NoReplicaOperator(), partitions=2)
+
+
+class CommitRecorder(Operator):
+    """记录 commit 调用次数的测试算子"""
+
+    def __init__(self):
+        self.commits = 0
+
+    async def process(self, input_data: Any) -> Any:
+        return input_data
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.asyncio
+async def test_commit_only_after_successful_execution():
+    """测试只有整个流水线成功后才提交算子状态"""
+    recorder = CommitRecorder()
+    pipeline = DAGPipeline()
+    pipeline.add_operator("source", recorder)
+    pipeline.add_operator("failing", FailingOperator(), ["source"])
+
+    with pytest.raises(RuntimeError):
+        await pipeline.execute([1])
+    with pytest.raises(RuntimeError):
+        await pipeline.execute_stream([1])
+    assert recorder.commits == 0
+
+    ok = DAGPipeline()
+    ok.add_operator("source", recorder)
+    await ok.execute([1])
+    await ok.execute_stream([1])
+    assert recorder.commits == 2
+
+    await ok.execute([1], commit=False)
+    assert recorder.commits == 2
+    await ok.commit()
+    assert recorder.commits == 3
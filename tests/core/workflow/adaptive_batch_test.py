@@ -0,0 +1,90 @@
+import pytest
+
+from daily_paper.core.metrics import OperatorMetrics, PipelineRunReport
+from daily_paper.core.workflow.adaptive_batch import AdaptiveBatchController
+
+
+def make_report(wall_time_sec: float, exception_count: int = 0) -> PipelineRunReport:
+    """构造只包含论文总结算子统计信息的报告"""
+    report = PipelineRunReport(mode="batch")
+    report.operators["paper_summarizer"] = OperatorMetrics(
+        name="paper_summarizer",
+        operator="LLMSummarizer",
+        wall_time_sec=wall_time_sec,
+        exception_count=exception_count,
+    )
+    return report
+
+
+@pytest.fixture
+def controller() -> AdaptiveBatchController:
+    return AdaptiveBatchController(
+        initial_batch_size=4, min_batch_size=2, max_batch_size=16, max_concurrency=8
+    )
+
+
+def test_grows_when_llm_concurrency_is_underused(controller):
+    """测试 LLM 并发没有用满时扩大批次，且不超过上限"""
+    # 并发上限为 8，批次不超过 8 时总耗时基本不变，超过后按轮数增加
+    assert controller.update(make_report(4.0), processed=4, peak_concurrency=4) == 8
+    assert controller.update(make_report(4.0), processed=8, peak_concurrency=6) == 16
+    assert controller.update(make_report(8.0), processed=16, peak_concurrency=6) == 16
+
+
+def test_keeps_size_when_batch_was_not_full(controller):
+    """测试数据不足导致批次未填满时不扩大批次"""
+    assert controller.update(make_report(2.0), processed=2, peak_concurrency=2) == 4
+
+
+def test_shrinks_on_latency_regression_and_errors(controller):
+    """测试单篇耗时变长或出错过多时缩小批次，且不低于下限"""
+    controller.update(make_report(4.0), processed=4, peak_concurrency=8)
+    assert controller.batch_size == 4
+    assert controller.update(make_report(8.0), processed=4, peak_concurrency=8) == 2
+    assert controller.update(make_report(4.0, exception_count=2), processed=2) == 2
+
+
+def test_shrink_below_concurrency_does_not_cascade(monkeypatch):
+    """测试批次小于并发上限时，一次减半不会因为单篇耗时的计算方式连锁减半"""
+    from daily_paper.core.workflow import adaptive_batch
+
+    controller = AdaptiveBatchController(
+        initial_batch_size=8, min_batch_size=1, max_batch_size=8, max_concurrency=10
+    )
+    rss = {"value": 2 * 2**30}
+    monkeypatch.setattr(adaptive_batch, "get_current_rss_bytes", lambda: rss["value"])
+    controller.memory_limit_bytes = 2**30
+
+    # 每个请求耗时 2 秒，批次小于并发上限时总耗时与批次大小无关
+    sizes = [controller.update(make_report(2.0), processed=8, peak_concurrency=8)]
+    rss["value"] = 0
+    for _ in range(3):
+        batch = controller.batch_size
+        sizes.append(
+            controller.update(make_report(2.0), processed=batch, peak_concurrency=batch)
+        )
+
+    assert sizes == [4, 8, 8, 8]
+
+
+def test_skips_latency_check_right_after_shrink():
+    """测试批次刚缩小后的那一批只更新耗时基准"""
+    controller = AdaptiveBatchController(
+        initial_batch_size=4, min_batch_size=1, max_batch_size=16, max_concurrency=8
+    )
+    controller.update(make_report(4.0), processed=4, peak_concurrency=8)
+    assert controller.update(make_report(8.0), processed=4, peak_concurrency=8) == 2
+    # 缩小后的第一批仍然较慢，不再继续缩小
+    assert controller.update(make_report(16.0), processed=2, peak_concurrency=8) == 2
+    assert not controller.shrunk_last_update
+    # 之后耗时继续变长才会再次缩小
+    assert controller.update(make_report(32.0), processed=2, peak_concurrency=8) == 1
+
+
+def test_limit_uses_current_batch_size(controller):
+    assert controller.limit(list(range(10))) == [0, 1, 2, 3]
+
+
+def test_invalid_bounds():
+    with pytest.raises(ValueError):
+        AdaptiveBatchController(4, min_batch_size=8, max_batch_size=2, max_concurrency=1)
@@ -0,0 +1,90 @@
+import os
+from dataclasses import asdict
+
+import pytest
+
+from daily_paper.core.config import Config
+from daily_paper.core.models import Paper
+from daily_paper.core.operators.processor.llm_summarizer import LLMSummarizer
+from daily_paper.core.operators.processor.paper_reader import PaperReader
+from daily_paper.core.operators.state.pending import create_state_manager
+from daily_paper.core.operators.storage.local_storage import LocalStorageWriter
+from daily_paper.core.workflow.adaptive_batch import AdaptiveBatchController
+from daily_paper.core.workflow.daily_paper_workflow import (
+    create_paper_summarize_pipeline,
+    execute_pipeline,
+)
+
+
+def _paper(i: int) -> Paper:
+    return Paper(
+        id=f"2401.{i:05d}",
+        title=f"Paper {i}",
+        url=f"http://arxiv.org/abs/2401.{i:05d}",
+        abstract="abstract",
+        authors="Alice",
+        category="cs.CL",
+        publish_date="2024-01-01",
+        update_date=f"2024-01-{i + 1:02d}",
+    )
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch) -> Config:
+    """保存了若干篇过滤后论文的配置，下载和 LLM 请求都被替换为本地实现"""
+
+    async def read_paper(self, paper):
+        return paper, f"text of {paper.id}"
+
+    async def summarize_paper(self, text):
+        return f"summary of {text}"
+
+    monkeypatch.setattr(PaperReader, "_process_single_paper", read_paper)
+    monkeypatch.setattr(LLMSummarizer, "summarize_paper", summarize_paper)
+
+    config = Config(
+        enable_llm_filter=True,
+        process_batch_size=2,
+        llm={"api_key": "test", "base_url": "http://localhost"},
+        storage={"base_path": str(tmp_path)},
+    )
+    return config
+
+
+async def _write_filtered_papers(config: Config, papers):
+    writer = LocalStorageWriter(
+        storage_dir=os.path.join(config.storage.base_path, "filtered_papers"),
+        storage_namespace="filtered_papers",
+        key_value_getter=lambda x: (x.id, asdict(x)),
+    )
+    await writer.process(papers)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("adaptive", [False, True])
+@pytest.mark.parametrize("streaming", [False, True])
+async def test_summarize_pipeline_reads_paper_batches(config, adaptive, streaming):
+    """测试总结流水线以 PaperBatch 读取过滤后的论文时，各批次依次处理未完成的论文"""
+    config.enable_streaming = streaming
+    await _write_filtered_papers(config, [_paper(i) for i in range(3)])
+    state = create_state_manager(os.path.join(config.storage.base_path, "state"), "arxiv")
+    state.mark_as_finished(["2401.00000"])
+
+    batch_controller = None
+    if adaptive:
+        batch_controller = AdaptiveBatchController(
+            initial_batch_size=2, min_batch_size=1, max_batch_size=4, max_concurrency=4
+        )
+    pipeline = await create_paper_summarize_pipeline(config, batch_controller)
+    processed = []
+    async with pipeline:
+        for _ in range(3):
+            results = await execute_pipeline(pipeline, config)
+            batch = results.get("mark_processed_papers") or []
+            if not batch:
+                break
+            processed.extend(batch)
+
+    assert sorted(p.id for p in processed) == ["2401.00001", "2401.00002"]
+    assert all(p.summary == f"summary of text of {p.id}" for p in processed)
+    assert state.get_finished_ids() == {"2401.00000", "2401.00001", "2401.00002"}